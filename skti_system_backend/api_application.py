@@ -1,30 +1,47 @@
 import os
-import time
-import random
-import string
+import math
 import logging
 
-from fastapi import FastAPI, Request, status
-from fastapi.responses import JSONResponse
+from fastapi import Depends, FastAPI, Request, status
+from fastapi.responses import JSONResponse, Response
 from fastapi.exceptions import RequestValidationError
 from fastapi.logger import logger as fastapi_logger
-from fastapi.staticfiles import StaticFiles
 
-from slowapi.errors import RateLimitExceeded
 from starlette.middleware.cors import CORSMiddleware
 
 from django.core.asgi import get_asgi_application
 from django.contrib import admin
+from django.db import transaction
+from django.db.models import Prefetch, Q
 from django.utils.html import format_html
 
 from skti_system_backend.core.v1.api import limiter as rate_limiter
 from skti_system_backend.config.v1.api_config import api_config
+from skti_system_backend.config.v1.database_config import postgres_config
+from skti_system_backend.config.v1.media_config import media_config
 from skti_system_backend.core.fastapi_blueprints import connect_router as connect_router_v1
+from skti_system_backend.utils.v1.admin import ArtworkTagFilter, EstimatedCountPaginator
+from skti_system_backend.utils.v1.changes import change_watcher
+from skti_system_backend.utils.v1.db import close_db_connections, run_db
 from skti_system_backend.utils.v1.errors import (
     InternalServerException,
+    InvalidCursorException,
+    InvalidFieldsException,
+    InvalidIdsException,
     MalformedJWTRequestException,
+    RateLimitExceededException,
     generate_detailed_errors,
 )
+from skti_system_backend.utils.v1.metrics import render_metrics
+from skti_system_backend.utils.v1.db_router import replica_aliases
+from skti_system_backend.utils.v1.middleware import (
+    ContentTypeMiddleware,
+    InstrumentationMiddleware,
+    PrimaryAfterWriteMiddleware,
+)
+from skti_system_backend.utils.v1.query_stats import install_query_tracking, query_budget
+from skti_system_backend.utils.v1.rate_limit import enforce_rate_limit
+from skti_system_backend.utils.v1.static import MediaFiles
 from skti_system_backend.models.v1.api.exception_handler import ExceptionHandlerResponse
 
 from skti_system_backend.models.v1.database.gallery import *
@@ -43,15 +60,19 @@ application.state.limiter = rate_limiter
 # ─────────────────────────────────────────────────────────────────────────────
 # Exception Handlers
 
-@application.exception_handler(RateLimitExceeded)
-async def rate_limit_handler(request: Request, exception: RateLimitExceeded):
+@application.exception_handler(RateLimitExceededException)
+async def rate_limit_handler(request: Request, exception: RateLimitExceededException):
     response = ExceptionHandlerResponse(
         status=False,
-        message="Rate limit exceeded. Try again later.",
+        message=exception.message,
         data={},
         status_code=429,
     )
-    return JSONResponse(content=response.model_dump(), status_code=429)
+    return JSONResponse(
+        content=response.model_dump(),
+        status_code=429,
+        headers={"Retry-After": str(math.ceil(exception.retry_after))},
+    )
 
 @application.exception_handler(InternalServerException)
 async def internal_error_handler(request: Request, exception: InternalServerException):
@@ -76,6 +97,18 @@ async def malformed_jwt_handler(request: Request, exception: MalformedJWTRequest
         },
     )
 
+@application.exception_handler(InvalidCursorException)
+@application.exception_handler(InvalidFieldsException)
+@application.exception_handler(InvalidIdsException)
+async def bad_request_handler(request: Request, exception: Exception):
+    response = ExceptionHandlerResponse(
+        status=False,
+        message=exception.message,
+        data={},
+        status_code=400,
+    )
+    return JSONResponse(content=response.model_dump(), status_code=400)
+
 @application.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
     body = await request.body()
@@ -94,40 +127,40 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
         content=payload,
     )
 
+# ─────────────────────────────────────────────────────────────────────────────
+# Database: close the per-thread connections and the pools on shutdown
+application.add_event_handler("shutdown", close_db_connections)
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Change watcher: how this process learns about the writes of the others,
+# read once before serving so the catalog version is known from the start
+async def start_change_watcher():
+    await run_db(change_watcher.poll)
+    change_watcher.start()
+
+application.add_event_handler("startup", start_change_watcher)
+
 # ─────────────────────────────────────────────────────────────────────────────
 # Middleware
+# Pure ASGI, innermost first: the content type check, the primary pinning
+# after writes when there are read replicas, then the request instrumentation
+# (query stats, metrics, request log) and CORS around everything. Rate
+# limiting is a router dependency, it needs the matched route.
 
-@application.middleware("http")
-async def enforce_content_type(request: Request, call_next):
-    if request.method in ("POST", "PUT", "PATCH"):
-        ct = request.headers.get("Content-Type", "")
-        allowed = [
-            "application/json",
-            "multipart/form-data",
-            "image/jpeg",
-            "image/png",
-            "application/x-www-form-urlencoded",
-        ]
-        if not any(ct.startswith(a) for a in allowed):
-            return JSONResponse(
-                status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
-                content={
-                    "status": False,
-                    "status_code": 415,
-                    "message": "Unsupported Media Type: use JSON, multipart/form-data, or images",
-                },
-            )
-    return await call_next(request)
-
-@application.middleware("http")
-async def log_requests(request: Request, call_next):
-    rid = "".join(random.choices(string.ascii_uppercase + string.digits, k=6))
-    logger.info(f"rid={rid} start path={request.url.path}")
-    start = time.time()
-    response = await call_next(request)
-    ms = (time.time() - start) * 1000
-    logger.info(f"rid={rid} completed_in={ms:.2f}ms status={response.status_code}")
-    return response
+install_query_tracking()
+
+application.add_middleware(ContentTypeMiddleware)
+if replica_aliases():
+    application.add_middleware(
+        PrimaryAfterWriteMiddleware,
+        sticky_seconds=postgres_config.POSTGRES_PRIMARY_STICKY_SECONDS,
+    )
+application.add_middleware(
+    InstrumentationMiddleware,
+    logger=logger,
+    stats_headers=api_config.QUERY_STATS_HEADERS,
+    strict_budget=api_config.QUERY_BUDGET_STRICT,
+)
 
 # ─────────────────────────────────────────────────────────────────────────────
 # CORS
@@ -143,7 +176,13 @@ if api_config.BACKEND_CORS_ORIGINS:
 
 # ─────────────────────────────────────────────────────────────────────────────
 # Include your API routes
-application.include_router(connect_router_v1, prefix=api_config.API_VER_STR_V1)
+# Every API route is rate limited, see utils.v1.rate_limit; the health check
+# and metrics stay reachable by probes and scrapers.
+application.include_router(
+    connect_router_v1,
+    prefix=api_config.API_VER_STR_V1,
+    dependencies=[Depends(enforce_rate_limit)],
+)
 
 @admin.register(Tag)
 class TagAdmin(admin.ModelAdmin):
@@ -163,9 +202,43 @@ class ArtworkAdmin(admin.ModelAdmin):
         'id', 'title', 'short_description', 'image_preview', 
         'category', 'display_tags', 'is_deleted', 'created_at',
     )
-    search_fields = ('title', 'category__name', 'tags__name')
-    list_filter = ('is_deleted', 'category', 'tags')
-    ordering = ('-created_at',)
+    list_select_related = ('category',)
+    # Prefix of the title or exact id, see get_search_results.
+    search_fields = ('title',)
+    search_help_text = 'Title prefix, or artwork ID'
+    list_filter = ('is_deleted', 'category', ArtworkTagFilter)
+    # Primary key order walks the primary key index; the created_at indexes
+    # only cover live artworks, the admin lists deleted ones too.
+    ordering = ('-id',)
+    paginator = EstimatedCountPaginator
+    # Spares the exact COUNT(*) of the whole table shown next to filtered results.
+    show_full_result_count = False
+    actions = ('restore_selected',)
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).defer('search_vector').prefetch_related(
+            Prefetch('tags', queryset=Tag.objects.only('id', 'name').order_by('id'))
+        )
+
+    def get_search_results(self, request, queryset, search_term):
+        # istartswith matches the UPPER(title) text_pattern_ops index of
+        # migration 0007, where icontains scans the whole table.
+        term = search_term.strip()
+        if not term:
+            return queryset, False
+        matches = Q(title__istartswith=term)
+        if term.isascii() and term.isdigit() and len(term) <= 18:
+            matches |= Q(pk=int(term))
+        return queryset.filter(matches), False
+
+    @admin.action(description='Restore selected artworks')
+    def restore_selected(self, request, queryset):
+        with transaction.atomic():
+            restored = 0
+            for artwork in queryset.filter(is_deleted=True):
+                artwork.restore()
+                restored += 1
+        self.message_user(request, f"Restored {restored} artwork(s).")
 
     def short_description(self, obj):
         if obj.description:
@@ -198,17 +271,35 @@ application.mount("/django", django_app)
 # Static & Media files
 application.mount(
     "/static",
-    StaticFiles(directory=os.path.abspath("./skti_system_backend/utils/v1/staticfiles")),
+    MediaFiles(
+        directory=os.path.abspath("./skti_system_backend/utils/v1/staticfiles"),
+        max_age=media_config.MEDIA_MAX_AGE,
+        immutable_max_age=media_config.MEDIA_IMMUTABLE_MAX_AGE,
+        precompressed=True,
+    ),
     name="static",
 )
 application.mount(
     "/media",
-    StaticFiles(directory=os.path.abspath("./skti_system_backend/utils/v1/mediafiles")),
+    MediaFiles(
+        directory=os.path.abspath("./skti_system_backend/utils/v1/mediafiles"),
+        max_age=media_config.MEDIA_MAX_AGE,
+        immutable_max_age=media_config.MEDIA_IMMUTABLE_MAX_AGE,
+    ),
     name="media",
 )
 
+# ─────────────────────────────────────────────────────────────────────────────
+# Prometheus metrics (GET)
+@application.get("/metrics", include_in_schema=False)
+@query_budget(0)
+def metrics():
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
 # ─────────────────────────────────────────────────────────────────────────────
 # Health‑check (GET)
 @application.get("/health-check")
+@query_budget(0)
 def health_check():
     return {"status": "OK", "service": api_config.PROJECT_NAME}
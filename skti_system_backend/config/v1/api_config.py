@@ -20,6 +20,42 @@ class APIConfig(BaseSettingsWrapper):
     :param API_VER_STR_V1: Version string for the API
     :type API_VER_STR_V1: str
 
+    :param DEFAULT_PAGE_SIZE: Page size used by paginated endpoints when no limit is given
+    :type DEFAULT_PAGE_SIZE: int
+
+    :param MAX_PAGE_SIZE: Upper bound for the limit accepted by paginated endpoints
+    :type MAX_PAGE_SIZE: int
+
+    :param FAST_SERIALIZATION: Render artwork listings straight from ORM rows with orjson instead of Pydantic models
+    :type FAST_SERIALIZATION: bool
+
+    :param TAG_INDEX_REFRESH_SECONDS: Minimum delay between full rebuilds of the tag bitmap index, made in the background when the writes of other processes cannot be applied in place
+    :type TAG_INDEX_REFRESH_SECONDS: float
+
+    :param CHANGE_POLL_SECONDS: How often each process reads the change counter to learn about writes made by other processes
+    :type CHANGE_POLL_SECONDS: float
+
+    :param QUERY_STATS_HEADERS: Expose the query count and database time of each request in response headers
+    :type QUERY_STATS_HEADERS: bool
+
+    :param QUERY_BUDGET_STRICT: Answer 500 instead of logging when an endpoint runs more queries than its budget
+    :type QUERY_BUDGET_STRICT: bool
+
+    :param EXPORT_CHUNK_SIZE: Rows fetched per round trip, and tags resolved per query, by the catalog export
+    :type EXPORT_CHUNK_SIZE: int
+
+    :param EXPORT_MAX_CONCURRENT: Catalog exports streamed at once per process, each holding a database connection
+    :type EXPORT_MAX_CONCURRENT: int
+
+    :param BATCH_MAX_IDS: Most artwork ids accepted by one call of the batch endpoint
+    :type BATCH_MAX_IDS: int
+
+    :param DATALOADER_WINDOW_MS: How long artwork lookups by id wait for others to share their query, in milliseconds
+    :type DATALOADER_WINDOW_MS: float
+
+    :param DATALOADER_MAX_BATCH_SIZE: Most ids loaded by one coalesced query, a full batch is sent without waiting. The ids of one /artworks request are never split, they may exceed it
+    :type DATALOADER_MAX_BATCH_SIZE: int
+
     :returns: Instance of APIConfig with specific settings
     :return type: APIConfig
     """
@@ -30,6 +66,24 @@ class APIConfig(BaseSettingsWrapper):
 
     REQUEST_PER_MIN: Optional[str] = "20/minute"
 
+    DEFAULT_PAGE_SIZE: int = 20
+    MAX_PAGE_SIZE: int = 100
+
+    FAST_SERIALIZATION: bool = True
+
+    TAG_INDEX_REFRESH_SECONDS: float = 5.0
+    CHANGE_POLL_SECONDS: float = 1.0
+
+    QUERY_STATS_HEADERS: bool = True
+    QUERY_BUDGET_STRICT: bool = False
+
+    EXPORT_CHUNK_SIZE: int = 2000
+    EXPORT_MAX_CONCURRENT: int = 2
+
+    BATCH_MAX_IDS: int = 100
+    DATALOADER_WINDOW_MS: float = 1.0
+    DATALOADER_MAX_BATCH_SIZE: int = 500
+
  
 
 api_config = APIConfig()
@@ -39,4 +93,4 @@ class DjangoAppConfig(AppConfig):
     name = api_config.PROJECT_NAME
 
     def ready(self):
-        pass
\ No newline at end of file
+        from skti_system_backend.models.v1.database import signals  # noqa: F401
@@ -0,0 +1,47 @@
+from typing import Optional
+
+from skti_system_backend.config.v1 import BaseSettingsWrapper
+
+
+class CacheConfig(BaseSettingsWrapper):
+    """
+    Configuration settings for the API response cache.
+
+    :param CACHE_BACKEND: Backend used to store cached responses, ``memory``, ``redis`` or ``none``.
+    :type CACHE_BACKEND: str
+
+    :param CACHE_REDIS_URL: Redis connection URL, used when CACHE_BACKEND is ``redis``.
+    :type CACHE_REDIS_URL: Optional[str]
+
+    :param CACHE_KEY_PREFIX: Prefix for every key written by the cache.
+    :type CACHE_KEY_PREFIX: str
+
+    :param CACHE_TTL_SECONDS: Upper bound on the lifetime of a cached response.
+    :type CACHE_TTL_SECONDS: int
+
+    :param CACHE_MAX_ENTRIES: Maximum number of responses held by the in-process backend.
+    :type CACHE_MAX_ENTRIES: int
+
+    :param CACHE_FILL_LOCK: Let a single worker of all those sharing the Redis backend render a missing response,
+        the others waiting for it to be cached. Identical requests of one worker always share a single render.
+    :type CACHE_FILL_LOCK: bool
+
+    :param CACHE_FILL_LOCK_TIMEOUT_SECONDS: How long workers wait for another one to cache a response before
+        rendering it themselves, also the lifetime of the lock.
+    :type CACHE_FILL_LOCK_TIMEOUT_SECONDS: float
+
+    :param CACHE_FILL_LOCK_POLL_SECONDS: Delay between two looks at the cache of a waiting worker.
+    :type CACHE_FILL_LOCK_POLL_SECONDS: float
+    """
+
+    CACHE_BACKEND: str = "memory"
+    CACHE_REDIS_URL: Optional[str] = "redis://localhost:6379/0"
+    CACHE_KEY_PREFIX: str = "skti"
+    CACHE_TTL_SECONDS: int = 300
+    CACHE_MAX_ENTRIES: int = 1024
+    CACHE_FILL_LOCK: bool = False
+    CACHE_FILL_LOCK_TIMEOUT_SECONDS: float = 5.0
+    CACHE_FILL_LOCK_POLL_SECONDS: float = 0.05
+
+
+cache_config = CacheConfig()
@@ -19,6 +19,40 @@ class PostgresConfig(BaseSettingsWrapper):
 
     :param POSTGRES_PORT: Port for PostgreSQL connection, Optional. Default is 5432.
     :type POSTGRES_PORT: Optional[int]
+
+    :param POSTGRES_POOL: Use a psycopg 3 connection pool. Ignored when psycopg_pool is not installed.
+    :type POSTGRES_POOL: bool
+
+    :param POSTGRES_POOL_MIN_SIZE: Connections the pool keeps open when idle.
+    :type POSTGRES_POOL_MIN_SIZE: int
+
+    :param POSTGRES_POOL_MAX_SIZE: Most connections the pool opens; also the number of database threads per process.
+    :type POSTGRES_POOL_MAX_SIZE: int
+
+    :param POSTGRES_POOL_TIMEOUT: Seconds to wait for a free pooled connection before failing.
+    :type POSTGRES_POOL_TIMEOUT: float
+
+    :param POSTGRES_POOL_MAX_LIFETIME: Seconds after which a pooled connection is replaced.
+    :type POSTGRES_POOL_MAX_LIFETIME: float
+
+    :param POSTGRES_CONN_MAX_AGE: Lifetime, in seconds, of persistent connections when not pooling.
+    :type POSTGRES_CONN_MAX_AGE: int
+
+    :param POSTGRES_CONN_HEALTH_CHECKS: Check a connection is usable before reusing it.
+    :type POSTGRES_CONN_HEALTH_CHECKS: bool
+
+    :param POSTGRES_REPLICA_HOSTS: Comma separated ``host[:port]`` of read replicas, Optional. They share the
+        credentials and database name of the primary.
+    :type POSTGRES_REPLICA_HOSTS: Optional[str]
+
+    :param POSTGRES_REPLICA_MAX_LAG: Seconds of replication lag past which a replica stops serving reads.
+    :type POSTGRES_REPLICA_MAX_LAG: float
+
+    :param POSTGRES_REPLICA_CHECK_SECONDS: Interval between two health and lag checks of the replicas.
+    :type POSTGRES_REPLICA_CHECK_SECONDS: float
+
+    :param POSTGRES_PRIMARY_STICKY_SECONDS: Seconds a client reads from the primary after one of its writes.
+    :type POSTGRES_PRIMARY_STICKY_SECONDS: float
     """
 
     POSTGRES_DB_NAME: str = "artwork_db_9y4i"
@@ -27,5 +61,18 @@ class PostgresConfig(BaseSettingsWrapper):
     POSTGRES_PASSWORD: Optional[str]
     POSTGRES_PORT: Optional[int] = 5432
 
+    POSTGRES_POOL: bool = True
+    POSTGRES_POOL_MIN_SIZE: int = 2
+    POSTGRES_POOL_MAX_SIZE: int = 10
+    POSTGRES_POOL_TIMEOUT: float = 10.0
+    POSTGRES_POOL_MAX_LIFETIME: float = 1800.0
+    POSTGRES_CONN_MAX_AGE: int = 60
+    POSTGRES_CONN_HEALTH_CHECKS: bool = True
+
+    POSTGRES_REPLICA_HOSTS: Optional[str] = None
+    POSTGRES_REPLICA_MAX_LAG: float = 2.0
+    POSTGRES_REPLICA_CHECK_SECONDS: float = 5.0
+    POSTGRES_PRIMARY_STICKY_SECONDS: float = 10.0
+
 
 postgres_config = PostgresConfig()
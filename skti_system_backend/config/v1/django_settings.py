@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/5.0/ref/settings/
 """
 
 import os
+import importlib.util
 from pathlib import Path
 
 from skti_system_backend.config.v1 import authentication_config
@@ -39,6 +40,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "skti_system_backend.config.v1.api_config.DjangoAppConfig",
 ]
 
@@ -78,6 +80,13 @@ TEMPLATES = [
 # Database
 # https://docs.djangoproject.com/en/5.0/ref/settings/#databases
 
+# With psycopg 3 and psycopg_pool installed, connections come from a pool
+# (Django 5.1+); pooling and persistent connections are mutually exclusive.
+# Otherwise each database thread keeps its connection for CONN_MAX_AGE.
+# Either way the number of database threads per process is bounded by
+# POSTGRES_POOL_MAX_SIZE, see utils.v1.db.
+USE_DB_POOL = postgres_config.POSTGRES_POOL and importlib.util.find_spec("psycopg_pool") is not None
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.postgresql',
@@ -86,9 +95,35 @@ DATABASES = {
         'PASSWORD': postgres_config.POSTGRES_PASSWORD,
         'HOST': postgres_config.POSTGRES_HOST,
         'PORT': postgres_config.POSTGRES_PORT,
+        'CONN_MAX_AGE': 0 if USE_DB_POOL else postgres_config.POSTGRES_CONN_MAX_AGE,
+        'CONN_HEALTH_CHECKS': postgres_config.POSTGRES_CONN_HEALTH_CHECKS,
+        'OPTIONS': {
+            'pool': {
+                'min_size': postgres_config.POSTGRES_POOL_MIN_SIZE,
+                'max_size': postgres_config.POSTGRES_POOL_MAX_SIZE,
+                'timeout': postgres_config.POSTGRES_POOL_TIMEOUT,
+                'max_lifetime': postgres_config.POSTGRES_POOL_MAX_LIFETIME,
+            },
+        } if USE_DB_POOL else {},
     }
 }
 
+# Read replicas, ``replica_1``, ``replica_2``... in the order configured. Only
+# the gallery endpoints read from them, see utils.v1.db_router.
+DATABASE_REPLICAS = []
+for index, replica in enumerate(filter(None, (postgres_config.POSTGRES_REPLICA_HOSTS or "").split(",")), 1):
+    host, _, port = replica.strip().partition(":")
+    alias = f"replica_{index}"
+    DATABASES[alias] = {
+        **DATABASES['default'],
+        'HOST': host,
+        'PORT': int(port) if port else postgres_config.POSTGRES_PORT,
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ["skti_system_backend.utils.v1.db_router.PrimaryReplicaRouter"]
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
@@ -134,6 +169,12 @@ USE_TZ = True  # Keep this as True to store timestamps in UTC and convert them t
 STATIC_URL = "/static/"
 STATIC_ROOT = os.path.join(BASE_DIR.parent, "utils/v1/staticfiles")
 
+# Static URLs name the content hashed copies written by ``compress_static``.
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": "skti_system_backend.utils.v1.static.HashedStaticFilesStorage"},
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.0/ref/settings/#default-auto-field
 
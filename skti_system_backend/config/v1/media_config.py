@@ -0,0 +1,46 @@
+from skti_system_backend.config.v1 import BaseSettingsWrapper
+
+
+class MediaConfig(BaseSettingsWrapper):
+    """
+    Configuration settings for serving artwork images.
+
+    :param IMAGE_DERIVATIVES_DIR: Directory under MEDIA_ROOT holding generated derivatives.
+    :type IMAGE_DERIVATIVES_DIR: str
+
+    :param IMAGE_DERIVATIVES_MAX_BYTES: Size the derivative cache is trimmed back to, least recently used first.
+    :type IMAGE_DERIVATIVES_MAX_BYTES: int
+
+    :param IMAGE_MAX_WIDTH: Largest width a derivative can be requested at.
+    :type IMAGE_MAX_WIDTH: int
+
+    :param IMAGE_DEFAULT_QUALITY: Encoder quality used when the request does not set one.
+    :type IMAGE_DEFAULT_QUALITY: int
+
+    :param IMAGE_WORKERS: Number of processes resizing images.
+    :type IMAGE_WORKERS: int
+
+    :param IMAGE_RATE_LIMIT: Rate limit of /images per client, in place of ``APIConfig.REQUEST_PER_MIN``: a
+        gallery page requests one derivative per thumbnail, all counted against this one bucket.
+        ``unlimited`` exempts the route.
+    :type IMAGE_RATE_LIMIT: str
+
+    :param MEDIA_MAX_AGE: Cache-Control max-age, in seconds, of /media and /static files.
+    :type MEDIA_MAX_AGE: int
+
+    :param MEDIA_IMMUTABLE_MAX_AGE: Cache-Control max-age, in seconds, of content addressed files.
+    :type MEDIA_IMMUTABLE_MAX_AGE: int
+    """
+
+    IMAGE_DERIVATIVES_DIR: str = "derivatives"
+    IMAGE_DERIVATIVES_MAX_BYTES: int = 512 * 1024 * 1024
+    IMAGE_MAX_WIDTH: int = 2048
+    IMAGE_DEFAULT_QUALITY: int = 80
+    IMAGE_WORKERS: int = 2
+    IMAGE_RATE_LIMIT: str = "600/minute"
+
+    MEDIA_MAX_AGE: int = 3600
+    MEDIA_IMMUTABLE_MAX_AGE: int = 365 * 24 * 3600
+
+
+media_config = MediaConfig()
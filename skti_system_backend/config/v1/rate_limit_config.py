@@ -0,0 +1,69 @@
+from typing import Optional
+
+from skti_system_backend.config.v1 import BaseSettingsWrapper
+
+
+class RateLimitConfig(BaseSettingsWrapper):
+    """
+    Configuration settings for the API rate limiter.
+
+    Every /api/v1 route admits ``APIConfig.REQUEST_PER_MIN`` (``20/minute``
+    by default) per client, counted separately per route template, so
+    every path under one template shares a bucket. Endpoints set their own
+    with ``@rate_limit``, e.g. /images at ``MediaConfig.IMAGE_RATE_LIMIT``;
+    RATE_LIMIT_ROUTES and RATE_LIMIT_KEYS override both.
+
+    :param RATE_LIMIT_ENABLED: Whether requests are rate limited at all.
+    :type RATE_LIMIT_ENABLED: bool
+
+    :param RATE_LIMIT_BACKEND: Where the counters live: ``memory`` (per process), ``shared`` (shared memory,
+        every worker of one host) or ``redis`` (every host).
+    :type RATE_LIMIT_BACKEND: str
+
+    :param RATE_LIMIT_REDIS_URL: Redis connection URL, used when RATE_LIMIT_BACKEND is ``redis``.
+    :type RATE_LIMIT_REDIS_URL: Optional[str]
+
+    :param RATE_LIMIT_SHARED_PATH: File backing the shared memory table, preferably on a tmpfs such as /dev/shm.
+    :type RATE_LIMIT_SHARED_PATH: str
+
+    :param RATE_LIMIT_SHARED_SLOTS: Number of clients the shared memory table tracks at once.
+    :type RATE_LIMIT_SHARED_SLOTS: int
+
+    :param RATE_LIMIT_MAX_ENTRIES: Number of clients the in-process backend tracks at once.
+    :type RATE_LIMIT_MAX_ENTRIES: int
+
+    :param RATE_LIMIT_KEY_PREFIX: Prefix for every key written by the Redis backend.
+    :type RATE_LIMIT_KEY_PREFIX: str
+
+    :param RATE_LIMIT_KEY_HEADER: Header identifying the client, e.g. ``X-API-Key``. Only values listed in
+        RATE_LIMIT_API_KEYS are trusted, clients sending none of them are identified by their address, as are
+        all clients when it is left None.
+    :type RATE_LIMIT_KEY_HEADER: Optional[str]
+
+    :param RATE_LIMIT_API_KEYS: API keys accepted in RATE_LIMIT_KEY_HEADER, separated by ``;``.
+    :type RATE_LIMIT_API_KEYS: Optional[str]
+
+    :param RATE_LIMIT_ROUTES: Per route limits, ``route=rate`` pairs separated by ``;``, e.g.
+        ``/api/v1/search=10/minute``. Routes are path templates.
+    :type RATE_LIMIT_ROUTES: Optional[str]
+
+    :param RATE_LIMIT_KEYS: Per client limits taking precedence over every route limit, ``key=rate`` pairs
+        separated by ``;``, a key being an address or one of RATE_LIMIT_API_KEYS. A rate of ``unlimited``
+        exempts the client.
+    :type RATE_LIMIT_KEYS: Optional[str]
+    """
+
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_BACKEND: str = "shared"
+    RATE_LIMIT_REDIS_URL: Optional[str] = "redis://localhost:6379/0"
+    RATE_LIMIT_SHARED_PATH: str = "/dev/shm/skti_rate_limit"
+    RATE_LIMIT_SHARED_SLOTS: int = 65536
+    RATE_LIMIT_MAX_ENTRIES: int = 65536
+    RATE_LIMIT_KEY_PREFIX: str = "skti:ratelimit"
+    RATE_LIMIT_KEY_HEADER: Optional[str] = None
+    RATE_LIMIT_API_KEYS: Optional[str] = None
+    RATE_LIMIT_ROUTES: Optional[str] = None
+    RATE_LIMIT_KEYS: Optional[str] = None
+
+
+rate_limit_config = RateLimitConfig()
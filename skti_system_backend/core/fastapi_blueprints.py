@@ -4,8 +4,12 @@ from skti_system_backend.core import connect_router
 from skti_system_backend.core.v1.api.gallery import (
     router as authentication_router_v1,
 )
+from skti_system_backend.core.v1.api.media import (
+    router as media_router_v1,
+)
 
 
 
 # Router Inclusions
 connect_router.include_router(authentication_router_v1)
+connect_router.include_router(media_router_v1)
@@ -1,4 +1,3 @@
-from slowapi import Limiter
-from slowapi.util import get_remote_address
+from skti_system_backend.utils.v1.rate_limit import create_rate_limiter
 
-limiter = Limiter(key_func=get_remote_address)
+limiter = create_rate_limiter()
@@ -1,21 +1,201 @@
-from fastapi import APIRouter, Request, Response
-from asgiref.sync import sync_to_async
+from functools import partial
+from typing import Literal, Optional
 
+from fastapi import APIRouter, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from django.db.models import Prefetch
+
+from skti_system_backend.config.v1.api_config import api_config
+
+from skti_system_backend.core.v1.workflow.gallery import (
+    artwork_serializer,
+    fetch_tag_names,
+    iter_artwork_export,
+    load_artwork_data,
+    load_artwork_data_by_id,
+    load_changes,
+    load_facets,
+)
 from skti_system_backend.models.v1.api.gallery import(
+    ArtworkResponse,
+    ArtworksBatchResponse,
     ArtworksResponse,
-    CategoriesResponse
+    CategoriesResponse,
+    ChangesResponse,
+    FacetsResponse,
+    SearchResponse
 )
 from skti_system_backend.models.v1.database.gallery import (
     Artwork,
-    Category
+    Category,
+    Tag
+)
+from skti_system_backend.utils.v1.cache import (
+    ARTWORK_SCOPE,
+    CATEGORY_SCOPE,
+    TAG_SCOPE,
+    CachedResponse,
+    artwork_category_scope,
+    response_cache,
+)
+from skti_system_backend.utils.v1.changes import decode_change_cursor, encode_change_cursor
+from skti_system_backend.utils.v1.dataloader import DataLoader
+from skti_system_backend.utils.v1.db import run_db, run_db_read, stream_db
+from skti_system_backend.utils.v1.db_router import primary_pinned
+from skti_system_backend.utils.v1.etag import (
+    catalog_version,
+    conditional_etag,
+    is_not_modified,
+    make_etag,
+    not_modified_response,
+)
+from skti_system_backend.utils.v1.pagination import decode_cursor, encode_cursor, keyset_page, split_page
+from skti_system_backend.utils.v1.query_stats import query_budget
+from skti_system_backend.utils.v1.search import search_artwork_ids
+from skti_system_backend.utils.v1.serialization import (
+    dump_artworks_response,
+    dump_json,
+    parse_artwork_fields,
+    parse_artwork_ids,
+    parse_tag_names,
 )
+from skti_system_backend.utils.v1.tag_index import tag_index
 
 router = APIRouter(tags=["Artworks"])
 
+
+async def _build_tag_index():
+    await run_db(tag_index.build)
+
+router.add_event_handler("startup", _build_tag_index)
+
+
+async def _cached_json(request, name, scopes, params, render, version=None):
+    """
+    Serve a catalog read: a 304 when the client holds the current ETag, else
+    the cached response, else ``render()`` run on the database executor,
+    which identical concurrent misses share.
+
+    :param name: Endpoint name, part of the ETag and of the cache key
+    :param scopes: Data the response depends on, see ``ResponseCache``
+    :param params: Every parameter the response depends on
+    :param render: Callable returning the ``CachedResponse``
+    :param version: Catalog version already read by the caller, read here otherwise
+    """
+    if version is None:
+        version = await catalog_version()
+    etag = make_etag(name, params, version) if version is not None else None
+    if etag and is_not_modified(request, etag):
+        return not_modified_response(etag)
+
+    cache_key = await response_cache.build_key(name, scopes, params)
+    cached = await response_cache.get(cache_key)
+    if cached is None:
+        cached = await response_cache.fill(cache_key, partial(run_db_read, render))
+    # A response that may predate ``version`` is served once, never validated.
+    return cached.to_response({"ETag": etag} if etag and cached.cacheable else None)
+
+
+def _artwork_to_dict(artwork):
+    return {
+        "id": artwork.id,
+        "title": artwork.title,
+        "description": artwork.description,
+        "category": artwork.category.name if artwork.category else None,
+        "image_url": artwork.image.url if artwork.image else None,
+        "tags": [tag.name for tag in artwork.tags.all()],
+        "is_deleted": artwork.is_deleted,
+        "created_at": artwork.created_at.isoformat(),
+        "updated_at": artwork.updated_at.isoformat()
+    }
+
+
+def _render_artworks(queryset, cursor, limit, message, not_found_message, fields=None):
+    """
+    Load one page of ``queryset`` and render the ``ArtworksResponse`` body.
+
+    Runs on the database executor, so both the query and the serialization stay off
+    the event loop. Sparse fieldsets cannot be expressed by ``ArtworkData``,
+    so they always take the row serializer.
+    """
+    if api_config.FAST_SERIALIZATION or fields:
+        return _render_artworks_fast(queryset, cursor, limit, message, not_found_message, fields)
+
+    artworks = list(
+        keyset_page(
+            queryset.select_related('category').prefetch_related(
+                Prefetch('tags', queryset=Tag.objects.order_by('id'))
+            ),
+            cursor,
+            limit
+        )
+    )
+    if not artworks:
+        result = ArtworksResponse(status=False, message=not_found_message, data=[], status_code=404)
+    else:
+        artworks, next_cursor = split_page(artworks, limit)
+        result = ArtworksResponse(
+            status=True,
+            message=message,
+            data=[_artwork_to_dict(artwork) for artwork in artworks],
+            next_cursor=next_cursor,
+            status_code=200
+        )
+    return CachedResponse(result.status_code, result.model_dump_json().encode())
+
+
+def _render_artworks_fast(queryset, cursor, limit, message, not_found_message, fields=None):
+    """
+    Same output as :func:`_render_artworks`, built straight from ``values_list``
+    tuples with no Pydantic validation.
+
+    Only the columns behind ``fields`` are selected, the category join only
+    happens when ``category`` is requested and the tag query only when
+    ``tags`` is.
+    """
+    serializer = artwork_serializer(fields)
+    rows = list(keyset_page(queryset.values_list(*serializer.columns), cursor, limit))
+    if not rows:
+        return CachedResponse(404, dump_artworks_response(False, not_found_message, [], 404))
+
+    rows, next_cursor = split_page(rows, limit, serializer.position)
+    tags_by_id = fetch_tag_names(row[0] for row in rows) if serializer.needs_tags else {}
+    data = serializer.to_data(rows, tags_by_id)
+    return CachedResponse(200, dump_artworks_response(True, message, data, 200, next_cursor))
+
+
+def _render_categories():
+    categories = [
+        {
+            "id": category.id,
+            "name": category.name,
+            "created_at": category.created_at.isoformat(),
+            "updated_at": category.updated_at.isoformat()
+        } for category in Category.objects.all()
+    ]
+
+    if not categories:
+        result = CategoriesResponse(
+            status=False,
+            message="No categories found",
+            data=[],
+            status_code=404
+        )
+    else:
+        result = CategoriesResponse(
+            status=True,
+            message="Categories retrieved successfully",
+            data=categories,
+            status_code=200
+        )
+    return CachedResponse(result.status_code, result.model_dump_json().encode())
+
+
 @router.get(
     "/get_all_categories",
     response_model=CategoriesResponse
 )
+@query_budget(1)
 async def get_all_categories(
     request: Request,
     response: Response
@@ -24,127 +204,424 @@ async def get_all_categories(
     Get all categories.
     """
 
-    categories = await sync_to_async(list)(
-        Category.objects.all()
-    )
-    
-    if not categories:
-        response.status_code = 404
-        return {
-            "status": False,
-            "message": "No categories found",
-            "data": [],
-            "status_code": 404
-        }
-
-    categories_list = [
-        {
-            "id": category.id,
-            "name": category.name,
-            "created_at": category.created_at.isoformat(),
-            "updated_at": category.updated_at.isoformat()
-        } for category in categories
-    ]
-    
-    return CategoriesResponse(
-        status=True,
-        message="Categories retrieved successfully",
-        data=categories_list,
-        status_code=200
-    )
+    return await _cached_json(request, "get_all_categories", (CATEGORY_SCOPE,), {}, _render_categories)
 
 @router.get(
     "/get_all_artworks",
     response_model=ArtworksResponse
 )
+@query_budget(2)
 async def get_all_artworks(
     request: Request,
-    response: Response
+    response: Response,
+    limit: int = Query(api_config.DEFAULT_PAGE_SIZE, ge=1, le=api_config.MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = Query(None, description="Comma separated subset of artwork fields to return")
 ):
     """
-    Get all artworks.
-    """
+    Get all artworks, newest first, one page at a time.
 
-    artworks = await sync_to_async(list)(
-        Artwork.objects.select_related('category').prefetch_related('tags').filter(is_deleted=False)
-    )
-    
-    if not artworks:
-        response.status_code = 404
-        return {
-            "status": False,
-            "message": "No artworks found",
-            "data": [],
-            "status_code": 404
-        }
+    Pass the returned ``next_cursor`` back as ``cursor`` to fetch the next page,
+    and ``fields`` (e.g. ``id,title,image_url``) to receive only those fields.
+    """
 
-    artworks_list = [
-        {
-            "id": artwork.id,
-            "title": artwork.title,
-            "description": artwork.description,
-            "category": artwork.category.name if artwork.category else None,
-            "image_url": artwork.image.url if artwork.image else None,
-            "tags": [tag.name for tag in artwork.tags.all()],
-            "is_deleted": artwork.is_deleted,
-            "created_at": artwork.created_at.isoformat(),
-            "updated_at": artwork.updated_at.isoformat()
-        } for artwork in artworks
-    ]
-    
-    return ArtworksResponse(
-        status=True,
-        message="Artworks retrieved successfully",
-        data=artworks_list,
-        status_code=200
+    fields = parse_artwork_fields(fields)
+    params = {"limit": limit, "cursor": cursor, "fields": fields}
+    return await _cached_json(
+        request,
+        "get_all_artworks",
+        (ARTWORK_SCOPE, CATEGORY_SCOPE, TAG_SCOPE),
+        params,
+        partial(
+            _render_artworks,
+            Artwork.objects.all(),
+            cursor,
+            limit,
+            "Artworks retrieved successfully",
+            "No artworks found",
+            fields
+        )
     )
 
 @router.get(
     "/get_artworks_by_category/{category_id}",
     response_model=ArtworksResponse
 )
+@query_budget(2)
 async def get_artworks_by_category(
     category_id: int,
     request: Request,
-    response: Response
+    response: Response,
+    limit: int = Query(api_config.DEFAULT_PAGE_SIZE, ge=1, le=api_config.MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = Query(None, description="Comma separated subset of artwork fields to return")
 ):
     """
-    Get all artworks for a particular category.
+    Get all artworks for a particular category, newest first, one page at a time.
+
+    Pass the returned ``next_cursor`` back as ``cursor`` to fetch the next page,
+    and ``fields`` (e.g. ``id,title,image_url``) to receive only those fields.
     """
 
-    artworks = await sync_to_async(list)(
-        Artwork.objects.select_related('category').prefetch_related('tags').filter(
-            is_deleted=False, 
-            category_id=category_id
+    fields = parse_artwork_fields(fields)
+    params = {"category_id": category_id, "limit": limit, "cursor": cursor, "fields": fields}
+    return await _cached_json(
+        request,
+        "get_artworks_by_category",
+        (artwork_category_scope(category_id), CATEGORY_SCOPE, TAG_SCOPE),
+        params,
+        partial(
+            _render_artworks,
+            Artwork.objects.filter(category_id=category_id),
+            cursor,
+            limit,
+            f"Artworks for category ID {category_id} retrieved successfully",
+            f"No artworks found for category ID {category_id}",
+            fields
         )
     )
-    
-    if not artworks:
-        response.status_code = 404
-        return {
+
+def _render_search(query, offset, limit, fields=None):
+    """Rank one window of matches and hydrate them in rank order."""
+    ranked = search_artwork_ids(query, offset, limit + 1)
+    next_offset = offset + limit if len(ranked) > limit else None
+    data = load_artwork_data([artwork_id for artwork_id, _ in ranked[:limit]], fields)
+    if not data:
+        status, message, status_code = False, f"No artworks found for '{query}'", 404
+    else:
+        status, message, status_code = True, "Artworks retrieved successfully", 200
+    return CachedResponse(status_code, dump_json({
+        "status": status,
+        "message": message,
+        "data": data,
+        "status_code": status_code,
+        "next_offset": next_offset,
+    }))
+
+@router.get(
+    "/search",
+    response_model=SearchResponse
+)
+# Ranking, page rows and their tags, plus three when the in-memory index is built.
+@query_budget(5)
+async def search_artworks(
+    request: Request,
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200, description="Words to look for in titles, descriptions and tags"),
+    limit: int = Query(api_config.DEFAULT_PAGE_SIZE, ge=1, le=api_config.MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0, le=10_000),
+    fields: Optional[str] = Query(None, description="Comma separated subset of artwork fields to return")
+):
+    """
+    Search artworks by title, description and tag names, best match first.
+
+    Title matches rank above description matches, which rank above tag
+    matches. Pass the returned ``next_offset`` back as ``offset`` to fetch
+    the next page.
+    """
+
+    fields = parse_artwork_fields(fields)
+    params = {"q": q, "limit": limit, "offset": offset, "fields": fields}
+    return await _cached_json(
+        request,
+        "search_artworks",
+        (ARTWORK_SCOPE, CATEGORY_SCOPE, TAG_SCOPE),
+        params,
+        partial(_render_search, q, offset, limit, fields)
+    )
+
+def _render_tag_filter(version, all_tags, any_tags, exclude_tags, cursor, limit, fields=None):
+    """
+    Resolve the tag expression on the bitmap index and hydrate only the page.
+
+    The page is not cacheable when the index did not match ``version``.
+    """
+    current = tag_index.ensure_current(version)
+    bitmap = tag_index.match(all_tags, any_tags, exclude_tags)
+    rows = tag_index.page(bitmap, decode_cursor(cursor) if cursor else None, limit + 1)
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        artwork_id, created_at = rows[-1]
+        next_cursor = encode_cursor(created_at, artwork_id)
+
+    data = load_artwork_data([artwork_id for artwork_id, _ in rows], fields)
+    if not data:
+        body = dump_artworks_response(False, "No artworks found for these tags", [], 404)
+        return CachedResponse(404, body, cacheable=current)
+    body = dump_artworks_response(True, "Artworks retrieved successfully", data, 200, next_cursor)
+    return CachedResponse(200, body, cacheable=current)
+
+@router.get(
+    "/get_artworks_by_tags",
+    response_model=ArtworksResponse
+)
+# Page rows and their tags, plus four when the tag index is built on first use.
+@query_budget(6)
+async def get_artworks_by_tags(
+    request: Request,
+    response: Response,
+    all_tags: Optional[str] = Query(None, alias="all", description="Comma separated tags an artwork must all carry"),
+    any_tags: Optional[str] = Query(None, alias="any", description="Comma separated tags an artwork must carry at least one of"),
+    exclude_tags: Optional[str] = Query(None, alias="not", description="Comma separated tags an artwork must not carry"),
+    limit: int = Query(api_config.DEFAULT_PAGE_SIZE, ge=1, le=api_config.MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = Query(None, description="Comma separated subset of artwork fields to return")
+):
+    """
+    Get artworks by tag, newest first, one page at a time, e.g.
+    ``?all=Abstract,Monochrome&not=Digital``.
+
+    ``all``, ``any`` and ``not`` combine with AND; tag names are exact and
+    unknown names match nothing. Pass the returned ``next_cursor`` back as
+    ``cursor`` to fetch the next page.
+    """
+
+    fields = parse_artwork_fields(fields)
+    all_tags, any_tags, exclude_tags = (
+        parse_tag_names(all_tags), parse_tag_names(any_tags), parse_tag_names(exclude_tags)
+    )
+    params = {
+        "all": all_tags, "any": any_tags, "not": exclude_tags,
+        "limit": limit, "cursor": cursor, "fields": fields
+    }
+    version = await catalog_version()
+    return await _cached_json(
+        request,
+        "get_artworks_by_tags",
+        (ARTWORK_SCOPE, CATEGORY_SCOPE, TAG_SCOPE),
+        params,
+        partial(_render_tag_filter, version, all_tags, any_tags, exclude_tags, cursor, limit, fields),
+        version
+    )
+
+
+def _json_response(body, etag=None):
+    return Response(
+        content=dump_json(body),
+        status_code=body["status_code"],
+        headers={"ETag": etag} if etag else None,
+        media_type="application/json",
+    )
+
+
+# One loader per projection, and apart for requests whose reads must stay on
+# the primary, so a batch never mixes what its requests may see.
+_artwork_loaders = {}
+
+
+def _artwork_loader(fields):
+    pinned = primary_pinned()
+    loader = _artwork_loaders.get((fields, pinned))
+    if loader is None:
+        run = run_db if pinned else run_db_read
+
+        async def load_batch(artwork_ids):
+            return await run(load_artwork_data_by_id, artwork_ids, fields)
+
+        loader = _artwork_loaders[(fields, pinned)] = DataLoader(
+            load_batch,
+            api_config.DATALOADER_WINDOW_MS / 1000,
+            api_config.DATALOADER_MAX_BATCH_SIZE,
+        )
+    return loader
+
+@router.get(
+    "/artworks",
+    response_model=ArtworksBatchResponse
+)
+# Rows and their tags, shared with the concurrent lookups of the same batch.
+@query_budget(2)
+async def get_artworks_by_ids(
+    request: Request,
+    response: Response,
+    ids: str = Query(..., description="Comma separated artwork ids, e.g. 12,7,31"),
+    fields: Optional[str] = Query(None, description="Comma separated subset of artwork fields to return")
+):
+    """
+    Get any number of artworks, up to ``BATCH_MAX_IDS``, in the order of ``ids``.
+
+    Ids that do not exist or belong to deleted artworks are listed in
+    ``missing``. Lookups from concurrent requests are resolved together,
+    in one query for the rows and one for their tags.
+    """
+
+    artwork_ids = parse_artwork_ids(ids, api_config.BATCH_MAX_IDS)
+    fields = parse_artwork_fields(fields)
+    etag = await conditional_etag(request, "get_artworks_by_ids", {"ids": artwork_ids, "fields": fields})
+    if etag and is_not_modified(request, etag):
+        return not_modified_response(etag)
+
+    artworks = await _artwork_loader(fields).load_many(artwork_ids)
+    data = [artwork for artwork in artworks if artwork is not None]
+    missing = [artwork_id for artwork_id, artwork in zip(artwork_ids, artworks) if artwork is None]
+    if not data:
+        # A 404 is not validated, the artworks may be created at any time.
+        status, message, status_code, etag = False, "No artworks found for these ids", 404, None
+    else:
+        status, message, status_code = True, "Artworks retrieved successfully", 200
+    return _json_response({
+        "status": status,
+        "message": message,
+        "data": data,
+        "status_code": status_code,
+        "missing": missing,
+    }, etag)
+
+@router.get(
+    "/artworks/{artwork_id}",
+    response_model=ArtworkResponse
+)
+@query_budget(2)
+async def get_artwork(
+    artwork_id: int,
+    request: Request,
+    response: Response,
+    fields: Optional[str] = Query(None, description="Comma separated subset of artwork fields to return")
+):
+    """
+    Get one artwork. Concurrent lookups, from this route or the batch
+    route, are resolved together in one query.
+    """
+
+    fields = parse_artwork_fields(fields)
+    etag = await conditional_etag(request, "get_artwork", {"artwork_id": artwork_id, "fields": fields})
+    if etag and is_not_modified(request, etag):
+        return not_modified_response(etag)
+
+    artwork = await _artwork_loader(fields).load(artwork_id)
+    if artwork is None:
+        return _json_response({
             "status": False,
-            "message": f"No artworks found for category ID {category_id}",
-            "data": [],
-            "status_code": 404
-        }
+            "message": f"No artwork found for ID {artwork_id}",
+            "data": None,
+            "status_code": 404,
+        })
+    return _json_response({
+        "status": True,
+        "message": "Artwork retrieved successfully",
+        "data": artwork,
+        "status_code": 200,
+    }, etag)
 
-    artworks_list = [
-        {
-            "id": artwork.id,
-            "title": artwork.title,
-            "description": artwork.description,
-            "category": artwork.category.name if artwork.category else None,
-            "image_url": artwork.image.url if artwork.image else None,
-            "tags": [tag.name for tag in artwork.tags.all()],
-            "is_deleted": artwork.is_deleted,
-            "created_at": artwork.created_at.isoformat(),
-            "updated_at": artwork.updated_at.isoformat()
-        } for artwork in artworks
-    ]
-    
-    return ArtworksResponse(
-        status=True,
-        message=f"Artworks for category ID {category_id} retrieved successfully",
-        data=artworks_list,
-        status_code=200
-    )
\ No newline at end of file
+def _render_changes(position, limit):
+    changes, last_position, has_more = load_changes(position, limit)
+    return CachedResponse(200, dump_json({
+        "status": True,
+        "message": "Changes retrieved successfully",
+        "data": changes,
+        "status_code": 200,
+        "next_since": encode_change_cursor(last_position),
+        "has_more": has_more,
+    }))
+
+@router.get(
+    "/changes",
+    response_model=ChangesResponse
+)
+# Categories, artworks, their tags and tombstones.
+@query_budget(4)
+async def get_changes(
+    request: Request,
+    response: Response,
+    since: Optional[str] = Query(None, description="The next_since of the previous call, omit it for a full sync"),
+    limit: int = Query(api_config.MAX_PAGE_SIZE, ge=1, le=api_config.MAX_PAGE_SIZE)
+):
+    """
+    Get the artworks and categories created, updated or deleted since the
+    last call, oldest change first.
+
+    Store the returned ``next_since`` and pass it back as ``since``; while
+    ``has_more`` is true, call again right away. Deletes carry no ``data``.
+    Tag changes and category renames count as updates of the artworks they
+    affect.
+    """
+
+    position = decode_change_cursor(since)
+    params = {"since": since, "limit": limit}
+    return await _cached_json(
+        request,
+        "get_changes",
+        (ARTWORK_SCOPE, CATEGORY_SCOPE, TAG_SCOPE),
+        params,
+        partial(_render_changes, position, limit)
+    )
+
+
+def _render_facets(min_count):
+    return CachedResponse(200, dump_json({
+        "status": True,
+        "message": "Facets retrieved successfully",
+        "data": load_facets(min_count),
+        "status_code": 200,
+    }))
+
+@router.get(
+    "/facets",
+    response_model=FacetsResponse
+)
+# Category counts and tag counts.
+@query_budget(2)
+async def get_facets(
+    request: Request,
+    response: Response,
+    min_count: int = Query(1, ge=0, description="Leave out facets with fewer artworks, 0 keeps them all")
+):
+    """
+    Get the number of non-deleted artworks in each category and carrying
+    each tag, categories by name and tags most used first.
+    """
+
+    params = {"min_count": min_count}
+    return await _cached_json(
+        request,
+        "get_facets",
+        (ARTWORK_SCOPE, CATEGORY_SCOPE, TAG_SCOPE),
+        params,
+        partial(_render_facets, min_count)
+    )
+
+
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "json": "application/json"}
+
+
+async def _export_body(export_format, fields, category_id, include_deleted):
+    """Encode the export chunk by chunk, one JSON document per line for NDJSON."""
+    chunks = stream_db(iter_artwork_export, fields, category_id, include_deleted, api_config.EXPORT_CHUNK_SIZE)
+    if export_format == "ndjson":
+        async for chunk in chunks:
+            yield b"".join(dump_json(artwork) + b"\n" for artwork in chunk)
+        return
+
+    separator = b"["
+    async for chunk in chunks:
+        yield separator + b",".join(dump_json(artwork) for artwork in chunk)
+        separator = b","
+    yield b"[]" if separator == b"[" else b"]"
+
+@router.get(
+    "/export/artworks",
+    response_class=StreamingResponse,
+    responses={200: {"content": {media_type: {} for media_type in EXPORT_MEDIA_TYPES.values()}}},
+)
+# One query per chunk for the rows and one for their tags, so no fixed budget.
+async def export_artworks(
+    export_format: Literal["ndjson", "json"] = Query("ndjson", alias="format"),
+    fields: Optional[str] = Query(None, description="Comma separated subset of artwork fields to return"),
+    category_id: Optional[int] = None,
+    include_deleted: bool = False
+):
+    """
+    Stream the whole catalog in id order, as NDJSON (one artwork per line)
+    or as a single JSON array.
+
+    The body is written as the rows are read, so clients can consume it
+    right away and memory stays flat whatever the catalog size.
+    """
+
+    fields = parse_artwork_fields(fields)
+    return StreamingResponse(
+        _export_body(export_format, fields, category_id, include_deleted),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="artworks.{export_format}"'},
+    )
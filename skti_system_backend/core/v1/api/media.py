@@ -0,0 +1,88 @@
+import os
+import logging
+from typing import Literal, Optional
+
+from django.conf import settings
+from fastapi import APIRouter, Query, Request
+from fastapi.responses import JSONResponse
+from PIL import Image, UnidentifiedImageError
+
+from skti_system_backend.config.v1.media_config import media_config
+from skti_system_backend.utils.v1.errors import InternalServerException
+from skti_system_backend.utils.v1.images import IMAGE_FORMATS, DerivativeCache
+from skti_system_backend.utils.v1.query_stats import query_budget
+from skti_system_backend.utils.v1.rate_limit import rate_limit
+from skti_system_backend.utils.v1.static import MediaFiles
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(tags=["Media"])
+
+derivative_cache = DerivativeCache(
+    media_root=settings.MEDIA_ROOT,
+    directory=media_config.IMAGE_DERIVATIVES_DIR,
+    max_bytes=media_config.IMAGE_DERIVATIVES_MAX_BYTES,
+    workers=media_config.IMAGE_WORKERS,
+)
+router.add_event_handler("shutdown", derivative_cache.shutdown)
+
+# Derivatives are named by a hash of their source and parameters, so they get
+# the ranges, revalidation and immutable caching of the /media files. Uploads
+# never overwrite an original, Django's storage picks a free name instead.
+derivative_files = MediaFiles(
+    directory=derivative_cache.root,
+    max_age=media_config.MEDIA_MAX_AGE,
+    immutable_max_age=media_config.MEDIA_IMMUTABLE_MAX_AGE,
+    check_dir=False,
+)
+
+
+def _error_response(status_code: int, message: str) -> JSONResponse:
+    return JSONResponse(
+        status_code=status_code,
+        content={
+            "status": False,
+            "message": message,
+            "data": {},
+            "status_code": status_code,
+        },
+    )
+
+
+@router.get("/images/{path:path}")
+@rate_limit(media_config.IMAGE_RATE_LIMIT)
+@query_budget(0)
+async def get_image_derivative(
+    path: str,
+    request: Request,
+    width: int = Query(..., ge=16, le=media_config.IMAGE_MAX_WIDTH),
+    image_format: Literal["jpeg", "webp", "png"] = Query("webp", alias="format"),
+    quality: Optional[int] = Query(None, ge=30, le=95),
+):
+    """
+    Get a resized copy of a media image, e.g.
+    ``/images/artworks/img1.jpeg?width=320&format=webp``.
+
+    Originals narrower than ``width`` are only re-encoded, never upscaled.
+    """
+
+    source = derivative_cache.resolve_source(path)
+    if source is None:
+        return _error_response(404, f"No image found at {path}")
+
+    try:
+        derivative = await derivative_cache.get(
+            source, width, image_format, quality or media_config.IMAGE_DEFAULT_QUALITY
+        )
+    except UnidentifiedImageError:
+        return _error_response(415, f"{path} is not an image")
+    except Image.DecompressionBombError:
+        return _error_response(422, f"{path} has too many pixels to render")
+    except Exception as exc:
+        logger.exception(f"Rendering {path} at width={width} format={image_format} failed")
+        raise InternalServerException("Could not render the image") from exc
+
+    response = derivative_files.file_response(derivative, os.stat(derivative), request.scope)
+    if response.status_code != 304:
+        response.headers["content-type"] = IMAGE_FORMATS[image_format][2]
+    return response
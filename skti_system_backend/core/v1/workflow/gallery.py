@@ -0,0 +1,157 @@
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from django.db.models import Value
+from django.db.models.functions import Coalesce
+
+from skti_system_backend.models.v1.database.gallery import Artwork, Category, Tag, Tombstone
+from skti_system_backend.utils.v1.changes import (
+    ARTWORK_RANK,
+    CATEGORY_RANK,
+    TOMBSTONE_RANK,
+    after_position,
+)
+from skti_system_backend.utils.v1.serialization import ArtworkRowSerializer
+
+
+@lru_cache(maxsize=64)
+def artwork_serializer(fields: Optional[tuple] = None) -> ArtworkRowSerializer:
+    return ArtworkRowSerializer(Artwork._meta.get_field('image').storage, fields)
+
+
+def fetch_tag_names(artwork_ids: Iterable[int]) -> Dict[int, List[str]]:
+    """Tag names of each artwork, in tag id order, with a single query."""
+    tags_by_id = {}
+    for artwork_id, tag_name in Artwork.tags.through.objects.filter(
+        artwork_id__in=list(artwork_ids)
+    ).order_by('tag_id').values_list('artwork_id', 'tag__name'):
+        tags_by_id.setdefault(artwork_id, []).append(tag_name)
+    return tags_by_id
+
+
+def load_artwork_data(artwork_ids: List[int], fields: Optional[tuple] = None) -> List[Dict]:
+    """
+    Load the non-deleted artworks among ``artwork_ids`` as wire dicts, in the
+    order of ``artwork_ids``.
+
+    Takes one query for the rows and one for the tags, whatever the number
+    of ids. Ids that do not exist or are deleted are left out.
+    """
+    data_by_id = load_artwork_data_by_id(artwork_ids, fields)
+    return [data_by_id[artwork_id] for artwork_id in artwork_ids if artwork_id in data_by_id]
+
+
+def load_artwork_data_by_id(artwork_ids: Iterable[int], fields: Optional[tuple] = None) -> Dict[int, Dict]:
+    """Same as :func:`load_artwork_data`, keyed by id rather than ordered."""
+    artwork_ids = list(artwork_ids)
+    if not artwork_ids:
+        return {}
+    serializer = artwork_serializer(fields)
+    rows = list(Artwork.objects.filter(pk__in=artwork_ids).values_list(*serializer.columns))
+    tags_by_id = fetch_tag_names(row[0] for row in rows) if serializer.needs_tags else {}
+    return {row[0]: data for row, data in zip(rows, serializer.to_data(rows, tags_by_id))}
+
+
+def iter_artwork_export(
+    fields: Optional[tuple] = None,
+    category_id: Optional[int] = None,
+    include_deleted: bool = False,
+    chunk_size: int = 2000,
+) -> Iterator[List[Dict]]:
+    """
+    Yield the whole catalog as wire dicts, ``chunk_size`` artworks at a time,
+    in id order.
+
+    Rows come from a server side cursor on Postgres, and the tags of each
+    chunk take one query, so memory stays bounded by one chunk whatever the
+    size of the catalog.
+    """
+    serializer = artwork_serializer(fields)
+    manager = Artwork.all_objects if include_deleted else Artwork.objects
+    queryset = manager.order_by("id")
+    if category_id is not None:
+        queryset = queryset.filter(category_id=category_id)
+
+    chunk = []
+    for row in queryset.values_list(*serializer.columns).iterator(chunk_size=chunk_size):
+        chunk.append(row)
+        if len(chunk) == chunk_size:
+            yield _export_chunk(serializer, chunk)
+            chunk = []
+    if chunk:
+        yield _export_chunk(serializer, chunk)
+
+
+def _export_chunk(serializer: ArtworkRowSerializer, rows: List[tuple]) -> List[Dict]:
+    tags_by_id = fetch_tag_names(row[0] for row in rows) if serializer.needs_tags else {}
+    return serializer.to_data(rows, tags_by_id)
+
+
+def load_changes(position: Tuple[int, int, int], limit: int) -> Tuple[List[Dict], Tuple[int, int, int], bool]:
+    """
+    Load the ``limit`` changes following ``position`` in feed order.
+
+    Artworks and categories changed since are upserts with their current
+    data; soft deleted artworks and hard deleted rows are deletes. Takes one
+    query per kind plus one for the tags, whatever ``limit``.
+
+    :returns: The changes, the position of the last one (``position`` when
+        there are none) and whether more changes follow
+    """
+    entries = []
+
+    for pk, name, created_at, updated_at, change_seq in Category.objects.filter(
+        after_position(position, CATEGORY_RANK)
+    ).order_by("change_seq", "id").values_list("id", "name", "created_at", "updated_at", "change_seq")[:limit + 1]:
+        data = {"id": pk, "name": name, "created_at": created_at, "updated_at": updated_at}
+        entries.append(((change_seq, CATEGORY_RANK, pk), _change(change_seq, "category", "upsert", pk, data)))
+
+    serializer = artwork_serializer()
+    deleted = serializer.columns.index("is_deleted")
+    artwork_rows = list(
+        Artwork.all_objects.filter(after_position(position, ARTWORK_RANK))
+        .order_by("change_seq", "id").values_list(*serializer.columns, "change_seq")[:limit + 1]
+    )
+    live_rows = [row for row in artwork_rows if not row[deleted]]
+    tags_by_id = fetch_tag_names(row[0] for row in live_rows)
+    data_by_id = {data["id"]: data for data in serializer.to_data(live_rows, tags_by_id)}
+    for row in artwork_rows:
+        pk, change_seq = row[0], row[-1]
+        data = data_by_id.get(pk)
+        operation = "upsert" if data is not None else "delete"
+        entries.append(((change_seq, ARTWORK_RANK, pk), _change(change_seq, "artwork", operation, pk, data)))
+
+    for pk, kind, object_id, change_seq in Tombstone.objects.filter(
+        after_position(position, TOMBSTONE_RANK)
+    ).order_by("change_seq", "id").values_list("id", "kind", "object_id", "change_seq")[:limit + 1]:
+        entries.append(((change_seq, TOMBSTONE_RANK, pk), _change(change_seq, kind, "delete", object_id, None)))
+
+    entries.sort(key=lambda entry: entry[0])
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+    last_position = entries[-1][0] if entries else position
+    return [change for _, change in entries], last_position, has_more
+
+
+def _change(change_seq: int, kind: str, operation: str, pk: int, data: Optional[Dict]) -> Dict:
+    return {"seq": change_seq, "type": kind, "op": operation, "id": pk, "data": data}
+
+
+def load_facets(min_count: int = 1) -> Dict[str, List[Dict]]:
+    """
+    Load the number of live artworks of each category and each tag, from
+    the counter tables, one query per facet kind.
+
+    Categories come in name order, tags most used first. Facets counting
+    fewer than ``min_count`` artworks are left out.
+    """
+    facets = {}
+    for key, model, ordering in (
+        ("categories", Category, ("name",)),
+        ("tags", Tag, ("-count", "name")),
+    ):
+        facets[key] = list(
+            model.objects.annotate(count=Coalesce("artwork_count__count", Value(0)))
+            .filter(count__gte=min_count).order_by(*ordering).values("id", "name", "count")
+        )
+    return facets
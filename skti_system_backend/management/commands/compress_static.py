@@ -0,0 +1,87 @@
+import os
+import gzip
+import json
+import shutil
+import hashlib
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from skti_system_backend.utils.v1.static import CONTENT_ADDRESSED_NAME, STATIC_MANIFEST_NAME
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional at runtime
+    brotli = None
+
+
+COMPRESSIBLE_EXTENSIONS = {".css", ".js", ".json", ".map", ".svg", ".txt", ".html", ".xml"}
+
+
+class Command(BaseCommand):
+    help = (
+        "Write content hashed copies of the compressible files under STATIC_ROOT, "
+        "with .gz and .br siblings for them and for the originals, and the manifest "
+        "static URLs resolve to the hashed names through. "
+        "Run it after collectstatic."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--min-ratio",
+            type=float,
+            default=0.95,
+            help="Only keep a compressed variant smaller than this fraction of the original.",
+        )
+
+    def handle(self, *args, **options):
+        if brotli is None:
+            self.stderr.write("brotli is not installed, only .gz variants will be written.")
+
+        root = settings.STATIC_ROOT
+        manifest = {}
+        written = 0
+        for dirpath, _, filenames in os.walk(root):
+            for filename in filenames:
+                name, extension = os.path.splitext(filename)
+                if (
+                    extension not in COMPRESSIBLE_EXTENSIONS
+                    or CONTENT_ADDRESSED_NAME.search(filename)
+                    or os.path.join(dirpath, filename) == os.path.join(root, STATIC_MANIFEST_NAME)
+                ):
+                    continue
+
+                path = os.path.join(dirpath, filename)
+                with open(path, "rb") as file:
+                    content = file.read()
+
+                digest = hashlib.md5(content, usedforsecurity=False).hexdigest()[:12]
+                hashed_path = os.path.join(dirpath, f"{name}.{digest}{extension}")
+                if not os.path.exists(hashed_path):
+                    shutil.copy2(path, hashed_path)
+                manifest[os.path.relpath(path, root)] = os.path.relpath(hashed_path, root)
+
+                for target in (path, hashed_path):
+                    written += self.write_variants(target, content, options["min_ratio"])
+
+        with open(os.path.join(root, STATIC_MANIFEST_NAME), "w") as file:
+            json.dump(manifest, file, indent=2, sort_keys=True)
+        self.stdout.write(self.style.SUCCESS(
+            f"Hashed {len(manifest)} files and wrote {written} compressed variants."
+        ))
+
+    def write_variants(self, path, content, min_ratio):
+        variants = {".gz": gzip.compress(content, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            variants[".br"] = brotli.compress(content, quality=11)
+
+        written = 0
+        for suffix, compressed in variants.items():
+            if len(compressed) >= len(content) * min_ratio:
+                if os.path.exists(path + suffix):
+                    os.remove(path + suffix)
+                continue
+            with open(path + suffix, "wb") as file:
+                file.write(compressed)
+            written += 1
+        return written
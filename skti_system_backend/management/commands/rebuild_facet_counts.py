@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from skti_system_backend.utils.v1.cache import ARTWORK_SCOPE, CATEGORY_SCOPE, TAG_SCOPE, response_cache
+from skti_system_backend.utils.v1.etag import bump_catalog_version
+from skti_system_backend.utils.v1.facets import rebuild_facet_counts
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the per category and per tag artwork counts served by the facets endpoint. "
+        "Run it after bulk writes that skip the model signals, or when the counts drifted."
+    )
+
+    def handle(self, *args, **options):
+        categories, tags = rebuild_facet_counts()
+        response_cache.invalidate(ARTWORK_SCOPE, CATEGORY_SCOPE, TAG_SCOPE)
+        bump_catalog_version()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt the counts of {categories} categories and {tags} tags."))
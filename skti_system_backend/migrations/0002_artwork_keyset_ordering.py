@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:53
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('skti_system_backend', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='artwork',
+            options={'ordering': ['-created_at', '-id'], 'verbose_name': 'Artwork', 'verbose_name_plural': 'Artworks'},
+        ),
+    ]
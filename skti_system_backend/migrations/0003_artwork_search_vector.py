@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:03
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+BACKFILL_SQL = """
+UPDATE artworks SET search_vector =
+    setweight(to_tsvector('english', coalesce(artworks.title, '')), 'A') ||
+    setweight(to_tsvector('english', coalesce(artworks.description, '')), 'B') ||
+    setweight(to_tsvector('english', coalesce((
+        SELECT string_agg(tags.name, ' ')
+        FROM artworks_tags JOIN tags ON tags.id = artworks_tags.tag_id
+        WHERE artworks_tags.artwork_id = artworks.id
+    ), '')), 'C')
+"""
+
+def backfill_search_vector(apps, schema_editor):
+    # The backfill, and the GIN index of migration 0007, only exist on
+    # Postgres, other databases use the in-memory search index.
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(BACKFILL_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('skti_system_backend', '0002_artwork_keyset_ordering'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='artwork',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(backfill_search_vector, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:34
+
+import django.db.models.manager
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('skti_system_backend', '0004_change_feed'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='artwork',
+            options={'default_manager_name': 'all_objects', 'ordering': ['-created_at', '-id'], 'verbose_name': 'Artwork', 'verbose_name_plural': 'Artworks'},
+        ),
+        migrations.AlterModelManagers(
+            name='artwork',
+            managers=[
+                ('all_objects', django.db.models.manager.Manager()),
+            ],
+        ),
+    ]
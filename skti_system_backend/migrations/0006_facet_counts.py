@@ -0,0 +1,54 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:37
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def count_existing_artworks(apps, schema_editor):
+    # Same counts as ``utils.v1.facets.rebuild_facet_counts``.
+    alias = schema_editor.connection.alias
+    Artwork = apps.get_model('skti_system_backend', 'Artwork')
+    CategoryArtworkCount = apps.get_model('skti_system_backend', 'CategoryArtworkCount')
+    TagArtworkCount = apps.get_model('skti_system_backend', 'TagArtworkCount')
+    live = Artwork._default_manager.using(alias).filter(is_deleted=False).order_by()
+    CategoryArtworkCount.objects.using(alias).bulk_create(
+        CategoryArtworkCount(category_id=category_id, count=count)
+        for category_id, count in live.values('category_id').annotate(count=Count('id')).values_list('category_id', 'count')
+    )
+    TagArtworkCount.objects.using(alias).bulk_create(
+        TagArtworkCount(tag_id=tag_id, count=count)
+        for tag_id, count in Artwork.tags.through.objects.using(alias).filter(artwork__is_deleted=False)
+        .order_by().values('tag_id').annotate(count=Count('artwork_id')).values_list('tag_id', 'count')
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('skti_system_backend', '0005_artwork_default_manager'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CategoryArtworkCount',
+            fields=[
+                ('category', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='artwork_count', serialize=False, to='skti_system_backend.category')),
+                ('count', models.IntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'category_artwork_counts',
+            },
+        ),
+        migrations.CreateModel(
+            name='TagArtworkCount',
+            fields=[
+                ('tag', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='artwork_count', serialize=False, to='skti_system_backend.tag')),
+                ('count', models.IntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'tag_artwork_counts',
+            },
+        ),
+        migrations.RunPython(count_existing_artworks, migrations.RunPython.noop),
+    ]
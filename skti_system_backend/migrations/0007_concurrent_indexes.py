@@ -0,0 +1,71 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:58
+
+from django.db import migrations, models
+
+from skti_system_backend.utils.v1.migration_operations import AddIndexConcurrently
+
+
+def create_search_index(apps, schema_editor):
+    # Postgres only, like the backfill of migration 0003.
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        'CREATE INDEX CONCURRENTLY IF NOT EXISTS artworks_search_gin ON artworks USING gin (search_vector)'
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX CONCURRENTLY IF EXISTS artworks_search_gin')
+
+
+def create_title_prefix_index(apps, schema_editor):
+    # Serves ``title__istartswith``, which compares UPPER(title) with LIKE,
+    # whatever the collation of the database. Postgres only, like the search
+    # index.
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        'CREATE INDEX CONCURRENTLY IF NOT EXISTS artworks_title_upper_prefix_idx '
+        'ON artworks (UPPER(title::text) text_pattern_ops)'
+    )
+
+
+def drop_title_prefix_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX CONCURRENTLY IF EXISTS artworks_title_upper_prefix_idx')
+
+
+class Migration(migrations.Migration):
+    # Every index on the existing tables is built here, concurrently, which
+    # cannot run in a transaction: writes go on while they build. A build
+    # that fails leaves an invalid index behind, drop it before migrating
+    # again.
+    atomic = False
+
+    dependencies = [
+        ('skti_system_backend', '0006_facet_counts'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='artwork',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['-created_at', '-id'], name='artworks_live_created_id_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='artwork',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['category', '-created_at', '-id'], name='artworks_live_cat_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='artwork',
+            index=models.Index(fields=['change_seq', 'id'], name='artworks_change_seq_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='category',
+            index=models.Index(fields=['change_seq', 'id'], name='categories_change_seq_idx'),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+        migrations.RunPython(create_title_prefix_index, drop_title_prefix_index),
+    ]
@@ -1,6 +1,6 @@
 from datetime import datetime
 from pydantic import BaseModel
-from typing import List, Any
+from typing import List, Any, Literal, Optional
 
 from skti_system_backend.models.v1.api import Response
 
@@ -8,16 +8,51 @@ from skti_system_backend.models.v1.api import Response
 class ArtworkData(BaseModel):
     id: int
     title: str
-    description: str
+    description: Optional[str]
     category: str
-    image_url: str
+    image_url: Optional[str]
     tags: list[str]
     is_deleted: bool
     created_at: datetime
     updated_at: datetime
 
 class ArtworksResponse(Response):
-    data: list[ArtworkData] 
+    data: list[ArtworkData]
+    next_cursor: Optional[str] = None
+
+class ArtworkResponse(Response):
+    data: Optional[ArtworkData] = None
+
+class ArtworksBatchResponse(Response):
+    data: list[ArtworkData]
+    missing: list[int]
 
 class CategoriesResponse(Response):
-    data: list[Any]
\ No newline at end of file
+    data: list[Any]
+class SearchResponse(Response):
+    data: list[ArtworkData]
+    next_offset: Optional[int] = None
+
+class ChangeData(BaseModel):
+    seq: int
+    type: Literal["artwork", "category"]
+    op: Literal["upsert", "delete"]
+    id: int
+    data: Optional[dict] = None
+
+class ChangesResponse(Response):
+    data: list[ChangeData]
+    next_since: str
+    has_more: bool
+
+class FacetCount(BaseModel):
+    id: int
+    name: str
+    count: int
+
+class FacetsData(BaseModel):
+    categories: list[FacetCount]
+    tags: list[FacetCount]
+
+class FacetsResponse(Response):
+    data: FacetsData
@@ -1,10 +1,35 @@
-from django.db import models
+from django.db import models, transaction
 
 
-class SoftDeleteManager(models.Manager):
+class SoftDeleteQuerySet(models.QuerySet):
+    def delete(self):
+        """
+        Soft delete the live objects of the queryset, one save each, so the
+        signals stamp the change sequence and keep the facet counts and the
+        caches up to date as for a single delete.
+        """
+        with transaction.atomic(using=self.db, savepoint=False):
+            deleted = 0
+            for obj in self.filter(is_deleted=False):
+                obj.delete()
+                deleted += 1
+        return deleted, {self.model._meta.label: deleted}
+
+    delete.alters_data = True
+    delete.queryset_only = True
+
+    def hard_delete(self):
+        """Permanently delete the objects of the queryset from the database."""
+        return super().delete()
+
+    hard_delete.alters_data = True
+    hard_delete.queryset_only = True
+
+
+class SoftDeleteManager(models.Manager.from_queryset(SoftDeleteQuerySet)):
     def get_queryset(self):
         """Return only objects that are not soft deleted."""
-        return super().get_queryset().filter(deleted=False)
+        return super().get_queryset().filter(is_deleted=False)
 
     def all_with_deleted(self):
         """Return all objects, including soft deleted ones."""
@@ -12,23 +37,30 @@ class SoftDeleteManager(models.Manager):
 
 
 class SoftDeleteModel(models.Model):
-    deleted = models.BooleanField(default=False)
+    is_deleted = models.BooleanField(default=False)
 
-    objects = SoftDeleteManager()  # Use the custom manager by default
+    # Every read path of live objects goes through ``objects``, the filter it
+    # adds matching the partial indexes of the model. ``all_objects`` is the
+    # default manager, the one of the admin, related lookups and the code that
+    # needs deleted rows too (exports, the changes feed, the tag index). Both
+    # soft delete on ``delete()``, ``hard_delete()`` removes the rows.
+    objects = SoftDeleteManager()
+    all_objects = SoftDeleteQuerySet.as_manager()
 
     def delete(self, *args, **kwargs):
-        """Soft delete the object by setting deleted to True."""
-        self.deleted = True
+        """Soft delete the object by setting is_deleted to True."""
+        self.is_deleted = True
         self.save()
 
     def restore(self, *args, **kwargs):
-        """Restore the object by setting deleted to False."""
-        self.deleted = False
+        """Restore the object by setting is_deleted to False."""
+        self.is_deleted = False
         self.save()
 
     def hard_delete(self, *args, **kwargs):
         """Permanently delete the object from the database."""
-        super(SoftDeleteModel, self).delete(*args, **kwargs)
+        return super(SoftDeleteModel, self).delete(*args, **kwargs)
 
     class Meta:
         abstract = True
+        default_manager_name = 'all_objects'
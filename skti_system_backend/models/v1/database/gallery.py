@@ -1,4 +1,8 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Q
+from django.contrib.postgres.search import SearchVectorField
+
+from skti_system_backend.models.v1.database import SoftDeleteModel
 
 class Tag(models.Model):
     name       = models.CharField(max_length=50, unique=True)
@@ -12,36 +16,131 @@ class Tag(models.Model):
 
     def __str__(self):
         return self.name
-    
+
+    def save(self, *args, **kwargs):
+        # The signal handlers writing the facet counts and the change sequence
+        # commit together with the row.
+        with transaction.atomic(using=kwargs.get('using'), savepoint=False):
+            super().save(*args, **kwargs)
+
 class Category(models.Model):
     name = models.CharField(max_length=100, unique=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Set from ``ChangeCounter`` on every change, see ``utils.v1.changes``.
+    change_seq = models.BigIntegerField(default=0, editable=False)
 
     class Meta:
         db_table = 'categories'
         verbose_name = 'Category'
         verbose_name_plural = 'Categories'
+        indexes = [
+            models.Index(fields=['change_seq', 'id'], name='categories_change_seq_idx'),
+        ]
 
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        # The signal handlers writing the facet counts and the change sequence
+        # commit together with the row.
+        with transaction.atomic(using=kwargs.get('using'), savepoint=False):
+            super().save(*args, **kwargs)
+
 
-class Artwork(models.Model):
+class Artwork(SoftDeleteModel):
+    # Also indexed on UPPER(title) on Postgres for the admin's prefix search
+    # (migration 0007).
     title       = models.CharField(max_length=255, db_index=True)
     description = models.TextField(blank=True, null=True)
     category    = models.ForeignKey(Category, on_delete=models.PROTECT)
     image       = models.ImageField(upload_to='artworks/')
     tags        = models.ManyToManyField(Tag, related_name='artworks', blank=True)
-    is_deleted  = models.BooleanField(default=False)
     created_at  = models.DateTimeField(auto_now_add=True)
     updated_at  = models.DateTimeField(auto_now=True)
+    # Maintained by ``utils.v1.search``, GIN indexed on Postgres (migration 0007).
+    search_vector = SearchVectorField(null=True, editable=False)
+    # Set from ``ChangeCounter`` on every change, tags and category renames
+    # included, see ``utils.v1.changes``.
+    change_seq  = models.BigIntegerField(default=0, editable=False)
 
-    class Meta:
+    class Meta(SoftDeleteModel.Meta):
         db_table = 'artworks'
         verbose_name = 'Artwork'
         verbose_name_plural = 'Artworks'
-        ordering = ['-created_at']
+        ordering = ['-created_at', '-id']
+        indexes = [
+            # Partial, as every listing reads live artworks only: deleted rows
+            # neither grow these indexes nor get skipped while walking them.
+            models.Index(
+                fields=['-created_at', '-id'],
+                condition=Q(is_deleted=False),
+                name='artworks_live_created_id_idx',
+            ),
+            models.Index(
+                fields=['category', '-created_at', '-id'],
+                condition=Q(is_deleted=False),
+                name='artworks_live_cat_created_idx',
+            ),
+            models.Index(fields=['change_seq', 'id'], name='artworks_change_seq_idx'),
+        ]
 
     def __str__(self):
         return self.title
+
+    def save(self, *args, **kwargs):
+        # The signal handlers writing the facet counts and the change sequence
+        # commit together with the row.
+        with transaction.atomic(using=kwargs.get('using'), savepoint=False):
+            super().save(*args, **kwargs)
+
+
+class ChangeCounter(models.Model):
+    """Single row holding the last change sequence number handed out."""
+    value = models.BigIntegerField(default=0)
+
+    class Meta:
+        db_table = 'change_counter'
+
+
+class Tombstone(models.Model):
+    """Record of a hard deleted artwork or category, for the changes feed."""
+    ARTWORK = 'artwork'
+    CATEGORY = 'category'
+    KIND_CHOICES = [(ARTWORK, 'Artwork'), (CATEGORY, 'Category')]
+
+    kind       = models.CharField(max_length=16, choices=KIND_CHOICES)
+    object_id  = models.BigIntegerField()
+    change_seq = models.BigIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'tombstones'
+        indexes = [
+            models.Index(fields=['change_seq', 'id'], name='tombstones_change_seq_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.object_id}"
+
+
+class CategoryArtworkCount(models.Model):
+    """Number of live artworks in a category, kept by ``utils.v1.facets``."""
+    category = models.OneToOneField(
+        Category, on_delete=models.CASCADE, primary_key=True, related_name='artwork_count'
+    )
+    count    = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = 'category_artwork_counts'
+
+
+class TagArtworkCount(models.Model):
+    """Number of live artworks carrying a tag, kept by ``utils.v1.facets``."""
+    tag   = models.OneToOneField(
+        Tag, on_delete=models.CASCADE, primary_key=True, related_name='artwork_count'
+    )
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = 'tag_artwork_counts'
@@ -0,0 +1,277 @@
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from skti_system_backend.models.v1.database.gallery import Artwork, Category, Tag, Tombstone
+from skti_system_backend.utils.v1.cache import (
+    ARTWORK_SCOPE,
+    CATEGORY_SCOPE,
+    TAG_SCOPE,
+    artwork_category_scope,
+    response_cache,
+)
+from skti_system_backend.utils.v1.changes import next_change_seq, touch_artworks
+from skti_system_backend.utils.v1.db_router import call_after_replica_lag
+from skti_system_backend.utils.v1.etag import bump_catalog_version
+from skti_system_backend.utils.v1.facets import (
+    adjust_category_counts,
+    adjust_tag_counts,
+    artwork_tag_ids,
+    live_tagged_count,
+)
+from skti_system_backend.utils.v1.search import refresh_search
+from skti_system_backend.utils.v1.tag_index import on_commit_index, tag_index
+
+
+def _invalidate(scopes):
+    response_cache.invalidate(*scopes)
+    bump_catalog_version()
+
+
+def _invalidate_now_and_after_lag(scopes):
+    _invalidate(scopes)
+    # A read replica that had not replayed the write yet may have served
+    # responses cached under the new generation, drop them again.
+    call_after_replica_lag(_invalidate, scopes)
+
+
+def _invalidate_on_commit(*scopes):
+    """Invalidate once the write is visible to readers, never before."""
+    transaction.on_commit(lambda: _invalidate_now_and_after_lag(scopes))
+
+
+@receiver(pre_save, sender=Artwork, dispatch_uid="artwork_remember_state")
+def remember_artwork_state(sender, instance, **kwargs):
+    previous = None
+    if instance.pk:
+        previous = Artwork.all_objects.filter(pk=instance.pk).values_list("category_id", "is_deleted").first()
+    instance._previous_category_id = previous[0] if previous else None
+    instance._was_live = previous is not None and not previous[1]
+
+
+@receiver(post_save, sender=Artwork, dispatch_uid="artwork_saved_invalidate")
+@receiver(post_delete, sender=Artwork, dispatch_uid="artwork_deleted_invalidate")
+def invalidate_artwork(sender, instance, **kwargs):
+    scopes = {ARTWORK_SCOPE, artwork_category_scope(instance.category_id)}
+    previous_category_id = getattr(instance, "_previous_category_id", None)
+    if previous_category_id is not None:
+        scopes.add(artwork_category_scope(previous_category_id))
+    _invalidate_on_commit(*scopes)
+
+
+@receiver(post_save, sender=Category, dispatch_uid="category_saved_invalidate")
+@receiver(post_delete, sender=Category, dispatch_uid="category_deleted_invalidate")
+def invalidate_category(sender, instance, **kwargs):
+    _invalidate_on_commit(CATEGORY_SCOPE)
+
+
+@receiver(post_save, sender=Tag, dispatch_uid="tag_saved_invalidate")
+@receiver(post_delete, sender=Tag, dispatch_uid="tag_deleted_invalidate")
+def invalidate_tag(sender, instance, **kwargs):
+    _invalidate_on_commit(TAG_SCOPE)
+
+
+@receiver(m2m_changed, sender=Artwork.tags.through, dispatch_uid="artwork_tags_invalidate")
+def invalidate_artwork_tags(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if not reverse:
+        _invalidate_on_commit(ARTWORK_SCOPE, artwork_category_scope(instance.category_id))
+    elif pk_set:
+        category_ids = Artwork.all_objects.filter(pk__in=pk_set).values_list("category_id", flat=True).distinct()
+        _invalidate_on_commit(ARTWORK_SCOPE, *(artwork_category_scope(c) for c in category_ids))
+    else:
+        _invalidate_on_commit(TAG_SCOPE)
+
+
+# Search documents carry the title, description and tag names of an artwork,
+# so they are refreshed whenever any of those can change.
+
+def _tagged_artwork_ids(tag_ids):
+    return list(
+        Artwork.tags.through.objects.filter(tag_id__in=tag_ids).values_list("artwork_id", flat=True).distinct()
+    )
+
+
+@receiver(post_save, sender=Artwork, dispatch_uid="artwork_saved_search")
+@receiver(post_delete, sender=Artwork, dispatch_uid="artwork_deleted_search")
+def refresh_artwork_search(sender, instance, **kwargs):
+    refresh_search([instance.pk])
+
+
+@receiver(post_save, sender=Tag, dispatch_uid="tag_saved_search")
+def refresh_tag_search(sender, instance, created, **kwargs):
+    if not created:
+        refresh_search(_tagged_artwork_ids([instance.pk]))
+
+
+@receiver(pre_delete, sender=Tag, dispatch_uid="tag_delete_remember_artworks")
+def remember_tag_artworks(sender, instance, **kwargs):
+    instance._search_artwork_ids = _tagged_artwork_ids([instance.pk])
+
+
+@receiver(post_delete, sender=Tag, dispatch_uid="tag_deleted_search")
+def refresh_deleted_tag_search(sender, instance, **kwargs):
+    refresh_search(getattr(instance, "_search_artwork_ids", []))
+
+
+@receiver(m2m_changed, sender=Artwork.tags.through, dispatch_uid="artwork_tags_search")
+def refresh_artwork_tags_search(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        if action in ("post_add", "post_remove", "post_clear"):
+            refresh_search([instance.pk])
+    elif action == "pre_clear":
+        instance._search_artwork_ids = _tagged_artwork_ids([instance.pk])
+    elif action == "post_clear":
+        refresh_search(getattr(instance, "_search_artwork_ids", []))
+    elif action in ("post_add", "post_remove"):
+        refresh_search(pk_set or [])
+
+
+@receiver(post_save, sender=Artwork, dispatch_uid="artwork_saved_tag_index")
+def index_artwork(sender, instance, **kwargs):
+    on_commit_index(tag_index.set_artwork, instance.pk, instance.created_at, not instance.is_deleted)
+
+
+@receiver(post_delete, sender=Artwork, dispatch_uid="artwork_deleted_tag_index")
+def unindex_artwork(sender, instance, **kwargs):
+    on_commit_index(tag_index.set_artwork, instance.pk, instance.created_at, False)
+
+
+@receiver(post_save, sender=Tag, dispatch_uid="tag_saved_tag_index")
+def index_tag(sender, instance, **kwargs):
+    on_commit_index(tag_index.set_tag, instance.pk, instance.name)
+
+
+@receiver(post_delete, sender=Tag, dispatch_uid="tag_deleted_tag_index")
+def unindex_tag(sender, instance, **kwargs):
+    on_commit_index(tag_index.set_tag, instance.pk, None)
+
+
+@receiver(m2m_changed, sender=Artwork.tags.through, dispatch_uid="artwork_tags_tag_index")
+def index_artwork_tags(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    present = action == "post_add"
+    if not reverse:
+        if action == "post_clear":
+            on_commit_index(tag_index.clear_artwork_tags, instance.pk)
+        else:
+            on_commit_index(tag_index.set_tags, instance.pk, list(pk_set), present)
+    else:
+        artwork_ids = None if action == "post_clear" else list(pk_set)
+        on_commit_index(tag_index.set_tag_artworks, instance.pk, artwork_ids, present)
+
+
+# Changes feed: every save stamps the row with the next change sequence
+# number, and changes that alter an artwork's payload without saving it
+# (its tags, its category's name) stamp the artwork too.
+
+@receiver(pre_save, sender=Artwork, dispatch_uid="artwork_change_seq")
+@receiver(pre_save, sender=Category, dispatch_uid="category_change_seq")
+def stamp_change_seq(sender, instance, **kwargs):
+    instance.change_seq = next_change_seq()
+    if sender is Category and instance.pk:
+        instance._previous_name = (
+            Category.objects.filter(pk=instance.pk).values_list("name", flat=True).first()
+        )
+
+
+@receiver(post_save, sender=Artwork, dispatch_uid="artwork_saved_change_seq")
+@receiver(post_save, sender=Category, dispatch_uid="category_saved_change_seq")
+def save_change_seq(sender, instance, created, update_fields=None, **kwargs):
+    if update_fields is not None and "change_seq" not in update_fields:
+        sender._default_manager.filter(pk=instance.pk).update(change_seq=instance.change_seq)
+    if sender is Category and not created and getattr(instance, "_previous_name", None) != instance.name:
+        touch_artworks(Artwork.all_objects.filter(category_id=instance.pk).values_list("id", flat=True))
+
+
+@receiver(post_delete, sender=Artwork, dispatch_uid="artwork_deleted_tombstone")
+@receiver(post_delete, sender=Category, dispatch_uid="category_deleted_tombstone")
+def create_tombstone(sender, instance, **kwargs):
+    kind = Tombstone.ARTWORK if sender is Artwork else Tombstone.CATEGORY
+    Tombstone.objects.create(kind=kind, object_id=instance.pk, change_seq=next_change_seq())
+
+
+@receiver(post_save, sender=Tag, dispatch_uid="tag_saved_change_seq")
+def touch_tag_artworks(sender, instance, created, **kwargs):
+    if not created:
+        touch_artworks(_tagged_artwork_ids([instance.pk]))
+
+
+@receiver(pre_delete, sender=Tag, dispatch_uid="tag_delete_remember_changed_artworks")
+def remember_changed_tag_artworks(sender, instance, **kwargs):
+    instance._changed_artwork_ids = _tagged_artwork_ids([instance.pk])
+
+
+@receiver(post_delete, sender=Tag, dispatch_uid="tag_deleted_change_seq")
+def touch_deleted_tag_artworks(sender, instance, **kwargs):
+    touch_artworks(getattr(instance, "_changed_artwork_ids", []))
+
+
+@receiver(m2m_changed, sender=Artwork.tags.through, dispatch_uid="artwork_tags_change_seq")
+def touch_artwork_tags(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        if action in ("post_add", "post_remove", "post_clear"):
+            touch_artworks([instance.pk])
+    elif action == "pre_clear":
+        instance._changed_artwork_ids = _tagged_artwork_ids([instance.pk])
+    elif action == "post_clear":
+        touch_artworks(getattr(instance, "_changed_artwork_ids", []))
+    elif action in ("post_add", "post_remove"):
+        touch_artworks(pk_set or [])
+
+
+# Facet counts: live artworks per category and per tag, adjusted in the
+# transaction of the write. Only artworks that are live before or after the
+# change move a count.
+
+@receiver(post_save, sender=Artwork, dispatch_uid="artwork_saved_facets")
+def count_artwork(sender, instance, created, **kwargs):
+    was_live, is_live = getattr(instance, "_was_live", False), not instance.is_deleted
+    category_deltas = defaultdict(int)
+    if was_live:
+        category_deltas[instance._previous_category_id] -= 1
+    if is_live:
+        category_deltas[instance.category_id] += 1
+    adjust_category_counts(category_deltas)
+    if was_live != is_live and not created:
+        adjust_tag_counts(dict.fromkeys(artwork_tag_ids(instance.pk), 1 if is_live else -1))
+
+
+@receiver(pre_delete, sender=Artwork, dispatch_uid="artwork_delete_remember_facets")
+def remember_counted_tags(sender, instance, **kwargs):
+    # The tag assignments are gone by post_delete.
+    instance._counted_tag_ids = [] if instance.is_deleted else artwork_tag_ids(instance.pk)
+
+
+@receiver(post_delete, sender=Artwork, dispatch_uid="artwork_deleted_facets")
+def uncount_artwork(sender, instance, **kwargs):
+    if not instance.is_deleted:
+        adjust_category_counts({instance.category_id: -1})
+        adjust_tag_counts(dict.fromkeys(getattr(instance, "_counted_tag_ids", []), -1))
+
+
+@receiver(m2m_changed, sender=Artwork.tags.through, dispatch_uid="artwork_tags_facets")
+def count_artwork_tags(sender, instance, action, reverse, pk_set, **kwargs):
+    # ``pk_set`` of a removal holds the ids asked for, assigned or not, so
+    # what is actually removed is read before; that of an addition only
+    # holds the ids that were not assigned yet.
+    if not reverse:
+        if instance.is_deleted:
+            return
+        if action == "post_add":
+            adjust_tag_counts(dict.fromkeys(pk_set, 1))
+        elif action in ("pre_remove", "pre_clear"):
+            tag_ids = artwork_tag_ids(instance.pk)
+            instance._removed_tag_ids = tag_ids if action == "pre_clear" else list(pk_set & set(tag_ids))
+        elif action in ("post_remove", "post_clear"):
+            adjust_tag_counts(dict.fromkeys(getattr(instance, "_removed_tag_ids", []), -1))
+    elif action == "post_add":
+        adjust_tag_counts({instance.pk: Artwork.objects.filter(pk__in=pk_set).count()})
+    elif action in ("pre_remove", "pre_clear"):
+        instance._removed_count = live_tagged_count(instance.pk, pk_set if action == "pre_remove" else None)
+    elif action in ("post_remove", "post_clear"):
+        adjust_tag_counts({instance.pk: -getattr(instance, "_removed_count", 0)})
@@ -0,0 +1,343 @@
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import platform
+from collections import Counter
+from dataclasses import dataclass
+from typing import Callable, Dict, List
+
+# An endpoint running more queries than its ``query_budget`` answers 500 and
+# fails the run, whatever the dataset size. Read when the settings load.
+os.environ.setdefault("QUERY_BUDGET_STRICT", "true")
+# Every request comes from the same client, far above any production limit.
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+# Setup Django environment, then reuse the seeding code of the data generator
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from skti_system_backend.scripts import options_data
+
+import httpx
+from asgiref.sync import sync_to_async
+from django.db import connection
+from django.db.models import Count
+from fastapi.routing import APIRoute
+
+from skti_system_backend.api_application import application
+from skti_system_backend.config.v1.api_config import api_config
+from skti_system_backend.models.v1.database.gallery import Artwork, Category, Tag
+from skti_system_backend.utils.v1.cache import NullCacheBackend, response_cache
+from skti_system_backend.utils.v1.changes import change_watcher
+from skti_system_backend.utils.v1.search import search_index
+from skti_system_backend.utils.v1.tag_index import tag_index
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "benchmarks", "baseline.json")
+
+# Lower is better for latencies, higher is better for throughput.
+LATENCY_METRICS = ("p50_ms", "p95_ms", "p99_ms")
+
+
+@dataclass
+class Scenario:
+    """One request shape; ``route`` is the path template it exercises."""
+    name: str
+    route: str
+    url: Callable[[Dict], str]
+
+
+SCENARIOS = [
+    Scenario("health_check", "/health-check", lambda ctx: "/health-check"),
+    Scenario("categories", "/api/v1/get_all_categories", lambda ctx: "/api/v1/get_all_categories"),
+    Scenario("artworks_first_page", "/api/v1/get_all_artworks", lambda ctx: "/api/v1/get_all_artworks"),
+    Scenario(
+        "artworks_next_page",
+        "/api/v1/get_all_artworks",
+        lambda ctx: f"/api/v1/get_all_artworks?cursor={ctx['cursor']}",
+    ),
+    Scenario(
+        "artworks_sparse_fields",
+        "/api/v1/get_all_artworks",
+        lambda ctx: "/api/v1/get_all_artworks?fields=id,title,image_url&limit=100",
+    ),
+    Scenario(
+        "artworks_by_category",
+        "/api/v1/get_artworks_by_category/{category_id}",
+        lambda ctx: f"/api/v1/get_artworks_by_category/{ctx['category_id']}",
+    ),
+    Scenario(
+        "artworks_by_tags",
+        "/api/v1/get_artworks_by_tags",
+        lambda ctx: f"/api/v1/get_artworks_by_tags?all={ctx['tags'][0]}&not={ctx['tags'][1]}",
+    ),
+    Scenario("search", "/api/v1/search", lambda ctx: f"/api/v1/search?q={ctx['search']}"),
+    Scenario("artworks_batch", "/api/v1/artworks", lambda ctx: f"/api/v1/artworks?ids={ctx['artwork_ids']}"),
+    Scenario(
+        "artwork_by_id",
+        "/api/v1/artworks/{artwork_id}",
+        lambda ctx: f"/api/v1/artworks/{ctx['artwork_id']}",
+    ),
+    Scenario("changes_full_sync", "/api/v1/changes", lambda ctx: "/api/v1/changes"),
+    Scenario("facets", "/api/v1/facets", lambda ctx: "/api/v1/facets"),
+    Scenario(
+        "export_small_category",
+        "/api/v1/export/artworks",
+        lambda ctx: f"/api/v1/export/artworks?category_id={ctx['small_category_id']}&fields=id,title,tags",
+    ),
+    Scenario(
+        "image_derivative",
+        "/api/v1/images/{path:path}",
+        lambda ctx: f"/api/v1/images/{ctx['image']}?width=320&format=webp",
+    ),
+]
+
+
+def check_coverage():
+    """Fail early when a GET route has no scenario, so new routes get measured."""
+    covered = {scenario.route for scenario in SCENARIOS}
+    routes = {
+        route.path
+        for route in application.routes
+        if isinstance(route, APIRoute)
+        and "GET" in route.methods
+        and (route.path.startswith(api_config.API_VER_STR_V1) or route.path == "/health-check")
+    }
+    missing = sorted(routes - covered)
+    if missing:
+        raise SystemExit(f"No benchmark scenario for: {', '.join(missing)}")
+
+
+def seed(options, size):
+    options_data.clear_gallery()
+    seed_options = options_data.parse_args([
+        "--artworks", str(size),
+        "--tags", str(options.tags),
+        "--categories", str(options.categories),
+        "--seed", str(options.seed),
+    ])
+    tag_ids = options_data.populate_named(Tag, options_data.names(options_data.TAGS, options.tags))
+    category_ids = options_data.populate_named(
+        Category, options_data.names(options_data.CATEGORIES, options.categories)
+    )
+    options_data.populate_artworks(seed_options, tag_ids, category_ids)
+    options_data.refresh_derived_data()
+    # The in-process indexes did not see the bulk writes either.
+    search_index.reset()
+    tag_index.invalidate()
+
+
+def scenario_context():
+    """Values the scenario URLs need, taken from the seeded data."""
+    category_sizes = (
+        Artwork.objects.values("category_id").annotate(n=Count("id"))
+        .order_by("-n").values_list("category_id", flat=True)
+    )
+    tags = list(
+        Tag.objects.annotate(n=Count("artworks")).order_by("-n").values_list("name", flat=True)[:2]
+    )
+    artwork_ids = list(Artwork.objects.order_by("id").values_list("id", flat=True)[:20])
+    return {
+        "artwork_ids": ",".join(map(str, artwork_ids)),
+        "artwork_id": artwork_ids[0],
+        "category_id": category_sizes.first(),
+        "small_category_id": category_sizes.last(),
+        "tags": tags,
+        "search": options_data.TITLES[0].split()[0].lower(),
+        "image": "artworks/img1.jpeg",
+    }
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    index = max(0, min(len(sorted_values) - 1, round(fraction * len(sorted_values) + 0.5) - 1))
+    return sorted_values[index]
+
+
+async def measure(client, url, requests, concurrency, warmup):
+    latencies = []
+    statuses = Counter()
+    max_queries = 0
+
+    async def get():
+        # Warmup requests count for statuses and queries: they are the ones
+        # missing the cache.
+        nonlocal max_queries
+        response = await client.get(url)
+        statuses[response.status_code] += 1
+        max_queries = max(max_queries, int(response.headers.get("x-db-query-count", 0)))
+
+    for _ in range(warmup):
+        await get()
+
+    per_worker = [requests // concurrency + (i < requests % concurrency) for i in range(concurrency)]
+
+    async def worker(count):
+        for _ in range(count):
+            started = time.perf_counter()
+            await get()
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(count) for count in per_worker))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": requests,
+        "rps": round(requests / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 0.50), 3),
+        "p95_ms": round(percentile(latencies, 0.95), 3),
+        "p99_ms": round(percentile(latencies, 0.99), 3),
+        "max_queries": max_queries,
+        "statuses": {str(code): count for code, count in sorted(statuses.items())},
+    }
+
+
+async def run_size(options, size):
+    await sync_to_async(seed)(options, size)
+    ctx = await sync_to_async(scenario_context)()
+    # What the application startup does, as ASGITransport sends no lifespan events.
+    await sync_to_async(change_watcher.poll)()
+    await sync_to_async(tag_index.build)()
+
+    results = {}
+    transport = httpx.ASGITransport(app=application)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        first_page = (await client.get("/api/v1/get_all_artworks")).json()
+        ctx["cursor"] = first_page.get("next_cursor") or ""
+        for scenario in SCENARIOS:
+            if options.only and scenario.name not in options.only:
+                continue
+            url = scenario.url(ctx)
+            result = await measure(client, url, options.requests, options.concurrency, options.warmup)
+            results[scenario.name] = result
+            print(
+                f"  {scenario.name:<24} {result['rps']:>9.1f} req/s  p50 {result['p50_ms']:>8.2f}ms"
+                f"  p95 {result['p95_ms']:>8.2f}ms  p99 {result['p99_ms']:>8.2f}ms"
+                f"  queries {result['max_queries']:>2}  {result['statuses']}"
+            )
+    return results
+
+
+def compare(baseline, current, threshold, min_delta_ms):
+    """
+    List the metrics of ``current`` that are worse than ``baseline`` by more
+    than ``threshold`` (a fraction). Latencies also have to move by more than
+    ``min_delta_ms``, so sub-millisecond noise never fails a run.
+    """
+    regressions = []
+    for size, scenarios in current.items():
+        for name, result in scenarios.items():
+            errors = sum(count for code, count in result["statuses"].items() if code.startswith("5"))
+            if errors:
+                regressions.append(f"{size}/{name}: {errors} server errors (query budget exceeded?)")
+            reference = baseline.get(size, {}).get(name)
+            if reference is None:
+                continue
+            for metric in LATENCY_METRICS:
+                before, after = reference[metric], result[metric]
+                if after > before * (1 + threshold) and after - before > min_delta_ms:
+                    regressions.append(f"{size}/{name} {metric}: {before:.2f} -> {after:.2f}")
+            if result["rps"] < reference["rps"] * (1 - threshold):
+                regressions.append(f"{size}/{name} rps: {reference['rps']:.1f} -> {result['rps']:.1f}")
+    return regressions
+
+
+async def run(options):
+    await application.router.startup()
+    try:
+        results = {}
+        for size in options.sizes:
+            print(f"Dataset of {size} artworks")
+            results[str(size)] = await run_size(options, size)
+        return results
+    finally:
+        await application.router.shutdown()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description=(
+            "Benchmark every GET route of the API in-process against seeded datasets "
+            "and compare the results with a stored baseline. Runs on a separate test "
+            "database, the configured one is never touched."
+        )
+    )
+    parser.add_argument("--sizes", type=lambda v: [int(s) for s in v.split(",")], default=[1_000, 10_000, 100_000],
+                        help="Comma separated numbers of artworks to seed, one run per size.")
+    parser.add_argument("--tags", type=int, default=200, help="Number of distinct tags.")
+    parser.add_argument("--categories", type=int, default=30, help="Number of distinct categories.")
+    parser.add_argument("--seed", type=int, default=42, help="Seed of the generated datasets.")
+    parser.add_argument("--requests", type=int, default=500, help="Measured requests per scenario.")
+    parser.add_argument("--concurrency", type=int, default=8, help="Requests in flight at once.")
+    parser.add_argument("--warmup", type=int, default=20, help="Unmeasured requests sent first.")
+    parser.add_argument("--only", type=lambda v: set(v.split(",")), default=None,
+                        help="Comma separated scenario names to run.")
+    parser.add_argument("--no-cache", dest="cache", action="store_false",
+                        help="Disable the response cache, to measure the full code path.")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline file to compare with or write.")
+    parser.add_argument("--save-baseline", action="store_true", help="Write the results as the new baseline.")
+    parser.add_argument("--output", help="Also write the results of this run to this file.")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Allowed relative regression of any metric, 0.25 is 25%%.")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0,
+                        help="Latency increases smaller than this never count as regressions.")
+    parser.add_argument("--keepdb", action="store_true", help="Keep the test database between runs.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    options = parse_args(argv)
+    check_coverage()
+    if not options.cache:
+        response_cache.backend = NullCacheBackend()
+
+    test_database = connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=options.keepdb)
+    try:
+        results = asyncio.run(run(options))
+    finally:
+        connection.creation.destroy_test_db(test_database, verbosity=0, keepdb=options.keepdb)
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "database": connection.vendor,
+            "cache": options.cache,
+            "requests": options.requests,
+            "concurrency": options.concurrency,
+            "seed": options.seed,
+        },
+        "results": results,
+    }
+    if options.output:
+        with open(options.output, "w") as file:
+            json.dump(report, file, indent=2, sort_keys=True)
+
+    if options.save_baseline:
+        os.makedirs(os.path.dirname(options.baseline), exist_ok=True)
+        with open(options.baseline, "w") as file:
+            json.dump(report, file, indent=2, sort_keys=True)
+        print(f"Baseline written to {options.baseline}")
+        return 0
+
+    if not os.path.exists(options.baseline):
+        print(f"No baseline at {options.baseline}, run with --save-baseline first.")
+        return 0
+    with open(options.baseline) as file:
+        baseline = json.load(file)
+    if baseline["meta"] != report["meta"]:
+        print(f"Warning: baseline was recorded with different settings: {baseline['meta']}")
+
+    regressions = compare(baseline["results"], results, options.threshold, options.min_delta_ms)
+    if regressions:
+        print(f"{len(regressions)} regressions beyond {options.threshold:.0%}:")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+    print(f"No regression beyond {options.threshold:.0%} against {options.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,171 @@
+import os
+import sys
+import time
+import random
+import string
+import asyncio
+import logging
+import argparse
+
+# Setup Django environment
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "skti_system_backend.config.v1.django_settings")
+import django
+django.setup()
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from skti_system_backend.utils.v1.metrics import (
+    DB_QUERIES,
+    DB_TIME,
+    REQUEST_LATENCY,
+    REQUESTS_IN_PROGRESS,
+    route_label,
+    sample_threadpool_queues,
+)
+from skti_system_backend.utils.v1.middleware import (
+    ALLOWED_CONTENT_TYPES,
+    ContentTypeMiddleware,
+    InstrumentationMiddleware,
+)
+from skti_system_backend.utils.v1.query_stats import endpoint_query_budget, track_queries
+
+logger = logging.getLogger("middleware_benchmark")
+
+
+def bare_app():
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping():
+        return {"status": "OK"}
+
+    return app
+
+
+def before_app():
+    """The ``@app.middleware("http")`` stack this repo used to run."""
+    app = bare_app()
+
+    @app.middleware("http")
+    async def enforce_content_type(request: Request, call_next):
+        if request.method in ("POST", "PUT", "PATCH"):
+            ct = request.headers.get("Content-Type", "")
+            if not any(ct.startswith(a) for a in ALLOWED_CONTENT_TYPES):
+                return JSONResponse(status_code=415, content={"status": False})
+        return await call_next(request)
+
+    @app.middleware("http")
+    async def log_requests(request: Request, call_next):
+        rid = "".join(random.choices(string.ascii_uppercase + string.digits, k=6))
+        logger.info(f"rid={rid} start path={request.url.path}")
+        start = time.time()
+        response = await call_next(request)
+        ms = (time.time() - start) * 1000
+        logger.info(f"rid={rid} completed_in={ms:.2f}ms status={response.status_code}")
+        return response
+
+    @app.middleware("http")
+    async def record_metrics(request: Request, call_next):
+        sample_threadpool_queues()
+        in_progress = REQUESTS_IN_PROGRESS.labels(request.method)
+        in_progress.inc()
+        start = time.perf_counter()
+        response = await call_next(request)
+        in_progress.dec()
+        route = route_label(request.scope)
+        REQUEST_LATENCY.labels(request.method, route, str(response.status_code)).observe(time.perf_counter() - start)
+        return response
+
+    @app.middleware("http")
+    async def track_db_queries(request: Request, call_next):
+        with track_queries() as stats:
+            response = await call_next(request)
+        endpoint_query_budget(request.scope.get("endpoint"))
+        route = route_label(request.scope)
+        DB_TIME.labels(route).observe(stats.duration)
+        DB_QUERIES.labels(route).inc(stats.count)
+        response.headers["X-DB-Query-Count"] = str(stats.count)
+        response.headers["Server-Timing"] = f"db;dur={stats.duration_ms:.2f}"
+        return response
+
+    return app
+
+
+def after_app():
+    """The pure ASGI stack of ``api_application``."""
+    app = bare_app()
+    app.add_middleware(ContentTypeMiddleware)
+    app.add_middleware(InstrumentationMiddleware, logger=logger, stats_headers=True, strict_budget=False)
+    return app
+
+
+async def call(app):
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/ping",
+        "raw_path": b"/ping",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"benchmark")],
+        "client": ("127.0.0.1", 5000),
+        "server": ("benchmark", 80),
+        "app": app,
+    }
+
+    received = False
+    response_complete = asyncio.Event()
+
+    async def receive():
+        # The body once, then block until the response is sent and report a
+        # disconnect, as uvicorn does.
+        nonlocal received
+        if received:
+            await response_complete.wait()
+            return {"type": "http.disconnect"}
+        received = True
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.body" and not message.get("more_body", False):
+            response_complete.set()
+
+    await app(scope, receive, send)
+
+
+async def per_request_us(app, requests):
+    for _ in range(200):
+        await call(app)
+    started = time.perf_counter()
+    for _ in range(requests):
+        await call(app)
+    return (time.perf_counter() - started) / requests * 1e6
+
+
+async def main(requests, rounds):
+    apps = {"bare": bare_app(), "before": before_app(), "after": after_app()}
+    timings = {name: [] for name in apps}
+    for _ in range(rounds):
+        for name, app in apps.items():
+            timings[name].append(await per_request_us(app, requests))
+
+    best = {name: min(values) for name, values in timings.items()}
+    print(f"Best of {rounds} rounds of {requests} in-process GET /ping requests")
+    for name in apps:
+        overhead = best[name] - best["bare"]
+        print(f"  {name:<7} {best[name]:8.1f} us/request   middleware overhead {overhead:8.1f} us")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Per request cost of the middleware stack, before and after the pure ASGI rewrite."
+    )
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--rounds", type=int, default=5)
+    options = parser.parse_args()
+    asyncio.run(main(options.requests, options.rounds))
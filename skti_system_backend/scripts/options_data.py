@@ -1,128 +1,321 @@
+import io
 import os
 import sys
+import time
+import bisect
 import django
 import random
-from django.db import connection, transaction
+import argparse
+import itertools
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
 
 # Setup Django environment
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "skti_system_backend.config.v1.django_settings")
 django.setup()
 
-from skti_system_backend.models.v1.database.gallery import Tag, Category, Artwork
+from django.core.management.color import no_style
+from django.db import connection, transaction
+
+from skti_system_backend.models.v1.database.gallery import Tag, Category, Artwork, Tombstone
+from skti_system_backend.utils.v1.cache import ARTWORK_SCOPE, CATEGORY_SCOPE, TAG_SCOPE, response_cache
+from skti_system_backend.utils.v1.changes import next_change_seq
+from skti_system_backend.utils.v1.etag import bump_catalog_version
+from skti_system_backend.utils.v1.facets import rebuild_facet_counts
+from skti_system_backend.utils.v1.search import SEARCH_VECTOR_SQL
+
+TAGS = [
+    'Abstract', 'Modern', 'Classic', 'Monochrome', 'Landscape', 'Portrait', 'Impressionism',
+    'Sculpture', 'Surrealism', 'Expressionism', 'Cubism', 'Minimalism', 'Pop Art', 'Street Art',
+    'Digital', 'Photorealism', 'Nature', 'Animals', 'Urban', 'Fantasy', 'Mythology', 'Black & White',
+    'Colorful', 'Watercolor', 'Oil Painting', 'Acrylic', 'Ink', 'Mixed Media', 'Collage', 'Figurative'
+]
+
+CATEGORIES = [
+    'Painting', 'Sculpture', 'Photography', 'Digital Art', 'Printmaking', 'Ceramics',
+    'Textile', 'Installation', 'Drawing', 'Mixed Media', 'Performance Art', 'Graffiti',
+    'Glass Art', 'Conceptual Art', 'Street Photography', 'Film', 'Video Art'
+]
+
+TITLES = [
+    "Sunset Over the Hills", "Whispers of the Forest", "Urban Chaos", "Silent Reflections",
+    "Faces of Time", "Metallic Dreams", "Waves of Color", "Forgotten Ruins",
+    "Celestial Dance", "The Lonely Tree", "Burst of Life", "Vintage Streets",
+    "Mystic Mountains", "Refraction", "The Wanderer", "Golden Horizon",
+    "Dreamscape", "Neon Nights", "Serene Waters", "Flicker of Light",
+    "Echoes of the Past", "Crimson Sky", "Silver Lining", "Lost in Time",
+    "Dancing Shadows", "Frozen Moment", "Radiant Bloom", "Glass Maze",
+    "Beyond the Veil", "Twilight Whisper"
+]
+
+DESCRIPTIONS = [
+    "A vivid depiction of natural beauty and light.",
+    "Capturing the calm and peaceful moments in nature.",
+    "Expressive and dynamic artwork inspired by city life.",
+    "Reflective and serene landscape at dawn.",
+    "Deep emotions portrayed through a series of faces.",
+    "Modern sculpture with metal and light.",
+    "Digital waves flowing in colorful harmony.",
+    "Ancient ruins surrounded by nature's reclaim.",
+    "Surreal cosmic bodies in movement.",
+    "Minimalist representation of solitude.",
+    "Vibrant burst of color and energy.",
+    "Black and white classic city scenes.",
+    "Misty mountains with magical ambiance.",
+    "Light refraction through delicate glass art.",
+    "Spirit of adventure caught in sculpture.",
+    "Golden sun setting beyond the horizon.",
+    "Dream-like scenes filled with imagination.",
+    "City nights glowing in neon lights.",
+    "Tranquil waters reflecting skies.",
+    "Subtle flickers of light in darkness.",
+    "Historical echoes and forgotten tales.",
+    "Bright crimson sky at sunset.",
+    "Optimistic silver clouds and light.",
+    "Time lost in the sands of history.",
+    "Shadows dancing with mystery.",
+    "A frozen instant in the passage of time.",
+    "Blooming flowers radiant with life.",
+    "Maze of glass reflecting reality.",
+    "Mystical veil hiding secrets.",
+    "Soft whispers at twilight."
+]
 
-def reset_sequence(model_class):
-    sequence_name = f"{model_class._meta.db_table}_id_seq"
+IMAGE_COUNT = 30
+
+
+def uses_copy():
+    return connection.vendor == "postgresql"
+
+
+def reset_sequences(*model_classes):
+    """Point the id sequences past the explicit ids written by the generator."""
     with connection.cursor() as cursor:
-        cursor.execute(f"ALTER SEQUENCE {sequence_name} RESTART WITH 1;")
-        print(f"Reset sequence for {sequence_name}.")
+        for sql in connection.ops.sequence_reset_sql(no_style(), model_classes):
+            cursor.execute(sql)
+
 
-def reset_and_populate(model_class, data_list, field_name):
+def clear_gallery():
     with transaction.atomic():
-        model_class.objects.all().delete()
-        print(f"Cleared existing {model_class.__name__} entries.")
-        reset_sequence(model_class)
-
-        for item in data_list:
-            model_class.objects.create(**{field_name: item})
-        print(f"{model_class.__name__} table populated successfully.")
-
-def populate_tags():
-    tags = [
-        'Abstract', 'Modern', 'Classic', 'Monochrome', 'Landscape', 'Portrait', 'Impressionism',
-        'Sculpture', 'Surrealism', 'Expressionism', 'Cubism', 'Minimalism', 'Pop Art', 'Street Art',
-        'Digital', 'Photorealism', 'Nature', 'Animals', 'Urban', 'Fantasy', 'Mythology', 'Black & White',
-        'Colorful', 'Watercolor', 'Oil Painting', 'Acrylic', 'Ink', 'Mixed Media', 'Collage', 'Figurative'
-    ]
-    reset_and_populate(Tag, tags, "name")
+        if uses_copy():
+            with connection.cursor() as cursor:
+                cursor.execute("TRUNCATE artworks_tags, artworks, tags, categories, tombstones RESTART IDENTITY CASCADE;")
+        else:
+            Artwork.tags.through.objects.all().delete()
+            Artwork.all_objects.all().hard_delete()
+            Tag.objects.all().delete()
+            Category.objects.all().delete()
+            Tombstone.objects.all().delete()
+    print("Deleted all Artwork, Tag, and Category records.")
 
-def populate_categories():
-    categories = [
-        'Painting', 'Sculpture', 'Photography', 'Digital Art', 'Printmaking', 'Ceramics',
-        'Textile', 'Installation', 'Drawing', 'Mixed Media', 'Performance Art', 'Graffiti',
-        'Glass Art', 'Conceptual Art', 'Street Photography', 'Film', 'Video Art'
-    ]
-    reset_and_populate(Category, categories, "name")
 
-def populate_artworks():
-    with transaction.atomic():
-        Artwork.objects.all().delete()
-        print("Cleared existing Artwork entries.")
-        reset_sequence(Artwork)
-
-    tags_qs = list(Tag.objects.all())
-    categories_qs = list(Category.objects.all())
-
-    titles = [
-        "Sunset Over the Hills", "Whispers of the Forest", "Urban Chaos", "Silent Reflections",
-        "Faces of Time", "Metallic Dreams", "Waves of Color", "Forgotten Ruins",
-        "Celestial Dance", "The Lonely Tree", "Burst of Life", "Vintage Streets",
-        "Mystic Mountains", "Refraction", "The Wanderer", "Golden Horizon",
-        "Dreamscape", "Neon Nights", "Serene Waters", "Flicker of Light",
-        "Echoes of the Past", "Crimson Sky", "Silver Lining", "Lost in Time",
-        "Dancing Shadows", "Frozen Moment", "Radiant Bloom", "Glass Maze",
-        "Beyond the Veil", "Twilight Whisper"
+def names(base, count):
+    """``count`` unique names, the base list first and numbered variants after it."""
+    return [
+        base[i % len(base)] if i < len(base) else f"{base[i % len(base)]} {i // len(base) + 1}"
+        for i in range(count)
     ]
 
-    descriptions = [
-        "A vivid depiction of natural beauty and light.",
-        "Capturing the calm and peaceful moments in nature.",
-        "Expressive and dynamic artwork inspired by city life.",
-        "Reflective and serene landscape at dawn.",
-        "Deep emotions portrayed through a series of faces.",
-        "Modern sculpture with metal and light.",
-        "Digital waves flowing in colorful harmony.",
-        "Ancient ruins surrounded by nature's reclaim.",
-        "Surreal cosmic bodies in movement.",
-        "Minimalist representation of solitude.",
-        "Vibrant burst of color and energy.",
-        "Black and white classic city scenes.",
-        "Misty mountains with magical ambiance.",
-        "Light refraction through delicate glass art.",
-        "Spirit of adventure caught in sculpture.",
-        "Golden sun setting beyond the horizon.",
-        "Dream-like scenes filled with imagination.",
-        "City nights glowing in neon lights.",
-        "Tranquil waters reflecting skies.",
-        "Subtle flickers of light in darkness.",
-        "Historical echoes and forgotten tales.",
-        "Bright crimson sky at sunset.",
-        "Optimistic silver clouds and light.",
-        "Time lost in the sands of history.",
-        "Shadows dancing with mystery.",
-        "A frozen instant in the passage of time.",
-        "Blooming flowers radiant with life.",
-        "Maze of glass reflecting reality.",
-        "Mystical veil hiding secrets.",
-        "Soft whispers at twilight."
-    ]
 
-    for i in range(30):
-        artwork = Artwork.objects.create(
-            title=titles[i],
-            description=descriptions[i],
-            category=random.choice(categories_qs),
-            is_deleted=False,
+def zipf_cum_weights(count, skew):
+    """
+    Cumulative weights where the item of rank ``r`` is picked in proportion to
+    ``1 / r ** skew``. A skew of 0 is uniform, 1 and above gives a few very
+    popular items and a long tail, like real tag usage.
+    """
+    return list(itertools.accumulate(1 / (rank ** skew) for rank in range(1, count + 1)))
+
+
+def weighted_sample(rng, population, cum_weights, k):
+    """``k`` distinct items drawn with the given cumulative weights."""
+    total = cum_weights[-1]
+    chosen = set()
+    while len(chosen) < k:
+        chosen.add(population[bisect.bisect(cum_weights, rng.random() * total)])
+    return chosen
+
+
+@contextmanager
+def explicit_timestamps():
+    """Let ``bulk_create`` keep the generated ``created_at``/``updated_at``."""
+    fields = [Artwork._meta.get_field("created_at"), Artwork._meta.get_field("updated_at")]
+    saved = [(field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, (auto_now, auto_now_add) in zip(fields, saved):
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def populate_named(model_class, items):
+    model_class.objects.bulk_create(
+        [model_class(id=i, name=name) for i, name in enumerate(items, start=1)]
+    )
+    reset_sequences(model_class)
+    print(f"{model_class.__name__} table populated with {len(items)} entries.")
+    return list(range(1, len(items) + 1))
+
+
+def generate_artworks(options, tag_ids, category_ids):
+    """
+    Yield ``(artwork_row, tag_ids)`` pairs, oldest first.
+
+    Ids and ``created_at`` grow together, as they do in production, and the
+    whole stream only depends on ``options.seed``.
+    """
+    rng = random.Random(options.seed)
+    tag_weights = zipf_cum_weights(len(tag_ids), options.tag_skew)
+    category_weights = zipf_cum_weights(len(category_ids), options.category_skew)
+    # Popularity rank is independent of the id order.
+    tag_ids = rng.sample(tag_ids, len(tag_ids))
+    category_ids = rng.sample(category_ids, len(category_ids))
+
+    end = datetime.fromisoformat(options.end).replace(tzinfo=timezone.utc)
+    step = timedelta(days=options.days) / max(options.artworks, 1)
+    created_at = end - timedelta(days=options.days)
+    max_tags = min(options.max_tags, len(tag_ids))
+    min_tags = min(options.min_tags, max_tags)
+
+    for artwork_id in range(1, options.artworks + 1):
+        created_at += step * (0.5 + rng.random())
+        row = (
+            artwork_id,
+            f"{TITLES[rng.randrange(len(TITLES))]} #{artwork_id}",
+            DESCRIPTIONS[rng.randrange(len(DESCRIPTIONS))],
+            rng.choices(category_ids, cum_weights=category_weights)[0],
+            f"artworks/img{rng.randrange(IMAGE_COUNT) + 1}.jpeg",
+            rng.random() < options.deleted_ratio,
+            created_at,
+            created_at + timedelta(seconds=rng.randrange(30 * 24 * 3600)),
         )
-        artwork.image.name = f'artworks/img{i+1}.jpeg'
-        artwork.tags.set(random.sample(tags_qs, k=random.randint(1, 5)))
-        artwork.save()
+        yield row, weighted_sample(rng, tag_ids, tag_weights, rng.randint(min_tags, max_tags))
 
-    print("Artwork table populated successfully with 30 entries.")
 
-if __name__ == "__main__":
-    # First delete all data
+ARTWORK_COLUMNS = (
+    "id", "title", "description", "category_id", "image", "is_deleted", "created_at", "updated_at", "change_seq"
+)
+
+
+def _copy_value(value):
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value).replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+
+
+def _copy(cursor, table, columns, rows):
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write("\t".join(map(_copy_value, row)))
+        buffer.write("\n")
+    buffer.seek(0)
+    sql = f"COPY {table} ({', '.join(columns)}) FROM STDIN"
+    if hasattr(cursor, "copy_expert"):  # psycopg2
+        cursor.copy_expert(sql, buffer)
+    else:  # psycopg 3
+        with cursor.copy(sql) as copy:
+            copy.write(buffer.getvalue())
+
+
+def write_batch_copy(batch):
+    with transaction.atomic(), connection.cursor() as cursor:
+        _copy(cursor, Artwork._meta.db_table, ARTWORK_COLUMNS, (row for row, _ in batch))
+        _copy(
+            cursor,
+            Artwork.tags.through._meta.db_table,
+            ("artwork_id", "tag_id"),
+            ((row[0], tag_id) for row, tags in batch for tag_id in tags),
+        )
+
+
+def write_batch_orm(batch):
+    Through = Artwork.tags.through
     with transaction.atomic():
-        Artwork.objects.all().delete()
-        Tag.objects.all().delete()
-        Category.objects.all().delete()
-        print("Deleted all Artwork, Tag, and Category records.")
+        Artwork.objects.bulk_create(
+            [Artwork(**dict(zip(ARTWORK_COLUMNS, row))) for row, _ in batch]
+        )
+        Through.objects.bulk_create(
+            [Through(artwork_id=row[0], tag_id=tag_id) for row, tags in batch for tag_id in tags]
+        )
+
+
+def populate_artworks(options, tag_ids, category_ids):
+    write_batch = write_batch_copy if options.copy else write_batch_orm
+    started = time.monotonic()
+    written = 0
+    rows = generate_artworks(options, tag_ids, category_ids)
+    # One change for the whole seed, which the processes following the
+    # change counter see, the tag index rebuilding itself.
+    change_seq = next_change_seq()
+    with explicit_timestamps():
+        while True:
+            batch = [(row + (change_seq,), tags) for row, tags in itertools.islice(rows, options.batch_size)]
+            if not batch:
+                break
+            write_batch(batch)
+            written += len(batch)
+            elapsed = time.monotonic() - started
+            print(f"  {written}/{options.artworks} artworks ({written / elapsed:.0f} rows/s)", end="\r")
+    print()
+    reset_sequences(Artwork, Artwork.tags.through)
+    print(f"Artwork table populated with {written} entries in {time.monotonic() - started:.1f}s.")
+
+
+def refresh_derived_data():
+    """
+    Bulk writes skip the model signals, so recompute what they maintain:
+    search vectors, facet counts, planner statistics, and the cached
+    responses.
+    """
+    if uses_copy():
+        started = time.monotonic()
+        with connection.cursor() as cursor:
+            cursor.execute(SEARCH_VECTOR_SQL)
+            cursor.execute("ANALYZE artworks, artworks_tags, tags, categories;")
+        print(f"Search vectors and statistics refreshed in {time.monotonic() - started:.1f}s.")
+    categories, tags = rebuild_facet_counts()
+    print(f"Facet counts rebuilt for {categories} categories and {tags} tags.")
+    response_cache.invalidate(ARTWORK_SCOPE, CATEGORY_SCOPE, TAG_SCOPE)
+    bump_catalog_version()
 
-        reset_sequence(Artwork)
-        reset_sequence(Tag)
-        reset_sequence(Category)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Replace the gallery data with a reproducible synthetic dataset."
+    )
+    parser.add_argument("--artworks", type=int, default=30, help="Number of artworks to generate.")
+    parser.add_argument("--tags", type=int, default=len(TAGS), help="Number of distinct tags.")
+    parser.add_argument("--categories", type=int, default=len(CATEGORIES), help="Number of distinct categories.")
+    parser.add_argument("--min-tags", type=int, default=1, help="Fewest tags per artwork.")
+    parser.add_argument("--max-tags", type=int, default=5, help="Most tags per artwork.")
+    parser.add_argument("--tag-skew", type=float, default=1.0, help="Zipf exponent of tag popularity, 0 is uniform.")
+    parser.add_argument("--category-skew", type=float, default=0.8, help="Zipf exponent of category popularity, 0 is uniform.")
+    parser.add_argument("--deleted-ratio", type=float, default=0.0, help="Fraction of soft deleted artworks.")
+    parser.add_argument("--days", type=int, default=730, help="Span of created_at, ending at --end.")
+    parser.add_argument("--end", default="2025-01-01T00:00:00", help="Newest possible created_at (UTC).")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed, the same seed gives the same data.")
+    parser.add_argument("--batch-size", type=int, default=10_000, help="Artworks written per transaction.")
+    parser.add_argument(
+        "--no-copy", dest="copy", action="store_false",
+        help="Use bulk_create even on Postgres, where COPY is used by default."
+    )
+    options = parser.parse_args(argv)
+    options.copy = options.copy and uses_copy()
+    return options
+
+
+if __name__ == "__main__":
+    options = parse_args()
+
+    # First delete all data
+    clear_gallery()
 
     # Repopulate all
-    populate_tags()
-    populate_categories()
-    populate_artworks()
+    tag_ids = populate_named(Tag, names(TAGS, options.tags))
+    category_ids = populate_named(Category, names(CATEGORIES, options.categories))
+    populate_artworks(options, tag_ids, category_ids)
+    refresh_derived_data()
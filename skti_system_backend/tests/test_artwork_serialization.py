@@ -0,0 +1,82 @@
+import json
+from datetime import datetime, timezone
+from unittest import mock
+
+from django.test import TestCase
+
+from skti_system_backend.config.v1.api_config import api_config
+from skti_system_backend.core.v1.api.gallery import _render_artworks
+from skti_system_backend.models.v1.api.gallery import ArtworksResponse
+from skti_system_backend.models.v1.database.gallery import Artwork, Category, Tag
+
+
+class ArtworkSerializationContractTest(TestCase):
+    """
+    The ``values_list``/orjson renderer must write the same JSON as the
+    ``ArtworksResponse`` path it replaced, for the same rows.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        painting = Category.objects.create(name="Painting")
+        sketch = Category.objects.create(name="Sketch")
+        oil, portrait = Tag.objects.create(name="oil"), Tag.objects.create(name="portrait")
+
+        # Null description and no image, a microsecond timestamp.
+        cls.bare = Artwork.objects.create(title="Bare", description=None, category=painting, image="")
+        # Whole second timestamps, which Pydantic writes without a fraction.
+        cls.tagged = Artwork.objects.create(
+            title="Tagged", description="Two tags", category=painting, image="artworks/tagged.jpg"
+        )
+        cls.tagged.tags.set([portrait, oil])
+        cls.unicode = Artwork.objects.create(
+            title="Ünïcode \"quoted\"", description="", category=sketch, image="artworks/ü.png"
+        )
+        cls.deleted = Artwork.objects.create(title="Deleted", category=sketch, image="artworks/gone.jpg")
+        cls.deleted.delete()
+
+        Artwork.all_objects.filter(pk=cls.bare.pk).update(
+            created_at=datetime(2024, 5, 1, 10, 30, 15, 123456, tzinfo=timezone.utc)
+        )
+        Artwork.all_objects.filter(pk=cls.tagged.pk).update(
+            created_at=datetime(2024, 5, 1, 10, 30, 15, tzinfo=timezone.utc),
+            updated_at=datetime(2024, 6, 2, 0, 0, tzinfo=timezone.utc),
+        )
+
+    def render(self, fast, queryset, cursor=None, limit=10):
+        with mock.patch.object(api_config, "FAST_SERIALIZATION", fast):
+            return _render_artworks(queryset, cursor, limit, "Artworks retrieved", "No artworks found")
+
+    def assert_same(self, queryset, cursor=None, limit=10):
+        pydantic = self.render(False, queryset, cursor, limit)
+        fast = self.render(True, queryset, cursor, limit)
+        self.assertEqual(fast.status_code, pydantic.status_code)
+        self.assertEqual(json.loads(fast.body), json.loads(pydantic.body))
+        ArtworksResponse.model_validate_json(fast.body)
+        return json.loads(fast.body)
+
+    def test_full_page(self):
+        body = self.assert_same(Artwork.objects.all())
+        by_title = {artwork["title"]: artwork for artwork in body["data"]}
+        self.assertEqual(len(body["data"]), 3)
+        self.assertIsNone(by_title["Bare"]["description"])
+        self.assertIsNone(by_title["Bare"]["image_url"])
+        self.assertEqual(by_title["Bare"]["created_at"], "2024-05-01T10:30:15.123456Z")
+        self.assertEqual(by_title["Tagged"]["created_at"], "2024-05-01T10:30:15Z")
+        self.assertEqual(by_title["Tagged"]["tags"], ["oil", "portrait"])
+        self.assertIsNone(body["next_cursor"])
+
+    def test_cursor_pages(self):
+        first = self.assert_same(Artwork.objects.all(), limit=2)
+        self.assertIsNotNone(first["next_cursor"])
+        second = self.assert_same(Artwork.objects.all(), cursor=first["next_cursor"], limit=2)
+        self.assertEqual(len(second["data"]), 1)
+        self.assertIsNone(second["next_cursor"])
+
+    def test_category_filter(self):
+        self.assert_same(Artwork.objects.filter(category__name="Sketch"))
+
+    def test_not_found(self):
+        body = self.assert_same(Artwork.objects.filter(pk=-1))
+        self.assertEqual(body["status_code"], 404)
+        self.assertEqual(body["data"], [])
@@ -0,0 +1,154 @@
+import asyncio
+from unittest import mock
+
+import fakeredis
+from django.db import transaction
+from django.db.models import F
+from django.test import TestCase
+
+from skti_system_backend.models.v1.database.gallery import Artwork, Category, ChangeCounter, Tag
+from skti_system_backend.utils.v1 import etag
+from skti_system_backend.utils.v1.cache import (
+    ARTWORK_SCOPE,
+    CATEGORY_SCOPE,
+    TAG_SCOPE,
+    CachedResponse,
+    InMemoryCacheBackend,
+    RedisCacheBackend,
+    ResponseCache,
+    artwork_category_scope,
+    response_cache,
+)
+from skti_system_backend.utils.v1.changes import read_change_seq
+
+
+def foreign_change_seq():
+    """Hand out a change number the way another process would."""
+    ChangeCounter.objects.filter(pk=1).update(value=F("value") + 1)
+    return read_change_seq()
+
+
+class LocalBackendInvalidationTest(TestCase):
+    """
+    With the process local backend, the writes of other processes picked up
+    by the change watcher drop the scopes they touched only, and the
+    process' own writes, dropped by the signal handlers, nothing more.
+    """
+
+    def setUp(self):
+        for patch in (
+            mock.patch.object(response_cache, "backend", InMemoryCacheBackend()),
+            mock.patch.object(etag, "_published_seq", None),
+        ):
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.painting = Category.objects.create(name="Painting")
+        self.sketch = Category.objects.create(name="Sketch")
+        self.artwork = Artwork.objects.create(title="Still life", category=self.painting)
+        self.scopes = [
+            ARTWORK_SCOPE, CATEGORY_SCOPE, TAG_SCOPE,
+            artwork_category_scope(self.painting.pk), artwork_category_scope(self.sketch.pk),
+        ]
+        self.publish()
+
+    def generations(self):
+        keys = [response_cache._generation_key(scope) for scope in self.scopes]
+        raw = asyncio.run(response_cache.backend.get_many(keys))
+        return {scope: int(value or 0) for scope, value in zip(self.scopes, raw)}
+
+    def publish(self):
+        before = self.generations()
+        value = read_change_seq()
+        etag._publish_catalog_version(value)
+        self.assertEqual(asyncio.run(etag.catalog_version()), str(value))
+        after = self.generations()
+        return {scope for scope in self.scopes if after[scope] != before[scope]}
+
+    def test_own_writes(self):
+        before = self.generations()
+        with self.captureOnCommitCallbacks(execute=True):
+            Artwork.objects.create(title="Portrait", category=self.sketch)
+            self.artwork.title = "Still life II"
+            self.artwork.save()
+        self.publish()
+        after = self.generations()
+        # Only what the signal handlers invalidated.
+        self.assertEqual(
+            {scope for scope in self.scopes if after[scope] != before[scope]},
+            set(self.scopes) - {CATEGORY_SCOPE, TAG_SCOPE},
+        )
+
+    def test_rolled_back_own_write(self):
+        try:
+            with transaction.atomic():
+                Category.objects.create(name="Drawing")
+                raise RuntimeError
+        except RuntimeError:
+            pass
+        # Another process is handed the same number.
+        Category.objects.filter(pk=self.sketch.pk).update(name="Drawing", change_seq=foreign_change_seq())
+        self.assertEqual(self.publish(), {CATEGORY_SCOPE})
+
+    def test_other_process_artwork_write(self):
+        Artwork.all_objects.filter(pk=self.artwork.pk).update(category=self.sketch, change_seq=foreign_change_seq())
+        self.assertEqual(self.publish(), set(self.scopes) - {CATEGORY_SCOPE, TAG_SCOPE})
+
+    def test_other_process_category_write(self):
+        Category.objects.filter(pk=self.sketch.pk).update(name="Drawing", change_seq=foreign_change_seq())
+        self.assertEqual(self.publish(), {CATEGORY_SCOPE})
+
+    def test_other_process_tag_write(self):
+        Tag.objects.bulk_create([Tag(name="ink")])
+        foreign_change_seq()
+        self.assertEqual(self.publish(), {TAG_SCOPE})
+
+
+class SharedBackendTest(TestCase):
+    """
+    Two processes sharing a Redis backend, here two backends on one
+    ``fakeredis`` server, see each other's entries, invalidations and
+    catalog version at once.
+    """
+
+    def setUp(self):
+        server = fakeredis.FakeServer()
+        self.caches = [
+            ResponseCache(
+                RedisCacheBackend(
+                    client=fakeredis.FakeRedis(server=server),
+                    async_client=fakeredis.FakeAsyncRedis(server=server),
+                ),
+                prefix="test",
+                ttl=60,
+            )
+            for _ in range(2)
+        ]
+
+    def test_entries_and_invalidation(self):
+        writer, reader = self.caches
+
+        async def build_keys():
+            return [
+                await cache.build_key("get_all_categories", (CATEGORY_SCOPE,), {}) for cache in self.caches
+            ]
+
+        key, other_key = asyncio.run(build_keys())
+        self.assertEqual(key, other_key)
+        asyncio.run(writer.set(key, CachedResponse(200, b"{}")))
+        self.assertEqual(asyncio.run(reader.get(key)).body, b"{}")
+
+        writer.invalidate(CATEGORY_SCOPE)
+        key, other_key = asyncio.run(build_keys())
+        self.assertEqual(key, other_key)
+        self.assertIsNone(asyncio.run(reader.get(key)))
+
+    def test_catalog_version(self):
+        writer, reader = self.caches
+        with mock.patch.object(response_cache, "backend", writer.backend), \
+                mock.patch.object(response_cache, "prefix", "test"):
+            etag.bump_catalog_version()
+            value = read_change_seq()
+            self.assertEqual(asyncio.run(reader.backend.get("test:catalog_version")), str(value).encode())
+            # The version never goes back, whichever writer publishes last.
+            writer.backend.advance("test:catalog_version", value - 1)
+            self.assertEqual(asyncio.run(etag.catalog_version()), str(value))
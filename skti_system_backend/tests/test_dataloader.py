@@ -0,0 +1,41 @@
+import asyncio
+from unittest import TestCase
+
+from skti_system_backend.utils.v1.dataloader import DataLoader
+
+
+class DataLoaderTest(TestCase):
+
+    def run_loads(self, max_batch_size, *lookups):
+        batches = []
+
+        async def batch_fn(keys):
+            batches.append(keys)
+            return {key: key * 10 for key in keys if key > 0}
+
+        async def run():
+            loader = DataLoader(batch_fn, 0.001, max_batch_size)
+            return await asyncio.gather(*(lookup(loader) for lookup in lookups))
+
+        return asyncio.run(run()), batches
+
+    def test_coalesces_concurrent_lookups(self):
+        results, batches = self.run_loads(
+            10,
+            lambda loader: loader.load(1),
+            lambda loader: loader.load_many([2, 1, -3]),
+        )
+        self.assertEqual(results, [10, [20, 10, None]])
+        self.assertEqual(batches, [[1, 2, -3]])
+
+    def test_load_many_never_spans_batches(self):
+        results, batches = self.run_loads(
+            4,
+            lambda loader: loader.load_many([1, 2, 3]),
+            lambda loader: loader.load_many([3, 4, 5, 6, 7, 8]),
+            lambda loader: loader.load(9),
+        )
+        self.assertEqual(results, [[10, 20, 30], [30, 40, 50, 60, 70, 80], 90])
+        # The open batch is sent before the keys that would overflow it, which
+        # then go out together, over the maximum.
+        self.assertEqual(batches, [[1, 2, 3], [3, 4, 5, 6, 7, 8], [9]])
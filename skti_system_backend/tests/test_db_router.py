@@ -0,0 +1,150 @@
+import asyncio
+import contextvars
+import os
+import shutil
+import tempfile
+import time
+from unittest import mock
+
+import httpx
+from django.db import connections
+from django.db.backends.sqlite3.base import DatabaseWrapper as SQLiteDatabaseWrapper
+from django.test import TestCase, override_settings
+
+from skti_system_backend.models.v1.database.gallery import Category
+from skti_system_backend.utils.v1 import db_router
+from skti_system_backend.utils.v1.db_router import ReplicaMonitor, primary_pinned, replica_reads
+from skti_system_backend.utils.v1.middleware import PrimaryAfterWriteMiddleware
+
+REPLICA = "test_replica"
+
+
+@override_settings(DATABASE_REPLICAS=[REPLICA])
+class ReplicaRoutingTest(TestCase):
+    """
+    Reads opted in with ``replica_reads`` go to a second SQLite database
+    standing in for a replica, holding rows of its own so that every read
+    shows where it went.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # A connection of this thread only, unknown to the settings, which
+        # the test case lets through.
+        cls.directory = tempfile.mkdtemp()
+        settings_dict = connections.configure_settings({
+            "default": connections.settings["default"],
+            REPLICA: {"ENGINE": "django.db.backends.sqlite3", "NAME": os.path.join(cls.directory, "replica.sqlite3")},
+        })[REPLICA]
+        connections[REPLICA] = SQLiteDatabaseWrapper(settings_dict, REPLICA)
+        with connections[REPLICA].schema_editor() as editor:
+            editor.create_model(Category)
+        Category.objects.using(REPLICA).create(name="On the replica")
+
+    @classmethod
+    def tearDownClass(cls):
+        connections[REPLICA].close()
+        del connections[REPLICA]
+        shutil.rmtree(cls.directory)
+        super().tearDownClass()
+
+    def setUp(self):
+        Category.objects.create(name="On the primary")
+        self.monitor = ReplicaMonitor(max_lag=5, interval=3600)
+        for patch in (
+            mock.patch.object(db_router, "replica_monitor", self.monitor),
+            # Checked by the tests, not by the monitor thread.
+            mock.patch.object(self.monitor, "start"),
+        ):
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def read(self, replica=True):
+        def run():
+            if not replica:
+                return list(Category.objects.values_list("name", flat=True))
+            with replica_reads():
+                return list(Category.objects.values_list("name", flat=True))
+        # Each read in a fresh context, as each request runs in one: writes
+        # pin the context they run in to the primary.
+        return contextvars.Context().run(run)
+
+    def test_reads_go_to_a_healthy_replica(self):
+        self.assertEqual(self.monitor.check(), [REPLICA])
+        self.assertEqual(self.monitor.lags(), {REPLICA: 0.0})
+        self.assertEqual(self.read(), ["On the replica"])
+        self.assertEqual(self.read(replica=False), ["On the primary"])
+
+    def test_no_replica_read_before_the_first_check(self):
+        self.assertEqual(self.read(), ["On the primary"])
+
+    def test_lagging_replica_falls_back_to_the_primary(self):
+        with mock.patch.object(ReplicaMonitor, "measure_lag", return_value=6.0):
+            self.assertEqual(self.monitor.check(), [])
+        self.assertEqual(self.read(), ["On the primary"])
+
+        with mock.patch.object(ReplicaMonitor, "measure_lag", return_value=4.0):
+            self.assertEqual(self.monitor.check(), [REPLICA])
+        self.assertEqual(self.read(), ["On the replica"])
+
+    def test_unreachable_replica_falls_back_to_the_primary(self):
+        with mock.patch.object(ReplicaMonitor, "measure_lag", side_effect=ConnectionError("down")):
+            self.assertEqual(self.monitor.check(), [])
+        self.assertEqual(self.monitor.lags(), {REPLICA: None})
+        self.assertEqual(self.read(), ["On the primary"])
+
+    def test_reads_after_a_write_stay_on_the_primary(self):
+        self.monitor.check()
+
+        def write_then_read():
+            with replica_reads():
+                before = list(Category.objects.values_list("name", flat=True))
+                Category.objects.create(name="Written")
+                after = list(Category.objects.order_by("name").values_list("name", flat=True))
+            return before, after
+
+        before, after = contextvars.Context().run(write_then_read)
+        self.assertEqual(before, ["On the replica"])
+        self.assertEqual(after, ["On the primary", "Written"])
+        # Other requests read from the replica again.
+        self.assertEqual(self.read(), ["On the replica"])
+
+
+class PrimaryAfterWriteMiddlewareTest(TestCase):
+    """A client that wrote reads from the primary until its cookie expires."""
+
+    def setUp(self):
+        async def app(scope, receive, send):
+            body = b"primary" if primary_pinned() else b"replica"
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+            await send({"type": "http.response.body", "body": body})
+
+        self.app = PrimaryAfterWriteMiddleware(app, sticky_seconds=10)
+
+    def requests(self, *calls):
+        async def run():
+            transport = httpx.ASGITransport(app=self.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                return [await client.request(method, "/", cookies=cookies) for method, cookies in calls]
+        # Away from the primary pinning of the writes of other tests.
+        return contextvars.Context().run(asyncio.run, run())
+
+    def test_sticky_reads_after_a_write(self):
+        (write,) = self.requests(("POST", None))
+        cookie = write.cookies["skti_primary_until"]
+        self.assertAlmostEqual(float(cookie), time.time() + 10, delta=2)
+        self.assertIn("Max-Age=10", write.headers["set-cookie"])
+
+        pinned, other, expired = self.requests(
+            ("GET", {"skti_primary_until": cookie}),
+            ("GET", None),
+            ("GET", {"skti_primary_until": str(int(time.time()) - 1)}),
+        )
+        self.assertEqual(pinned.text, "primary")
+        self.assertEqual(other.text, "replica")
+        self.assertEqual(expired.text, "replica")
+
+    def test_reads_set_no_cookie(self):
+        (read,) = self.requests(("GET", None))
+        self.assertNotIn("set-cookie", read.headers)
@@ -0,0 +1,79 @@
+import asyncio
+import os
+import tempfile
+from unittest import mock
+
+import httpx
+from django.test import SimpleTestCase
+from PIL import Image
+
+from skti_system_backend.api_application import application
+from skti_system_backend.core.v1.api import media
+from skti_system_backend.utils.v1.images import DerivativeCache
+from skti_system_backend.utils.v1.static import MediaFiles
+
+
+class ImageDerivativeTest(SimpleTestCase):
+    """
+    Derivatives are served like the /media files, and sources Pillow cannot
+    or must not decode are client errors rather than server errors.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        directory = tempfile.TemporaryDirectory()
+        cls.addClassCleanup(directory.cleanup)
+        cls.media_root = directory.name
+        os.makedirs(os.path.join(cls.media_root, "artworks"))
+        Image.new("RGB", (64, 48), "teal").save(os.path.join(cls.media_root, "artworks", "still.png"))
+        with open(os.path.join(cls.media_root, "artworks", "notes.png"), "wb") as file:
+            file.write(b"not an image at all")
+        # Twice Pillow's default pixel limit, cheap to store as a 1-bit PNG.
+        Image.new("1", (14000, 14000)).save(os.path.join(cls.media_root, "artworks", "bomb.png"))
+
+        cls.derivative_cache = DerivativeCache(cls.media_root, "derivatives", 10 * 1024 * 1024, 1)
+        cls.addClassCleanup(cls.derivative_cache.shutdown)
+
+    def setUp(self):
+        derivative_files = MediaFiles(
+            directory=self.derivative_cache.root, max_age=60, immutable_max_age=31536000, check_dir=False
+        )
+        for patch in (
+            mock.patch.object(media, "derivative_cache", self.derivative_cache),
+            mock.patch.object(media, "derivative_files", derivative_files),
+            mock.patch.object(application.state.limiter, "enabled", False),
+        ):
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def get(self, path, headers=None):
+        async def run():
+            transport = httpx.ASGITransport(app=application)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                return await client.get(f"/api/v1/images/{path}", headers=headers)
+
+        return asyncio.run(run())
+
+    def test_derivative(self):
+        response = self.get("artworks/still.png?width=32&format=png")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["content-type"], "image/png")
+        self.assertEqual(response.headers["cache-control"], "public, max-age=31536000, immutable")
+        self.assertEqual(response.headers["accept-ranges"], "bytes")
+
+        ranged = self.get("artworks/still.png?width=32&format=png", {"Range": "bytes=0-7"})
+        self.assertEqual(ranged.status_code, 206)
+        self.assertEqual(ranged.content, response.content[:8])
+        revalidated = self.get("artworks/still.png?width=32&format=png", {"If-None-Match": response.headers["etag"]})
+        self.assertEqual(revalidated.status_code, 304)
+
+    def test_not_an_image(self):
+        response = self.get("artworks/notes.png?width=32")
+        self.assertEqual(response.status_code, 415)
+        self.assertEqual(response.json()["status_code"], 415)
+
+    def test_decompression_bomb(self):
+        response = self.get("artworks/bomb.png?width=32")
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(response.json()["status_code"], 422)
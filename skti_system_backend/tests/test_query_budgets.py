@@ -0,0 +1,102 @@
+import asyncio
+from unittest import mock
+
+import httpx
+from django.db.models import Count
+from django.test import TransactionTestCase
+from fastapi.routing import APIRoute
+
+from skti_system_backend.api_application import application
+from skti_system_backend.config.v1.api_config import api_config
+from skti_system_backend.models.v1.database.gallery import Artwork, Category, Tag
+from skti_system_backend.scripts import options_data
+from skti_system_backend.utils.v1.cache import NullCacheBackend, response_cache
+from skti_system_backend.utils.v1.changes import change_watcher
+from skti_system_backend.utils.v1.query_stats import assert_max_queries, endpoint_query_budget
+from skti_system_backend.utils.v1.search import search_index
+from skti_system_backend.utils.v1.tag_index import tag_index
+
+# Route template and URL of every budgeted endpoint, filled from the seeded data.
+REQUESTS = [
+    ("/api/v1/get_all_categories", "/api/v1/get_all_categories"),
+    ("/api/v1/get_all_artworks", "/api/v1/get_all_artworks"),
+    ("/api/v1/get_all_artworks", "/api/v1/get_all_artworks?cursor={cursor}"),
+    ("/api/v1/get_all_artworks", "/api/v1/get_all_artworks?fields=id,title,tags&limit=100"),
+    ("/api/v1/get_artworks_by_category/{category_id}", "/api/v1/get_artworks_by_category/{category_id}"),
+    ("/api/v1/get_artworks_by_tags", "/api/v1/get_artworks_by_tags?all={tag}&not={other_tag}"),
+    ("/api/v1/search", "/api/v1/search?q={search}"),
+    ("/api/v1/search", "/api/v1/search?q={search}&offset=20&fields=id,title"),
+    ("/api/v1/artworks", "/api/v1/artworks?ids={artwork_ids}"),
+    ("/api/v1/artworks/{artwork_id}", "/api/v1/artworks/{artwork_id}"),
+    ("/api/v1/artworks/{artwork_id}", "/api/v1/artworks/999999999"),
+    ("/api/v1/changes", "/api/v1/changes"),
+    ("/api/v1/facets", "/api/v1/facets"),
+    ("/api/v1/images/{path:path}", "/api/v1/images/artworks/missing.jpeg?width=320"),
+]
+
+
+class QueryBudgetTest(TransactionTestCase):
+    """
+    Every budgeted endpoint stays within its ``query_budget`` on a small and
+    a ten times larger catalog, with the response cache off so each request
+    reaches the database.
+    """
+
+    def setUp(self):
+        patches = [
+            mock.patch.object(response_cache, "backend", NullCacheBackend()),
+            mock.patch.object(application.state.limiter, "enabled", False),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def seed(self, size):
+        seed_options = options_data.parse_args(["--artworks", str(size), "--tags", "40", "--categories", "8"])
+        tag_ids = options_data.populate_named(Tag, options_data.names(options_data.TAGS, 40))
+        category_ids = options_data.populate_named(Category, options_data.names(options_data.CATEGORIES, 8))
+        options_data.populate_artworks(seed_options, tag_ids, category_ids)
+        options_data.refresh_derived_data()
+        # What the application startup does, as ASGITransport sends no lifespan events.
+        search_index.reset()
+        change_watcher.poll()
+        tag_index.build()
+
+    def context(self):
+        tags = list(Tag.objects.annotate(n=Count("artworks")).order_by("-n").values_list("name", flat=True)[:2])
+        artwork_ids = list(Artwork.objects.order_by("id").values_list("id", flat=True)[:api_config.MAX_PAGE_SIZE])
+        return {
+            "category_id": Category.objects.order_by("id").values_list("id", flat=True).first(),
+            "tag": tags[0],
+            "other_tag": tags[1],
+            "search": options_data.TITLES[0].split()[0].lower(),
+            "artwork_ids": ",".join(map(str, artwork_ids)),
+            "artwork_id": artwork_ids[0],
+        }
+
+    def assert_within_budgets(self, size):
+        self.seed(size)
+        context = self.context()
+        endpoints = {route.path: route.endpoint for route in application.routes if isinstance(route, APIRoute)}
+
+        async def run():
+            transport = httpx.ASGITransport(app=application)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                first_page = (await client.get("/api/v1/get_all_artworks")).json()
+                context["cursor"] = first_page["next_cursor"]
+                for route, url in REQUESTS:
+                    url = url.format(**context)
+                    budget = endpoint_query_budget(endpoints[route])
+                    with self.subTest(size=size, url=url):
+                        self.assertIsNotNone(budget)
+                        with assert_max_queries(budget):
+                            response = await client.get(url)
+                        self.assertLess(response.status_code, 500, response.text)
+
+        asyncio.run(run())
+
+    def test_small_catalog(self):
+        self.assert_within_budgets(30)
+
+    def test_large_catalog(self):
+        self.assert_within_budgets(300)
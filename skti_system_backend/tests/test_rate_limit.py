@@ -0,0 +1,85 @@
+import asyncio
+from types import SimpleNamespace
+from unittest import TestCase
+
+import fakeredis
+from starlette.requests import Request
+
+from skti_system_backend.utils.v1.errors import RateLimitExceededException
+from skti_system_backend.utils.v1.rate_limit import (
+    InMemoryRateLimitBackend,
+    Rate,
+    RateLimiter,
+    RedisRateLimitBackend,
+    parse_rate,
+)
+
+
+def make_request(api_key=None, host="203.0.113.7"):
+    headers = [(b"x-api-key", api_key.encode())] if api_key else []
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "path": "/api/v1/search",
+        "headers": headers,
+        "client": (host, 1234),
+        "route": SimpleNamespace(path="/api/v1/search"),
+    })
+
+
+class ClientKeyTest(TestCase):
+
+    def setUp(self):
+        self.limiter = RateLimiter(
+            InMemoryRateLimitBackend(),
+            Rate(2, 60),
+            key_rates={"internal-key": None, "spoofed-key": None},
+            key_header="X-API-Key",
+            api_keys=["internal-key", "partner-key"],
+        )
+
+    def admitted(self, requests):
+        async def run():
+            count = 0
+            for request in requests:
+                try:
+                    await self.limiter.check(request)
+                except RateLimitExceededException:
+                    continue
+                count += 1
+            return count
+        return asyncio.run(run())
+
+    def test_configured_key_identifies_the_client(self):
+        self.assertEqual(self.limiter.client_key(make_request("partner-key")), "partner-key")
+        self.assertEqual(self.admitted([make_request("partner-key", host=f"10.0.0.{n}") for n in range(5)]), 2)
+        self.assertEqual(self.admitted([make_request("internal-key") for _ in range(5)]), 5)
+
+    def test_unknown_keys_fall_back_to_the_address(self):
+        self.assertEqual(self.limiter.client_key(make_request("made-up")), "203.0.113.7")
+        # A fresh value per request does not give a fresh bucket.
+        self.assertEqual(self.admitted([make_request(f"key-{n}") for n in range(5)]), 2)
+
+    def test_unauthenticated_key_cannot_claim_a_key_rate(self):
+        self.assertEqual(self.admitted([make_request("spoofed-key") for _ in range(5)]), 2)
+
+
+class RedisGcraTest(TestCase):
+    """The Lua script run on a ``fakeredis`` server admits what ``gcra`` does."""
+
+    def test_bucket(self):
+        async def run():
+            backend = RedisRateLimitBackend(async_client=fakeredis.FakeAsyncRedis())
+            rate = parse_rate("3/minute")
+            waits = [await backend.hit("search|client", rate) for _ in range(4)]
+            other = await backend.hit("search|other", rate)
+            ttl = await backend._client.pttl("skti:ratelimit:search|client")
+            return waits, other, ttl
+
+        waits, other, ttl = asyncio.run(run())
+        self.assertEqual(waits[:3], [0.0, 0.0, 0.0])
+        # The next token comes an interval after the first request.
+        self.assertAlmostEqual(waits[3], 20.0, delta=1.0)
+        self.assertEqual(other, 0.0)
+        # The stored arrival time expires once the bucket is full again.
+        self.assertAlmostEqual(ttl / 1000, 60.0, delta=1.0)
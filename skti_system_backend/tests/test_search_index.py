@@ -0,0 +1,80 @@
+from unittest import mock
+
+from django.test import TestCase
+
+from skti_system_backend.models.v1.database.gallery import Artwork, Category, Tag, Tombstone
+from skti_system_backend.utils.v1 import search
+from skti_system_backend.utils.v1.changes import read_change_seq
+from skti_system_backend.utils.v1.search import InMemorySearchIndex
+
+
+class InMemorySearchIndexTest(TestCase):
+    """
+    The in-memory fallback follows the writes it did not make itself through
+    the change watcher, and re-reads them in chunks of bounded ``IN`` lists.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = Category.objects.create(name="Painting")
+        cls.oil = Tag.objects.create(name="oil")
+        cls.still_life = Artwork.objects.create(title="Still life", category=cls.category)
+        cls.harbour = Artwork.objects.create(title="Harbour at dusk", category=cls.category)
+        cls.harbour.tags.add(cls.oil)
+
+    def setUp(self):
+        self.index = InMemorySearchIndex()
+
+    def ids(self, query):
+        return {artwork_id for artwork_id, _ in self.index.search(query, 0, 10)}
+
+    def test_build(self):
+        self.assertEqual(self.ids("oil harbour"), {self.harbour.pk})
+        self.assertEqual(self.ids("life"), {self.still_life.pk})
+        self.assertEqual(self.index._seq, read_change_seq())
+
+    def test_catch_up_with_other_writes(self):
+        self.ids("life")
+        # Signal handlers defer their refresh to the commit, which a TestCase
+        # never reaches, so for the index these writes are somebody else's.
+        still_life = Artwork.objects.get(pk=self.still_life.pk)
+        still_life.title = "Nocturne"
+        still_life.save()
+        still_life.tags.add(self.oil)
+        marina = Artwork.objects.create(title="Marina", category=self.category)
+        self.harbour.delete()
+        self.assertEqual(self.ids("life"), {self.still_life.pk})
+
+        self.index.catch_up(read_change_seq())
+        self.assertEqual(self.ids("life"), set())
+        self.assertEqual(self.ids("nocturne oil"), {self.still_life.pk})
+        self.assertEqual(self.ids("marina"), {marina.pk})
+        self.assertEqual(self.ids("harbour"), set())
+        self.assertEqual(self.index._seq, read_change_seq())
+
+    def test_catch_up_with_hard_deletes(self):
+        self.ids("harbour")
+        Artwork.all_objects.filter(pk=self.harbour.pk).hard_delete()
+        self.assertTrue(Tombstone.objects.filter(kind=Tombstone.ARTWORK, object_id=self.harbour.pk).exists())
+        self.index.catch_up(read_change_seq())
+        self.assertEqual(self.ids("harbour"), set())
+
+    def test_too_many_changes_rebuild(self):
+        self.ids("life")
+        Artwork.objects.create(title="Marina", category=self.category)
+        Artwork.objects.create(title="Meadow", category=self.category)
+        with mock.patch.object(self.index, "max_delta", 1):
+            self.index.catch_up(read_change_seq())
+        self.assertFalse(self.index._built)
+        self.assertEqual(self.ids("marina"), {Artwork.objects.get(title="Marina").pk})
+
+    def test_refresh_in_chunks(self):
+        self.ids("life")
+        artworks = Artwork.objects.bulk_create(
+            Artwork(title=f"Study {number}", category=self.category) for number in range(7)
+        )
+        artwork_ids = [artwork.pk for artwork in artworks] + [self.harbour.pk]
+        with mock.patch.object(search, "REFRESH_CHUNK_SIZE", 3), \
+                self.assertNumQueries(6):
+            self.index.refresh(artwork_ids)
+        self.assertEqual(self.ids("study"), {artwork.pk for artwork in artworks})
@@ -0,0 +1,59 @@
+from django.test import TestCase
+
+from skti_system_backend.core.v1.workflow.gallery import load_changes
+from skti_system_backend.models.v1.database.gallery import (
+    Artwork,
+    Category,
+    CategoryArtworkCount,
+    Tag,
+    TagArtworkCount,
+    Tombstone,
+)
+from skti_system_backend.utils.v1.changes import TOMBSTONE_RANK, read_change_seq
+
+
+class QuerySetDeleteTest(TestCase):
+    """
+    Queryset deletes soft delete like ``instance.delete()``, through either
+    manager, and ``hard_delete()`` leaves tombstones in the changes feed.
+    """
+
+    def setUp(self):
+        self.category = Category.objects.create(name="Painting")
+        self.tag = Tag.objects.create(name="oil")
+        self.artworks = [Artwork.objects.create(title=f"Artwork {n}", category=self.category) for n in range(4)]
+        for artwork in self.artworks:
+            artwork.tags.add(self.tag)
+
+    def deletes(self, since):
+        changes, _, _ = load_changes((since, TOMBSTONE_RANK, 0), 100)
+        return {(change["type"], change["id"]) for change in changes if change["op"] == "delete"}
+
+    def test_queryset_delete_soft_deletes(self):
+        since = read_change_seq()
+        first, second, third, _ = self.artworks
+        self.assertEqual(Artwork.objects.filter(pk=first.pk).delete(), (1, {"skti_system_backend.Artwork": 1}))
+        self.assertEqual(Artwork.all_objects.filter(pk__in=[first.pk, second.pk, third.pk]).delete()[0], 2)
+
+        self.assertEqual(Artwork.all_objects.count(), 4)
+        self.assertEqual(set(Artwork.objects.values_list("pk", flat=True)), {self.artworks[3].pk})
+        self.assertTrue(all(
+            change_seq > since for change_seq in
+            Artwork.all_objects.filter(is_deleted=True).values_list("change_seq", flat=True)
+        ))
+        self.assertEqual(self.deletes(since), {("artwork", a.pk) for a in (first, second, third)})
+        self.assertEqual(CategoryArtworkCount.objects.get(category=self.category).count, 1)
+        self.assertEqual(TagArtworkCount.objects.get(tag=self.tag).count, 1)
+
+    def test_hard_delete_leaves_tombstones(self):
+        since = read_change_seq()
+        doomed = self.artworks[:2]
+        Artwork.objects.filter(pk__in=[a.pk for a in doomed]).hard_delete()
+
+        self.assertEqual(Artwork.all_objects.count(), 2)
+        self.assertEqual(
+            set(Tombstone.objects.values_list("kind", "object_id")),
+            {(Tombstone.ARTWORK, a.pk) for a in doomed},
+        )
+        self.assertEqual(self.deletes(since), {("artwork", a.pk) for a in doomed})
+        self.assertEqual(CategoryArtworkCount.objects.get(category=self.category).count, 2)
@@ -0,0 +1,57 @@
+import asyncio
+import io
+import json
+import os
+import tempfile
+
+import httpx
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+
+from skti_system_backend.utils.v1.static import STATIC_MANIFEST_NAME, HashedStaticFilesStorage, MediaFiles
+
+
+class HashedStaticFilesTest(SimpleTestCase):
+    """
+    ``{% static %}`` URLs resolve through the ``compress_static`` manifest to
+    the hashed copies, which ``/static`` serves as immutable.
+    """
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.root = directory.name
+        os.makedirs(os.path.join(self.root, "admin", "css"))
+        with open(os.path.join(self.root, "admin", "css", "base.css"), "w") as file:
+            file.write("body { margin: 0; }\n" * 100)
+        with override_settings(STATIC_ROOT=self.root):
+            call_command("compress_static", stdout=io.StringIO(), stderr=io.StringIO())
+
+    def test_manifest(self):
+        # A second run must not hash the manifest written by the first.
+        with override_settings(STATIC_ROOT=self.root):
+            call_command("compress_static", stdout=io.StringIO(), stderr=io.StringIO())
+        with open(os.path.join(self.root, STATIC_MANIFEST_NAME)) as file:
+            manifest = json.load(file)
+        self.assertEqual(list(manifest), ["admin/css/base.css"])
+        self.assertRegex(manifest["admin/css/base.css"], r"^admin/css/base\.[0-9a-f]{12}\.css$")
+
+    def test_url_and_response(self):
+        storage = HashedStaticFilesStorage(location=self.root, base_url="/static/")
+        url = storage.url("admin/css/base.css")
+        self.assertRegex(url, r"^/static/admin/css/base\.[0-9a-f]{12}\.css$")
+        self.assertEqual(storage.url("admin/js/unlisted.js"), "/static/admin/js/unlisted.js")
+
+        app = MediaFiles(directory=self.root, max_age=60, immutable_max_age=31536000, precompressed=True)
+
+        async def get(path):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                return await client.get(path, headers={"accept-encoding": "gzip"})
+
+        hashed = asyncio.run(get(url.removeprefix("/static")))
+        self.assertEqual(hashed.status_code, 200)
+        self.assertEqual(hashed.headers["cache-control"], "public, max-age=31536000, immutable")
+        self.assertEqual(hashed.headers["content-encoding"], "gzip")
+        plain = asyncio.run(get("/admin/css/base.css"))
+        self.assertEqual(plain.headers["cache-control"], "public, max-age=60")
@@ -0,0 +1,80 @@
+import json
+import logging
+from typing import Optional
+
+from django.contrib import admin
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Exists, F, OuterRef
+from django.utils.functional import cached_property
+
+from skti_system_backend.models.v1.database.gallery import Artwork, Tag
+
+logger = logging.getLogger(__name__)
+
+RELTUPLES_SQL = "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass"
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator counting large Postgres tables from the planner statistics.
+
+    An exact ``COUNT(*)`` reads every matching row, seconds at millions of
+    rows. Unfiltered, the count is ``pg_class.reltuples``; filtered, it is
+    the row estimate of the query plan. Either is only used from
+    ``exact_count_below`` rows on, smaller results are counted exactly. The
+    page links are then approximate: the last one may be short or empty.
+    """
+
+    exact_count_below = 10_000
+
+    def _estimate(self) -> Optional[int]:
+        queryset = self.object_list
+        connection = connections[queryset.db]
+        if connection.vendor != "postgresql":
+            return None
+        if queryset.query.where:
+            plan = json.loads(queryset.explain(format="json"))
+            # A list holding the plan, or the plan alone, depending on the driver.
+            plan = plan[0] if isinstance(plan, list) else plan
+            return int(plan["Plan"]["Plan Rows"])
+        with connection.cursor() as cursor:
+            cursor.execute(RELTUPLES_SQL, [connection.ops.quote_name(queryset.model._meta.db_table)])
+            row = cursor.fetchone()
+        # -1 until the table is first analyzed.
+        return int(row[0]) if row and row[0] >= 0 else None
+
+    @cached_property
+    def count(self) -> int:
+        try:
+            estimate = self._estimate()
+        except Exception:
+            logger.exception("Row estimate failed, counting exactly")
+            estimate = None
+        if estimate is None or estimate < self.exact_count_below:
+            return super().count
+        return estimate
+
+
+class ArtworkTagFilter(admin.SimpleListFilter):
+    """
+    Filter on one tag through ``EXISTS``, which keeps one row per artwork,
+    offering the most used tags only.
+    """
+
+    title = "tag"
+    parameter_name = "tag"
+    max_choices = 50
+
+    def lookups(self, request, model_admin):
+        tags = Tag.objects.order_by(
+            F("artwork_count__count").desc(nulls_last=True), "name"
+        ).values_list("id", "name")
+        return [(str(tag_id), name) for tag_id, name in tags[:self.max_choices]]
+
+    def queryset(self, request, queryset):
+        if not self.value() or not self.value().isdigit():
+            return queryset
+        return queryset.filter(Exists(
+            Artwork.tags.through.objects.filter(artwork_id=OuterRef("pk"), tag_id=int(self.value()))
+        ))
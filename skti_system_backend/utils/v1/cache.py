@@ -0,0 +1,419 @@
+import time
+import asyncio
+import hashlib
+import logging
+import secrets
+import threading
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from fastapi import Response
+
+from skti_system_backend.config.v1.cache_config import cache_config
+from skti_system_backend.utils.v1.db_router import primary_pinned
+from skti_system_backend.utils.v1.metrics import record_cache_lookup
+from skti_system_backend.utils.v1.single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+ARTWORK_SCOPE = "artwork"
+CATEGORY_SCOPE = "category"
+TAG_SCOPE = "tag"
+
+
+# Token of the locks granted by backends private to one process.
+LOCAL_LOCK_TOKEN = "local"
+
+# Deletes a lock only while it is still the one taken with the token.
+RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+# Raises a counter to ARGV[1], never lowering it.
+ADVANCE_COUNTER_SCRIPT = """
+if tonumber(redis.call('GET', KEYS[1]) or '-1') < tonumber(ARGV[1]) then
+    redis.call('SET', KEYS[1], ARGV[1])
+end
+"""
+
+
+def artwork_category_scope(category_id: int) -> str:
+    """Scope covering the artworks of a single category."""
+    return f"{ARTWORK_SCOPE}:category:{category_id}"
+
+
+class CacheBackend:
+    """
+    Interface implemented by the response cache backends.
+
+    Reads are awaited from request handlers, while ``incr``, ``add`` and
+    ``advance`` are synchronous because they are called from Django signal
+    handlers. ``shared`` tells whether every worker sees the same store.
+    """
+
+    shared = False
+
+    async def get(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    async def get_many(self, keys: List[str]) -> List[Optional[bytes]]:
+        raise NotImplementedError
+
+    async def set(self, key: str, value: bytes, ttl: int) -> None:
+        raise NotImplementedError
+
+    def incr(self, key: str) -> int:
+        raise NotImplementedError
+
+    def add(self, key: str, value: int) -> None:
+        """Create a counter that never expires, unless it already exists."""
+        raise NotImplementedError
+
+    def advance(self, key: str, value: int) -> None:
+        """Raise a counter that never expires to ``value``, unless it is already higher."""
+        raise NotImplementedError
+
+    async def acquire_lock(self, key: str, ttl: float) -> Optional[str]:
+        """
+        Take the lock ``key`` for at most ``ttl`` seconds and return the token
+        releasing it, or ``None`` when another holder has it. Backends private
+        to one process have nobody to share the lock with and always grant it.
+        """
+        return LOCAL_LOCK_TOKEN
+
+    async def release_lock(self, key: str, token: str) -> None:
+        return None
+
+
+class NullCacheBackend(CacheBackend):
+    """
+    Backend used to switch response caching off.
+
+    Responses are never stored; counters are kept in process so that the
+    catalog version keeps working.
+    """
+
+    def __init__(self):
+        self._counters: Dict[str, int] = {}
+
+    async def get(self, key):
+        counter = self._counters.get(key)
+        return None if counter is None else str(counter).encode()
+
+    async def get_many(self, keys):
+        return [None] * len(keys)
+
+    async def set(self, key, value, ttl):
+        return None
+
+    def incr(self, key):
+        self._counters[key] = self._counters.get(key, 0) + 1
+        return self._counters[key]
+
+    def add(self, key, value):
+        self._counters.setdefault(key, value)
+
+    def advance(self, key, value):
+        self._counters[key] = max(self._counters.get(key, value), value)
+
+
+class InMemoryCacheBackend(CacheBackend):
+    """
+    Per-process LRU cache with a TTL on every entry.
+
+    Counters are kept apart from the entries so they are never evicted.
+    Each worker process holds its own copy, so writes made through another
+    process reach it through the change counter only, a poll later, and
+    drop the scopes the changes feed shows they touched (see
+    ``utils.v1.etag``); use the Redis backend to share the entries and
+    their invalidation between several workers.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        self._counters: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return self._counter_value(key)
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def _counter_value(self, key):
+        counter = self._counters.get(key)
+        return None if counter is None else str(counter).encode()
+
+    async def get(self, key):
+        with self._lock:
+            return self._get(key)
+
+    async def get_many(self, keys):
+        with self._lock:
+            return [self._get(key) for key in keys]
+
+    async def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def incr(self, key):
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+    def add(self, key, value):
+        with self._lock:
+            self._counters.setdefault(key, value)
+
+    def advance(self, key, value):
+        with self._lock:
+            self._counters[key] = max(self._counters.get(key, value), value)
+
+
+class RedisCacheBackend(CacheBackend):
+    """
+    Redis backed cache shared by every worker.
+
+    :param url: Redis connection URL
+    :param client: Optional synchronous client, e.g. a ``fakeredis.FakeRedis``
+    :param async_client: Optional asyncio client, e.g. a ``fakeredis.FakeAsyncRedis``
+    """
+
+    shared = True
+
+    def __init__(self, url: Optional[str] = None, client=None, async_client=None):
+        import redis
+        import redis.asyncio
+
+        self._client = client or redis.Redis.from_url(url)
+        self._async_client = async_client or redis.asyncio.Redis.from_url(url)
+
+    async def get(self, key):
+        return await self._async_client.get(key)
+
+    async def get_many(self, keys):
+        return await self._async_client.mget(keys)
+
+    async def set(self, key, value, ttl):
+        await self._async_client.set(key, value, ex=ttl)
+
+    def incr(self, key):
+        return self._client.incr(key)
+
+    def add(self, key, value):
+        self._client.set(key, value, nx=True)
+
+    def advance(self, key, value):
+        self._client.eval(ADVANCE_COUNTER_SCRIPT, 1, key, value)
+
+    async def acquire_lock(self, key, ttl):
+        token = secrets.token_hex(8)
+        acquired = await self._async_client.set(key, token, nx=True, px=max(1, int(ttl * 1000)))
+        return token if acquired else None
+
+    async def release_lock(self, key, token):
+        await self._async_client.eval(RELEASE_LOCK_SCRIPT, 1, key, token)
+
+
+def create_cache_backend(config=cache_config) -> CacheBackend:
+    """Instantiate the backend selected by ``CACHE_BACKEND``."""
+    if config.CACHE_BACKEND == "redis":
+        return RedisCacheBackend(url=config.CACHE_REDIS_URL)
+    if config.CACHE_BACKEND == "memory":
+        return InMemoryCacheBackend(max_entries=config.CACHE_MAX_ENTRIES)
+    return NullCacheBackend()
+
+
+class CachedResponse:
+    """
+    A JSON body together with the HTTP status it was served with.
+
+    ``cacheable`` is not stored: a response rendered from data that may be
+    outdated sets it to False to be served once and never cached.
+    """
+
+    __slots__ = ("status_code", "body", "cacheable")
+
+    def __init__(self, status_code: int, body: bytes, cacheable: bool = True):
+        self.status_code = status_code
+        self.body = body
+        self.cacheable = cacheable
+
+    def encode(self) -> bytes:
+        return b"%d:" % self.status_code + self.body
+
+    @classmethod
+    def decode(cls, raw: bytes) -> "CachedResponse":
+        status_code, _, body = raw.partition(b":")
+        return cls(int(status_code), body)
+
+    def to_response(self, headers: Optional[Dict[str, str]] = None) -> Response:
+        return Response(
+            content=self.body,
+            status_code=self.status_code,
+            headers=headers,
+            media_type="application/json",
+        )
+
+
+class ResponseCache:
+    """
+    Response cache invalidated through generation counters.
+
+    Every cached response declares the data it depends on (``artwork``,
+    ``category``, ``tag`` or a narrower scope such as ``artwork:category:3``).
+    The current generation of each dependency is folded into the cache key,
+    so bumping a generation makes every dependent entry unreachable at once
+    without having to enumerate or delete keys.
+
+    Misses are filled through :meth:`fill`, which renders each response once
+    however many identical requests are waiting for it.
+    """
+
+    def __init__(
+        self,
+        backend: CacheBackend,
+        prefix: str,
+        ttl: int,
+        fill_lock: bool = False,
+        fill_lock_timeout: float = 5.0,
+        fill_lock_poll: float = 0.05,
+    ):
+        self.backend = backend
+        self.prefix = prefix
+        self.ttl = ttl
+        self.fill_lock = fill_lock
+        self.fill_lock_timeout = fill_lock_timeout
+        self.fill_lock_poll = fill_lock_poll
+        self._flights = SingleFlight()
+
+    def _generation_key(self, dependency: str) -> str:
+        return f"{self.prefix}:gen:{dependency}"
+
+    async def build_key(self, name: str, dependencies: Iterable[str], params: Dict) -> Optional[str]:
+        """
+        Build the key of a cached response, or ``None`` when the backend is
+        unreachable, in which case the response is neither read nor stored.
+        """
+        try:
+            generations = await self.backend.get_many(
+                [self._generation_key(dependency) for dependency in dependencies]
+            )
+        except Exception:
+            logger.exception("Response cache read failed")
+            return None
+        digest = hashlib.sha1(
+            repr((sorted(params.items()), [int(g or 0) for g in generations])).encode()
+        ).hexdigest()
+        return f"{self.prefix}:resp:{name}:{digest}"
+
+    async def get(self, key: Optional[str]) -> Optional[CachedResponse]:
+        if key is None:
+            return None
+        try:
+            raw = await self.backend.get(key)
+        except Exception:
+            logger.exception("Response cache read failed")
+            record_cache_lookup("response", "error")
+            return None
+        record_cache_lookup("response", "miss" if raw is None else "hit")
+        return None if raw is None else CachedResponse.decode(raw)
+
+    async def set(self, key: Optional[str], cached: CachedResponse) -> None:
+        if key is None:
+            return
+        try:
+            await self.backend.set(key, cached.encode(), self.ttl)
+        except Exception:
+            logger.exception("Response cache write failed")
+
+    async def fill(self, key: Optional[str], render: Callable[[], Awaitable[CachedResponse]]) -> CachedResponse:
+        """
+        Render the response missing under ``key`` and cache it.
+
+        Identical requests in flight share one render: ``key`` folds in the
+        parameters and the generations, so a write made since the render
+        started gives later requests a key, and a render, of their own. With
+        ``fill_lock``, workers sharing the
+        backend also take a lock, and those not getting it wait for the
+        holder to cache the response, rendering it themselves only once
+        ``fill_lock_timeout`` passed.
+        """
+        if key is None:
+            return await render()
+        # Requests that must read from the primary never wait on a render
+        # reading from a replica.
+        flight = (key, primary_pinned())
+        if self._flights.in_flight(flight):
+            record_cache_lookup("response", "coalesced")
+        return await self._flights.do(flight, lambda: self._fill(key, render))
+
+    async def _fill(self, key: str, render: Callable[[], Awaitable[CachedResponse]]) -> CachedResponse:
+        lock_key, token = f"{key}:lock", None
+        if self.fill_lock:
+            deadline = time.monotonic() + self.fill_lock_timeout
+            # Taking the lock again on every look also takes over from a
+            # holder that died, once its lock expired.
+            while (token := await self._acquire_fill_lock(lock_key)) is None:
+                if time.monotonic() >= deadline:
+                    break
+                await asyncio.sleep(self.fill_lock_poll)
+                cached = await self._peek(key)
+                if cached is not None:
+                    record_cache_lookup("response", "coalesced")
+                    return cached
+        try:
+            cached = await render()
+            if cached.cacheable:
+                await self.set(key, cached)
+            return cached
+        finally:
+            if token not in (None, LOCAL_LOCK_TOKEN):
+                try:
+                    await self.backend.release_lock(lock_key, token)
+                except Exception:
+                    logger.exception("Response cache unlock failed")
+
+    async def _acquire_fill_lock(self, lock_key: str) -> Optional[str]:
+        try:
+            return await self.backend.acquire_lock(lock_key, self.fill_lock_timeout)
+        except Exception:
+            logger.exception("Response cache lock failed")
+            return LOCAL_LOCK_TOKEN
+
+    async def _peek(self, key: str) -> Optional[CachedResponse]:
+        try:
+            raw = await self.backend.get(key)
+        except Exception:
+            logger.exception("Response cache read failed")
+            return None
+        return None if raw is None else CachedResponse.decode(raw)
+
+    def invalidate(self, *dependencies: str) -> None:
+        for dependency in dependencies:
+            try:
+                self.backend.incr(self._generation_key(dependency))
+            except Exception:
+                logger.exception(f"Response cache invalidation failed for {dependency}")
+
+
+response_cache = ResponseCache(
+    backend=create_cache_backend(),
+    prefix=cache_config.CACHE_KEY_PREFIX,
+    ttl=cache_config.CACHE_TTL_SECONDS,
+    fill_lock=cache_config.CACHE_FILL_LOCK,
+    fill_lock_timeout=cache_config.CACHE_FILL_LOCK_TIMEOUT_SECONDS,
+    fill_lock_poll=cache_config.CACHE_FILL_LOCK_POLL_SECONDS,
+)
@@ -0,0 +1,193 @@
+import base64
+import json
+import logging
+import threading
+from functools import partial
+from typing import Callable, Iterable, List, Optional, Set, Tuple
+
+from django.db import connection, connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from skti_system_backend.config.v1.api_config import api_config
+from skti_system_backend.models.v1.database.gallery import Artwork, ChangeCounter
+from skti_system_backend.utils.v1.db_router import primary_reads
+from skti_system_backend.utils.v1.errors import InvalidCursorException
+
+logger = logging.getLogger(__name__)
+
+# Every write to an artwork or a category, and every tag change of an
+# artwork, stamps the rows with the next number of a single counter. The
+# changes feed returns rows in (change_seq, kind, id) order, so a client
+# holding the position of the last change it applied asks for what came
+# after it.
+
+# Order of the kinds within one change_seq, part of the feed position.
+CATEGORY_RANK, ARTWORK_RANK, TOMBSTONE_RANK = 0, 1, 2
+
+# Position before any change, where a full sync starts.
+FEED_START = (-1, CATEGORY_RANK, 0)
+
+NEXT_CHANGE_SEQ_SQL = "UPDATE change_counter SET value = value + 1 WHERE id = 1 RETURNING value"
+
+# Numbers handed out by this process, until the change watcher passed them.
+_local_seqs: Set[int] = set()
+_local_seqs_lock = threading.Lock()
+
+
+def next_change_seq() -> int:
+    """
+    Hand out the next change sequence number, in a single query.
+
+    Call it inside the transaction of the write being numbered, as the model
+    saves and :func:`touch_artworks` do: the counter row then stays locked
+    until that transaction ends, so numbers are handed out in commit order
+    and a reader that saw number ``n`` never sees a smaller one commit
+    afterwards. Under autocommit the lock is released at once and that
+    guarantee is lost. It serializes gallery writes, which the admin driven
+    write volume affords.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(NEXT_CHANGE_SEQ_SQL)
+        row = cursor.fetchone()
+    if row is None:
+        # The row migration 0004 creates was removed, e.g. by a flush.
+        ChangeCounter.objects.get_or_create(pk=1)
+        return next_change_seq()
+    # Remembered once committed: the number of a write rolled back is handed
+    # out again, maybe to another process.
+    transaction.on_commit(partial(_add_local_change_seq, row[0]))
+    return row[0]
+
+
+def _add_local_change_seq(seq: int) -> None:
+    with _local_seqs_lock:
+        _local_seqs.add(seq)
+
+
+def pop_local_change_seqs(until: int) -> Set[int]:
+    """
+    Return the numbers up to ``until`` this process handed out, and forget
+    them: the writes they number are the process' own, which its signal
+    handlers already dealt with.
+    """
+    with _local_seqs_lock:
+        popped = {seq for seq in _local_seqs if seq <= until}
+        _local_seqs.difference_update(popped)
+    return popped
+
+
+def read_change_seq() -> int:
+    """Return the last change sequence number handed out, read from the primary."""
+    with primary_reads():
+        return ChangeCounter.objects.filter(pk=1).values_list("value", flat=True).first() or 0
+
+
+def touch_artworks(artwork_ids: Iterable[int]) -> None:
+    """Stamp artworks whose payload changed without a save, e.g. their tags."""
+    artwork_ids = list(artwork_ids)
+    if artwork_ids:
+        with transaction.atomic(savepoint=False):
+            Artwork.all_objects.filter(pk__in=artwork_ids).update(
+                change_seq=next_change_seq(), updated_at=timezone.now()
+            )
+
+
+def after_position(position: Tuple[int, int, int], rank: int) -> Q:
+    """Filter the rows of the kind ranked ``rank`` that come after ``position``."""
+    change_seq, position_rank, pk = position
+    if rank > position_rank:
+        return Q(change_seq__gte=change_seq)
+    if rank == position_rank:
+        return Q(change_seq__gt=change_seq) | Q(change_seq=change_seq, id__gt=pk)
+    return Q(change_seq__gt=change_seq)
+
+
+def encode_change_cursor(position: Tuple[int, int, int]) -> str:
+    raw = json.dumps(list(position), separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_change_cursor(cursor: Optional[str]) -> Tuple[int, int, int]:
+    """
+    Decode a feed position, ``None`` being the start of the feed.
+
+    :raises InvalidCursorException: If the cursor is malformed
+    """
+    if not cursor:
+        return FEED_START
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        change_seq, rank, pk = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not all(isinstance(value, int) for value in (change_seq, rank, pk)):
+            raise ValueError
+    except (ValueError, TypeError):
+        raise InvalidCursorException("The changes cursor is invalid.")
+    return change_seq, rank, pk
+
+
+class ChangeWatcher:
+    """
+    Follow the change counter from a daemon thread, which is how a process
+    learns about the writes made by the others.
+
+    Every ``interval`` seconds, or as soon as :meth:`wake` is called, the
+    counter is read from the primary and, once it moved, passed to every
+    listener. Listeners run on the watcher thread, never on a request.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.value: Optional[int] = None
+        self._listeners: List[Callable[[int], None]] = []
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._notify = False
+        self._thread: Optional[threading.Thread] = None
+
+    def subscribe(self, listener: Callable[[int], None]) -> None:
+        self._listeners.append(listener)
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="skti-change-watcher", daemon=True)
+                self._thread.start()
+
+    def wake(self, notify: bool = False) -> None:
+        """
+        Read the counter now rather than at the end of the interval, and with
+        ``notify`` pass it to the listeners even if it did not move.
+        """
+        if notify:
+            self._notify = True
+        self._wake.set()
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            try:
+                self.poll()
+            except Exception:
+                logger.exception("Change counter read failed")
+            finally:
+                # Hand a pooled connection back between two reads.
+                connections.close_all()
+
+    def poll(self) -> int:
+        """Read the counter and notify the listeners if it moved, or were asked to be."""
+        value = read_change_seq()
+        with self._lock:
+            moved, self.value = value != self.value or self._notify, value
+            self._notify = False
+        if moved:
+            for listener in self._listeners:
+                try:
+                    listener(value)
+                except Exception:
+                    logger.exception(f"Change listener {listener.__qualname__} failed")
+        return value
+
+
+change_watcher = ChangeWatcher(api_config.CHANGE_POLL_SECONDS)
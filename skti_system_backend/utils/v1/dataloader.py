@@ -0,0 +1,93 @@
+import asyncio
+import contextvars
+from typing import Awaitable, Callable, Dict, Hashable, Iterable, List, Optional, Set
+
+
+class DataLoader:
+    """
+    Coalesce lookups by key made by concurrent requests into batched calls.
+
+    The first ``load`` of an idle loader opens a batch which is sent to
+    ``batch_fn`` ``window`` seconds later, or as soon as it holds
+    ``max_batch_size`` keys; every key asked for meanwhile joins it, and a
+    key already in the batch shares its result. ``batch_fn`` gets the keys
+    in the order they were first asked for and returns their values, keys
+    it leaves out resolve to ``None``.
+
+    The keys of one ``load_many`` always go to a single batch: when they do
+    not fit in the open one, it is sent first and they open the next,
+    which may then exceed ``max_batch_size``. A caller therefore waits on
+    at most one batch of its own.
+
+    Nothing is cached beyond the batch, so a lookup never returns data
+    older than the query it waited for. The batch runs in the context of
+    the request that opened it, which is charged with its queries.
+    """
+
+    def __init__(
+        self,
+        batch_fn: Callable[[List[Hashable]], Awaitable[Dict[Hashable, object]]],
+        window: float,
+        max_batch_size: int,
+    ):
+        self.batch_fn = batch_fn
+        self.window = window
+        self.max_batch_size = max_batch_size
+        self._pending: Dict[Hashable, asyncio.Future] = {}
+        self._context: Optional[contextvars.Context] = None
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def load(self, key: Hashable):
+        future = self._future(key)
+        self._dispatch_full()
+        # Shielded: a caller going away must not cancel the result of the
+        # others waiting for the same key.
+        return await asyncio.shield(future)
+
+    async def load_many(self, keys: Iterable[Hashable]) -> List:
+        """Values of ``keys`` in their order, ``None`` for the missing ones."""
+        keys = list(keys)
+        new_keys = {key for key in keys if key not in self._pending}
+        if self._pending and len(self._pending) + len(new_keys) > self.max_batch_size:
+            self._dispatch()
+        futures = [self._future(key) for key in keys]
+        self._dispatch_full()
+        return await asyncio.shield(asyncio.gather(*futures))
+
+    def _future(self, key: Hashable) -> asyncio.Future:
+        future = self._pending.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            if not self._pending:
+                self._context = contextvars.copy_context()
+                self._timer = loop.call_later(self.window, self._dispatch)
+            future = self._pending[key] = loop.create_future()
+        return future
+
+    def _dispatch_full(self) -> None:
+        if len(self._pending) >= self.max_batch_size:
+            self._dispatch()
+
+    def _dispatch(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, {}
+        context, self._context = self._context, None
+        # Charged to the request that opened the batch, whichever sends it.
+        task = asyncio.get_running_loop().create_task(self._run(batch), context=context)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: Dict[Hashable, asyncio.Future]) -> None:
+        try:
+            values = await self.batch_fn(list(batch))
+        except Exception as exception:
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(exception)
+            return
+        for key, future in batch.items():
+            if not future.done():
+                future.set_result(values.get(key))
@@ -0,0 +1,132 @@
+import asyncio
+import functools
+import logging
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Callable, Iterator
+
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections, connections
+
+from skti_system_backend.config.v1.api_config import api_config
+from skti_system_backend.config.v1.database_config import postgres_config
+from skti_system_backend.utils.v1.db_router import replica_reads
+
+logger = logging.getLogger(__name__)
+
+# One thread per pooled connection, less the one kept for asgiref's thread
+# sensitive executor (startup tasks, the mounted Django admin) and those of
+# the streamed exports, so a request never waits on the pool while holding a
+# thread. Without a pool each thread keeps its own persistent connection,
+# bounded the same way.
+DB_THREADS = max(1, postgres_config.POSTGRES_POOL_MAX_SIZE - 1 - api_config.EXPORT_MAX_CONCURRENT)
+
+db_executor = ThreadPoolExecutor(max_workers=DB_THREADS, thread_name_prefix="skti-db")
+
+
+def _uses_pool(connection) -> bool:
+    return bool(getattr(connection, "pool", None))
+
+
+def _in_db_thread(fn: Callable, *args, **kwargs):
+    # What Django does around each request: drop connections that are broken
+    # or past CONN_MAX_AGE, and give pooled ones back once the work is done.
+    close_old_connections()
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        for connection in connections.all(initialized_only=True):
+            if _uses_pool(connection):
+                connection.close()
+
+
+async def run_db(fn: Callable, *args, **kwargs):
+    """
+    Run ``fn``, a unit of ORM work, on the database executor.
+
+    Django's async queryset methods (``aiterator``, ``acount``, ...) hop onto
+    asgiref's single thread sensitive executor for every chunk, which puts
+    all concurrent requests on one thread and one connection. ``run_db``
+    makes a single hop per unit of work instead, on a pool of threads sized
+    to the connection pool.
+    """
+    return await sync_to_async(
+        functools.partial(_in_db_thread, fn, *args, **kwargs),
+        thread_sensitive=False,
+        executor=db_executor,
+    )()
+
+
+def _read_from_replica(fn: Callable, *args, **kwargs):
+    with replica_reads():
+        return fn(*args, **kwargs)
+
+
+async def run_db_read(fn: Callable, *args, **kwargs):
+    """Like :func:`run_db`, with the reads of ``fn`` allowed on a read replica."""
+    return await run_db(_read_from_replica, fn, *args, **kwargs)
+
+
+_stream_slots = asyncio.Semaphore(api_config.EXPORT_MAX_CONCURRENT)
+
+
+def _stream_in_thread(generator_fn: Callable[..., Iterator], *args, **kwargs) -> Iterator:
+    close_old_connections()
+    try:
+        with replica_reads():
+            yield from generator_fn(*args, **kwargs)
+    finally:
+        connections.close_all()
+
+
+async def stream_db(generator_fn: Callable[..., Iterator], *args, **kwargs) -> AsyncIterator:
+    """
+    Iterate ``generator_fn(*args, **kwargs)``, a generator reading the
+    database, one item per ``await``, with its reads allowed on a replica.
+
+    The generator runs on a thread of its own from the first item to the
+    last, the one its connection and server side cursor belong to, and only
+    advances when the consumer asks for the next item. At most
+    ``EXPORT_MAX_CONCURRENT`` streams run at once, later ones wait.
+    """
+    async with _stream_slots:
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="skti-db-stream")
+        generator = _stream_in_thread(generator_fn, *args, **kwargs)
+        done = object()
+        try:
+            while True:
+                item = await loop.run_in_executor(executor, context.run, next, generator, done)
+                if item is done:
+                    return
+                yield item
+        finally:
+            # Also when the client went away: closes the cursor and the
+            # connection on the thread that owns them.
+            await asyncio.shield(loop.run_in_executor(executor, context.run, generator.close))
+            executor.shutdown(wait=False)
+
+
+def _close_thread_connections(barrier: threading.Barrier):
+    connections.close_all()
+    # Hold the thread until every other one got its task, so each closes its own.
+    barrier.wait(timeout=10)
+
+
+def close_db_connections() -> None:
+    """Close the connections of every database thread, then the pools."""
+    barrier = threading.Barrier(DB_THREADS)
+    futures = [db_executor.submit(_close_thread_connections, barrier) for _ in range(DB_THREADS)]
+    for future in futures:
+        try:
+            future.result()
+        except threading.BrokenBarrierError:
+            pass
+    db_executor.shutdown(wait=True)
+    for alias in connections:
+        connection = connections[alias]
+        if alias in getattr(connection, "_connection_pools", {}):
+            connection.close_pool()
+    logger.info("Database connections closed")
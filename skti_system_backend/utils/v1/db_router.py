@@ -0,0 +1,178 @@
+import time
+import random
+import logging
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from skti_system_backend.config.v1.database_config import postgres_config
+
+logger = logging.getLogger(__name__)
+
+# Reads go to the primary unless the code running them opted in with
+# ``replica_reads``, and even then not once the request is pinned to the
+# primary, because its client wrote recently or the request itself wrote.
+_replica_reads: ContextVar[bool] = ContextVar("replica_reads", default=False)
+_pinned_primary: ContextVar[bool] = ContextVar("pinned_primary", default=False)
+
+# Replication lag in seconds, 0 when replay caught up with what was received
+# and on a server that is not in recovery.
+POSTGRES_LAG_SQL = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+"""
+
+
+@contextmanager
+def replica_reads():
+    """Let the reads of this context go to a healthy replica."""
+    token = _replica_reads.set(True)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+@contextmanager
+def primary_reads():
+    """Keep the reads of this context on the primary, whatever the callers asked."""
+    token = _pinned_primary.set(True)
+    try:
+        yield
+    finally:
+        _pinned_primary.reset(token)
+
+
+def pin_primary() -> None:
+    """Send the remaining reads of the current context to the primary."""
+    _pinned_primary.set(True)
+
+
+def primary_pinned() -> bool:
+    """Whether the reads of the current context must stay on the primary."""
+    return _pinned_primary.get()
+
+
+def replica_aliases() -> List[str]:
+    return list(getattr(settings, "DATABASE_REPLICAS", ()))
+
+
+class ReplicaMonitor:
+    """
+    Health and lag of the read replicas, checked every ``interval`` seconds
+    by a daemon thread so requests never wait on a replica that is down.
+
+    A replica serves reads once a check found it reachable and lagging by at
+    most ``max_lag`` seconds; until the first check completes, none does.
+    """
+
+    def __init__(self, max_lag: float, interval: float):
+        self.max_lag = max_lag
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._healthy: List[str] = []
+        self._lags: Dict[str, Optional[float]] = {}
+        self._thread: Optional[threading.Thread] = None
+
+    def healthy(self) -> List[str]:
+        if self._thread is None:
+            self.start()
+        return self._healthy
+
+    def lags(self) -> Dict[str, Optional[float]]:
+        """Last measured lag of each replica, ``None`` when it was unreachable."""
+        return dict(self._lags)
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is None and replica_aliases():
+                self._thread = threading.Thread(target=self._run, name="skti-replica-monitor", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            self.check()
+            time.sleep(self.interval)
+
+    @staticmethod
+    def measure_lag(alias: str) -> float:
+        connection = connections[alias]
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(POSTGRES_LAG_SQL if connection.vendor == "postgresql" else "SELECT 0")
+                return float(cursor.fetchone()[0])
+        finally:
+            # Hand a pooled connection back, or drop a persistent one that broke.
+            connection.close()
+
+    def check(self) -> List[str]:
+        """Measure every replica now and return the ones fit to serve reads."""
+        healthy, lags = [], {}
+        for alias in replica_aliases():
+            try:
+                lags[alias] = self.measure_lag(alias)
+            except Exception as exception:
+                lags[alias] = None
+                logger.warning(f"Replica {alias} is unreachable, reading from the primary: {exception}")
+                continue
+            if lags[alias] <= self.max_lag:
+                healthy.append(alias)
+            else:
+                logger.warning(f"Replica {alias} lags by {lags[alias]:.1f}s, reading from the primary")
+        self._healthy, self._lags = healthy, lags
+        return healthy
+
+
+replica_monitor = ReplicaMonitor(
+    postgres_config.POSTGRES_REPLICA_MAX_LAG,
+    postgres_config.POSTGRES_REPLICA_CHECK_SECONDS,
+)
+
+
+class PrimaryReplicaRouter:
+    """
+    Writes, migrations and reads by default go to the primary; reads made
+    within ``replica_reads`` go to a random healthy replica.
+    """
+
+    def db_for_read(self, model, **hints):
+        if not _replica_reads.get() or _pinned_primary.get():
+            return DEFAULT_DB_ALIAS
+        healthy = replica_monitor.healthy()
+        return random.choice(healthy) if healthy else DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        # Later reads of the same unit of work must see this write.
+        pin_primary()
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+def _call_and_close(fn: Callable, *args) -> None:
+    try:
+        fn(*args)
+    finally:
+        connections.close_all()
+
+
+def call_after_replica_lag(fn: Callable, *args) -> None:
+    """
+    Call ``fn`` again once the replicas may have replayed a write, for work
+    such as cache invalidation that a lagging replica could have undone.
+    """
+    if replica_aliases():
+        timer = threading.Timer(replica_monitor.max_lag, _call_and_close, (fn, *args))
+        timer.daemon = True
+        timer.start()
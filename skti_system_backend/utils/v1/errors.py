@@ -42,6 +42,47 @@ class MalformedJWTRequestException(Exception):
         super().__init__(self.message)
 
 
+class InvalidCursorException(Exception):
+    """Raise when a pagination cursor cannot be decoded."""
+
+    def __init__(self, message: str = "The pagination cursor is invalid."):
+        self.message = message
+        super().__init__(self.message)
+
+
+class InvalidFieldsException(Exception):
+    """Raise when a sparse fieldset names unknown fields."""
+
+    def __init__(self, message: str = "The requested fields are invalid."):
+        self.message = message
+        super().__init__(self.message)
+
+
+class InvalidIdsException(Exception):
+    """Raise when a list of ids cannot be parsed or is too long."""
+
+    def __init__(self, message: str = "The requested ids are invalid."):
+        self.message = message
+        super().__init__(self.message)
+
+
+class QueryBudgetExceededException(Exception):
+    """Raise when a request runs more database queries than its budget."""
+
+    def __init__(self, message: str = "The query budget was exceeded."):
+        self.message = message
+        super().__init__(self.message)
+
+
+class RateLimitExceededException(Exception):
+    """Raise when a client sent more requests than its rate limit allows."""
+
+    def __init__(self, retry_after: float, message: str = "Rate limit exceeded. Try again later."):
+        self.retry_after = retry_after
+        self.message = message
+        super().__init__(self.message)
+
+
 def generate_detailed_errors(errors):
     detailed_errors = []
     for error in errors:
@@ -0,0 +1,185 @@
+import hashlib
+import logging
+import threading
+from typing import Dict, Optional, Set
+
+from asgiref.sync import sync_to_async
+from django.db.models import Count, Max
+from fastapi import Request, Response
+
+from skti_system_backend.models.v1.database.gallery import Artwork, Category, Tag, Tombstone
+from skti_system_backend.utils.v1.cache import (
+    ARTWORK_SCOPE,
+    CATEGORY_SCOPE,
+    TAG_SCOPE,
+    artwork_category_scope,
+    response_cache,
+)
+from skti_system_backend.utils.v1.changes import change_watcher, next_change_seq, pop_local_change_seqs
+from skti_system_backend.utils.v1.db_router import primary_reads
+
+logger = logging.getLogger(__name__)
+
+# The catalog version is a value of the change counter, which every process
+# writing to the gallery moves, so the same catalog state carries the same
+# version in every worker. Each write moves it once more after committing,
+# and again once the replicas replayed it, so responses rendered from a
+# lagging replica are never validated under the final version.
+#
+# On the Redis backend writers publish the version themselves and every
+# worker reads it at once. A process local backend cannot hear about other
+# processes' writes, so each process publishes the values its change
+# watcher reads, after dropping the responses those writes made stale:
+# other processes' writes show up within ``CHANGE_POLL_SECONDS``, the
+# process' own were already dropped by scope in the signal handlers.
+
+
+def _catalog_version_key() -> str:
+    return f"{response_cache.prefix}:catalog_version"
+
+
+async def catalog_version() -> Optional[str]:
+    """
+    Return the current catalog version, or ``None`` if it cannot be read or
+    was not published yet.
+
+    A shared store that lost the version, flushed or new, is given the last
+    counter value read by this process.
+    """
+    backend = response_cache.backend
+    key = _catalog_version_key()
+    try:
+        raw = await backend.get(key)
+        if raw is None and backend.shared and change_watcher.value is not None:
+            await sync_to_async(backend.add, thread_sensitive=False)(key, change_watcher.value)
+            raw = await backend.get(key)
+    except Exception:
+        logger.exception("Catalog version read failed")
+        return None
+    return None if raw is None else raw.decode()
+
+
+def bump_catalog_version() -> None:
+    """
+    Advance the catalog version after a write to the gallery, whichever
+    process made it and whether or not it went through the model signals.
+    """
+    try:
+        value = next_change_seq()
+        if response_cache.backend.shared:
+            response_cache.backend.advance(_catalog_version_key(), value)
+        else:
+            # Published here too, so the writer's own process serves the
+            # write from now on.
+            _publish_catalog_version(value)
+            change_watcher.wake()
+    except Exception:
+        logger.exception("Catalog version bump failed")
+
+
+# Change counter value the process local backend was last brought up to, and
+# the summary of the tags table read then.
+_published_lock = threading.Lock()
+_published_seq: Optional[int] = None
+_tag_summary: Optional[tuple] = None
+
+
+def _read_tag_summary() -> tuple:
+    # Tags carry no change number: any write to them moves their count or
+    # their latest update.
+    return tuple(Tag.objects.aggregate(count=Count("id"), updated_at=Max("updated_at")).values())
+
+
+def _foreign_change_scopes(since: int, until: int) -> Set[str]:
+    """
+    Return the scopes of the cached responses made stale by the writes
+    numbered after ``since`` up to ``until`` by other processes, read from
+    the changes feed.
+
+    The row of a changed artwork does not tell which category it left, so
+    the artworks of every category are dropped with those of the catalog.
+    """
+    global _tag_summary
+    local = pop_local_change_seqs(until)
+    window = {"change_seq__gt": since, "change_seq__lte": until}
+
+    def foreign(queryset) -> bool:
+        seqs = queryset.filter(**window).order_by().values_list("change_seq", flat=True).distinct()
+        return any(seq not in local for seq in seqs)
+
+    scopes = set()
+    with primary_reads():
+        tombstones = {
+            kind for kind, seq in
+            Tombstone.objects.filter(**window).order_by().values_list("kind", "change_seq").distinct()
+            if seq not in local
+        }
+        if foreign(Artwork.all_objects) or Tombstone.ARTWORK in tombstones:
+            scopes.add(ARTWORK_SCOPE)
+            scopes.update(artwork_category_scope(pk) for pk in Category.objects.values_list("pk", flat=True))
+        if foreign(Category.objects) or Tombstone.CATEGORY in tombstones:
+            scopes.add(CATEGORY_SCOPE)
+        tag_summary = _read_tag_summary()
+        if tag_summary != _tag_summary:
+            scopes.add(TAG_SCOPE)
+            _tag_summary = tag_summary
+    return scopes
+
+
+def _publish_catalog_version(value: int) -> None:
+    global _published_seq, _tag_summary
+    if response_cache.backend.shared:
+        # The writers published it, and invalidated what they wrote.
+        pop_local_change_seqs(value)
+        return
+    with _published_lock:
+        if _published_seq is None:
+            # Entries cached before may predate writes of other processes.
+            response_cache.invalidate(ARTWORK_SCOPE, CATEGORY_SCOPE, TAG_SCOPE)
+            pop_local_change_seqs(value)
+            with primary_reads():
+                _tag_summary = _read_tag_summary()
+            _published_seq = value
+        elif value > _published_seq:
+            response_cache.invalidate(*_foreign_change_scopes(_published_seq, value))
+            _published_seq = value
+        response_cache.backend.advance(_catalog_version_key(), value)
+
+
+change_watcher.subscribe(_publish_catalog_version)
+
+
+def make_etag(name: str, params: Dict, version: str) -> str:
+    """
+    Build a strong ETag for the response of ``name`` called with ``params``
+    at catalog ``version``.
+    """
+    digest = hashlib.sha1(repr((name, sorted(params.items()), version)).encode()).hexdigest()
+    return f'"{digest}"'
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    """
+    Evaluate ``If-None-Match`` against ``etag`` using the weak comparison
+    required for GET requests.
+    """
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [candidate.strip() for candidate in header.split(",")]
+    return "*" in candidates or etag in (
+        candidate[2:] if candidate.startswith("W/") else candidate for candidate in candidates
+    )
+
+
+async def conditional_etag(request: Request, name: str, params: Dict) -> Optional[str]:
+    """
+    Compute the ETag of a catalog read, or ``None`` when the catalog version
+    is unavailable and the response must not be validated.
+    """
+    version = await catalog_version()
+    return None if version is None else make_etag(name, params, version)
+
+
+def not_modified_response(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag})
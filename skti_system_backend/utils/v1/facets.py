@@ -0,0 +1,85 @@
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.db import connection, transaction
+from django.db.models import Count, F
+
+from skti_system_backend.models.v1.database.gallery import (
+    Artwork,
+    CategoryArtworkCount,
+    TagArtworkCount,
+)
+
+# The number of live artworks per category and per tag lives in counter
+# tables, adjusted by the gallery signals in the transaction of every write,
+# so reading the facets costs one query per facet kind whatever the size of
+# the catalog. Bulk writes skip the signals (the seed script, queryset
+# ``update``), ``rebuild_facet_counts`` recomputes the counts after them.
+
+LOCK_COUNTS_SQL = "LOCK TABLE category_artwork_counts, tag_artwork_counts IN SHARE ROW EXCLUSIVE MODE"
+
+
+def _adjust(model, key: str, deltas: Dict[int, int]) -> None:
+    ids_by_delta = defaultdict(list)
+    for pk, delta in deltas.items():
+        if delta:
+            ids_by_delta[delta].append(pk)
+    if not ids_by_delta:
+        return
+    model.objects.bulk_create(
+        [model(**{f"{key}_id": pk}) for ids in ids_by_delta.values() for pk in ids],
+        ignore_conflicts=True,
+    )
+    for delta, ids in ids_by_delta.items():
+        model.objects.filter(pk__in=ids).update(count=F("count") + delta)
+
+
+def adjust_category_counts(deltas: Dict[int, int]) -> None:
+    """Add ``delta`` to the count of each category id, creating missing rows."""
+    _adjust(CategoryArtworkCount, "category", deltas)
+
+
+def adjust_tag_counts(deltas: Dict[int, int]) -> None:
+    """Add ``delta`` to the count of each tag id, creating missing rows."""
+    _adjust(TagArtworkCount, "tag", deltas)
+
+
+def artwork_tag_ids(artwork_id: int) -> List[int]:
+    return list(Artwork.tags.through.objects.filter(artwork_id=artwork_id).values_list("tag_id", flat=True))
+
+
+def live_tagged_count(tag_id: int, artwork_ids: Optional[Iterable[int]] = None) -> int:
+    """Number of live artworks carrying the tag, among ``artwork_ids`` if given."""
+    queryset = Artwork.tags.through.objects.filter(tag_id=tag_id, artwork__is_deleted=False)
+    if artwork_ids is not None:
+        queryset = queryset.filter(artwork_id__in=list(artwork_ids))
+    return queryset.count()
+
+
+def rebuild_facet_counts() -> Tuple[int, int]:
+    """
+    Recompute every count from the artworks and the tag assignments.
+
+    On Postgres the counter tables are locked first: writers adjusting a
+    count wait for the rebuild to commit and then apply their change on top
+    of counts that could not see it, so none is lost or applied twice.
+
+    :returns: The number of category and of tag counters written
+    """
+    with transaction.atomic():
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute(LOCK_COUNTS_SQL)
+        CategoryArtworkCount.objects.all().delete()
+        TagArtworkCount.objects.all().delete()
+        categories = CategoryArtworkCount.objects.bulk_create(
+            CategoryArtworkCount(category_id=category_id, count=count)
+            for category_id, count in Artwork.objects.order_by().values("category_id")
+            .annotate(count=Count("id")).values_list("category_id", "count")
+        )
+        tags = TagArtworkCount.objects.bulk_create(
+            TagArtworkCount(tag_id=tag_id, count=count)
+            for tag_id, count in Artwork.tags.through.objects.filter(artwork__is_deleted=False)
+            .order_by().values("tag_id").annotate(count=Count("artwork_id")).values_list("tag_id", "count")
+        )
+    return len(categories), len(tags)
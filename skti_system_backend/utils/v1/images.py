@@ -0,0 +1,163 @@
+import os
+import time
+import asyncio
+import hashlib
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional
+
+from skti_system_backend.utils.v1.metrics import record_cache_lookup
+
+logger = logging.getLogger(__name__)
+
+IMAGE_FORMATS = {
+    "jpeg": ("JPEG", "jpg", "image/jpeg"),
+    "webp": ("WEBP", "webp", "image/webp"),
+    "png": ("PNG", "png", "image/png"),
+}
+
+
+def render_derivative(source: str, destination: str, width: int, image_format: str, quality: int) -> int:
+    """
+    Resize ``source`` down to ``width`` and encode it into ``destination``.
+
+    Runs inside the worker processes, so it only depends on Pillow. The file
+    is written under a temporary name and renamed, so readers never see a
+    partial image.
+
+    :returns: Size in bytes of the written derivative
+    :return type: int
+    """
+    from PIL import Image, ImageOps
+
+    pil_format = IMAGE_FORMATS[image_format][0]
+    with Image.open(source) as image:
+        image = ImageOps.exif_transpose(image)
+        if image.width > width:
+            height = max(1, round(image.height * width / image.width))
+            image = image.resize((width, height), Image.LANCZOS)
+        if pil_format == "JPEG" and image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+
+        os.makedirs(os.path.dirname(destination), exist_ok=True)
+        temporary = f"{destination}.{os.getpid()}.tmp"
+        image.save(temporary, format=pil_format, quality=quality, optimize=True)
+    os.replace(temporary, destination)
+    return os.path.getsize(destination)
+
+
+class DerivativeCache:
+    """
+    Size bounded disk cache of resized images.
+
+    Derivatives are keyed on the source path, its modification time and the
+    rendering parameters, so replacing an original never serves a stale
+    derivative. A hit refreshes the file's access time, which is what
+    eviction orders on, and leaves its mtime, and so its ETag, alone. Renders run in a process pool and concurrent requests for the
+    same derivative share a single render.
+    """
+
+    def __init__(self, media_root: str, directory: str, max_bytes: int, workers: int):
+        self.media_root = os.path.realpath(media_root)
+        self.root = os.path.join(self.media_root, directory)
+        self.max_bytes = max_bytes
+        self.workers = workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._size: Optional[int] = None
+        self._evict_lock = threading.Lock()
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    def resolve_source(self, relative_path: str) -> Optional[str]:
+        """
+        Map a path relative to MEDIA_ROOT to an existing original, refusing
+        anything outside MEDIA_ROOT or inside the derivative cache itself.
+        """
+        source = os.path.realpath(os.path.join(self.media_root, relative_path))
+        if not source.startswith(self.media_root + os.sep) or source.startswith(self.root + os.sep):
+            return None
+        return source if os.path.isfile(source) else None
+
+    def derivative_path(self, source: str, width: int, image_format: str, quality: int) -> str:
+        stat = os.stat(source)
+        key = hashlib.sha1(
+            f"{source}:{stat.st_mtime_ns}:{width}:{image_format}:{quality}".encode()
+        ).hexdigest()
+        extension = IMAGE_FORMATS[image_format][1]
+        return os.path.join(self.root, key[:2], f"{key}.{extension}")
+
+    async def get(self, source: str, width: int, image_format: str, quality: int) -> str:
+        """Return the path of the derivative, rendering it if needed."""
+        destination = self.derivative_path(source, width, image_format, quality)
+        try:
+            os.utime(destination, ns=(time.time_ns(), os.stat(destination).st_mtime_ns))
+            record_cache_lookup("derivatives", "hit")
+            return destination
+        except FileNotFoundError:
+            record_cache_lookup("derivatives", "miss")
+
+        future = self._inflight.get(destination)
+        if future is None:
+            future = asyncio.ensure_future(self._render(source, destination, width, image_format, quality))
+            self._inflight[destination] = future
+            future.add_done_callback(lambda _: self._inflight.pop(destination, None))
+        await asyncio.shield(future)
+        return destination
+
+    async def _render(self, source, destination, width, image_format, quality):
+        loop = asyncio.get_running_loop()
+        size = await loop.run_in_executor(
+            self.executor, render_derivative, source, destination, width, image_format, quality
+        )
+        if self._size is not None:
+            self._size += size
+        if self._size is None or self._size > self.max_bytes:
+            loop.run_in_executor(None, self.evict)
+
+    def evict(self) -> None:
+        """
+        Rescan the cache and delete the least recently used derivatives
+        until it fits in 90% of ``max_bytes``.
+        """
+        if not self._evict_lock.acquire(blocking=False):
+            return
+        try:
+            entries = []
+            for dirpath, _, filenames in os.walk(self.root):
+                for filename in filenames:
+                    path = os.path.join(dirpath, filename)
+                    try:
+                        stat = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    entries.append((stat.st_atime, stat.st_size, path))
+            total = sum(size for _, size, _ in entries)
+            if total > self.max_bytes:
+                target = self.max_bytes * 0.9
+                for _, size, path in sorted(entries):
+                    if total <= target:
+                        break
+                    try:
+                        os.remove(path)
+                        total -= size
+                    except FileNotFoundError:
+                        pass
+                logger.info(f"Evicted image derivatives, cache size is now {total} bytes")
+            self._size = total
+        finally:
+            self._evict_lock.release()
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
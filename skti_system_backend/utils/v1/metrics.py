@@ -0,0 +1,123 @@
+import os
+import asyncio
+
+from asgiref.sync import SyncToAsync
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+from prometheus_client import multiprocess
+
+from skti_system_backend.utils.v1.db import db_executor
+
+# With PROMETHEUS_MULTIPROC_DIR set (it must be, before the workers start,
+# when running under gunicorn), every worker writes its samples to memory
+# mapped files in that directory and a scrape of any worker aggregates all
+# of them. Without it the metrics are those of the current process.
+MULTIPROCESS = bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+# Request latencies are mostly a few milliseconds, the upper buckets catch
+# the tail alerts are about.
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+REQUEST_LATENCY = Histogram(
+    "skti_http_request_duration_seconds",
+    "Time spent answering a request, by route template and status.",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    "skti_http_requests_in_progress",
+    "Requests being answered.",
+    ["method"],
+    multiprocess_mode="livesum",
+)
+DB_TIME = Histogram(
+    "skti_db_time_seconds",
+    "Database time spent by a request, by route template.",
+    ["route"],
+    buckets=LATENCY_BUCKETS,
+)
+DB_QUERIES = Counter(
+    "skti_db_queries_total",
+    "Database queries run by requests, by route template.",
+    ["route"],
+)
+THREADPOOL_QUEUE_DEPTH = Gauge(
+    "skti_threadpool_queue_depth",
+    "Calls waiting for a sync_to_async worker thread, sampled at the start of each request.",
+    ["pool"],
+    multiprocess_mode="livemax",
+)
+RATE_LIMITED = Counter(
+    "skti_rate_limited_requests_total",
+    "Requests rejected by the rate limiter, by route template.",
+    ["route"],
+)
+CACHE_REQUESTS = Counter(
+    "skti_cache_requests_total",
+    "Cache lookups, hit ratio is hit / (hit + miss).",
+    ["cache", "result"],
+)
+
+
+def route_label(scope) -> str:
+    """
+    Route template of a handled request, so the label cardinality stays
+    bounded whatever the URLs requested.
+    """
+    route = scope.get("route")
+    if route is not None:
+        return route.path
+    if scope.get("endpoint") is not None:
+        # Mounted applications (/static, /media, /django) are one series each.
+        segment = scope.get("path", "/").split("/", 2)[1]
+        return f"/{segment}/*"
+    return "unmatched"
+
+
+def _queue_depth(executor) -> int:
+    work_queue = getattr(executor, "_work_queue", None)
+    return work_queue.qsize() if work_queue is not None else 0
+
+
+def sample_threadpool_queues() -> None:
+    """
+    Record how many calls wait for a thread: the database executor running
+    the ORM work of the endpoints, the single thread that runs every
+    ``thread_sensitive`` call, and the loop's default executor used by
+    ``thread_sensitive=False``.
+    """
+    THREADPOOL_QUEUE_DEPTH.labels("db").set(_queue_depth(db_executor))
+    THREADPOOL_QUEUE_DEPTH.labels("thread_sensitive").set(_queue_depth(SyncToAsync.single_thread_executor))
+    default_executor = getattr(asyncio.get_running_loop(), "_default_executor", None)
+    THREADPOOL_QUEUE_DEPTH.labels("default").set(_queue_depth(default_executor))
+
+
+def record_cache_lookup(cache: str, result: str) -> None:
+    CACHE_REQUESTS.labels(cache, result).inc()
+
+
+def record_rate_limited(route: str) -> None:
+    RATE_LIMITED.labels(route).inc()
+
+
+def render_metrics() -> tuple:
+    """Return the exposition body and its content type."""
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead(pid: int) -> None:
+    """Drop the live gauges of a dead worker, call it from gunicorn's ``child_exit``."""
+    if MULTIPROCESS:
+        multiprocess.mark_process_dead(pid)
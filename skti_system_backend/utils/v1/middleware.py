@@ -0,0 +1,192 @@
+import time
+import random
+import string
+import logging
+from typing import Iterable
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.requests import cookie_parser
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from skti_system_backend.utils.v1.db_router import primary_reads
+from skti_system_backend.utils.v1.metrics import (
+    DB_QUERIES,
+    DB_TIME,
+    REQUEST_LATENCY,
+    REQUESTS_IN_PROGRESS,
+    route_label,
+    sample_threadpool_queues,
+)
+from skti_system_backend.utils.v1.query_stats import endpoint_query_budget, track_queries
+
+# Plain ASGI middlewares: unlike ``@app.middleware("http")`` they add no task,
+# no memory stream and no Request/Response objects per request, and streamed
+# bodies pass through message by message.
+
+ALLOWED_CONTENT_TYPES = (
+    "application/json",
+    "multipart/form-data",
+    "image/jpeg",
+    "image/png",
+    "application/x-www-form-urlencoded",
+)
+
+_RID_ALPHABET = string.ascii_uppercase + string.digits
+
+_UNSAFE_METHODS = ("POST", "PUT", "PATCH", "DELETE")
+
+
+class ContentTypeMiddleware:
+    """Answer 415 to POST, PUT and PATCH requests with an unsupported body type."""
+
+    def __init__(self, app: ASGIApp, allowed: Iterable[str] = ALLOWED_CONTENT_TYPES):
+        self.app = app
+        self.allowed = tuple(allowed)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and scope["method"] in ("POST", "PUT", "PATCH"):
+            content_type = Headers(scope=scope).get("content-type", "")
+            if not content_type.startswith(self.allowed):
+                response = JSONResponse(
+                    status_code=415,
+                    content={
+                        "status": False,
+                        "status_code": 415,
+                        "message": "Unsupported Media Type: use JSON, multipart/form-data, or images",
+                    },
+                )
+                await response(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
+
+
+class InstrumentationMiddleware:
+    """
+    Per request observability in a single layer: query stats and budgets,
+    Prometheus metrics and the ``rid=`` request log lines.
+
+    The query budget is checked when the response starts, which for regular
+    responses is after the endpoint returned, so an endpoint over budget can
+    still be answered with a 500 in strict mode.
+
+    :param logger: Logger the request lines are written to
+    :param stats_headers: Whether to add ``X-DB-Query-Count`` and ``Server-Timing``
+    :param strict_budget: Whether an exceeded query budget turns into a 500
+    """
+
+    def __init__(self, app: ASGIApp, logger: logging.Logger, stats_headers: bool, strict_budget: bool):
+        self.app = app
+        self.logger = logger
+        self.stats_headers = stats_headers
+        self.strict_budget = strict_budget
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        rid = "".join(random.choices(_RID_ALPHABET, k=6))
+        self.logger.info(f"rid={rid} start path={scope['path']}")
+        sample_threadpool_queues()
+        in_progress = REQUESTS_IN_PROGRESS.labels(method)
+        in_progress.inc()
+        start = time.time()
+        started = time.perf_counter()
+        status_code = 500
+        replaced = False
+
+        with track_queries() as stats:
+
+            async def send_wrapper(message: Message) -> None:
+                nonlocal status_code, replaced
+                if replaced:
+                    return
+                if message["type"] == "http.response.start":
+                    budget = endpoint_query_budget(scope.get("endpoint"))
+                    if budget is not None and stats.count > budget:
+                        error = f"{scope['path']} ran {stats.count} queries, its budget is {budget}"
+                        if self.strict_budget:
+                            self.logger.error(error)
+                            replaced = True
+                            status_code = 500
+                            await JSONResponse(
+                                status_code=500,
+                                content={"status": False, "message": error, "data": {}, "status_code": 500},
+                            )(scope, receive, send)
+                            return
+                        self.logger.warning(error)
+                    status_code = message["status"]
+                    if self.stats_headers:
+                        headers = MutableHeaders(scope=message)
+                        headers["X-DB-Query-Count"] = str(stats.count)
+                        headers["Server-Timing"] = f"db;dur={stats.duration_ms:.2f}"
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                in_progress.dec()
+                route = route_label(scope)
+                REQUEST_LATENCY.labels(method, route, str(status_code)).observe(time.perf_counter() - started)
+                DB_TIME.labels(route).observe(stats.duration)
+                DB_QUERIES.labels(route).inc(stats.count)
+
+        ms = (time.time() - start) * 1000
+        self.logger.info(
+            f"rid={rid} completed_in={ms:.2f}ms status={status_code}"
+            f" queries={stats.count} db_time={stats.duration_ms:.2f}ms"
+        )
+
+
+class PrimaryAfterWriteMiddleware:
+    """
+    Read from the primary for ``sticky_seconds`` after a client's write, so it
+    sees its own changes whatever the replication lag.
+
+    A successful unsafe request sets a cookie holding the time the window
+    ends; requests carrying an unexpired one never read from a replica.
+    Being a cookie, the window holds across workers and processes.
+
+    :param sticky_seconds: Length of the window following a write
+    :param cookie_name: Cookie holding the end of the window
+    """
+
+    def __init__(self, app: ASGIApp, sticky_seconds: float, cookie_name: str = "skti_primary_until"):
+        self.app = app
+        self.sticky_seconds = sticky_seconds
+        self.cookie_name = cookie_name
+
+    def _pinned(self, scope: Scope) -> bool:
+        cookie = Headers(scope=scope).get("cookie")
+        if not cookie:
+            return False
+        try:
+            return float(cookie_parser(cookie).get(self.cookie_name, 0)) > time.time()
+        except ValueError:
+            return False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        send_wrapper = send
+        if scope["method"] in _UNSAFE_METHODS:
+
+            async def send_wrapper(message: Message) -> None:
+                if message["type"] == "http.response.start" and message["status"] < 400:
+                    until = time.time() + self.sticky_seconds
+                    MutableHeaders(scope=message).append(
+                        "set-cookie",
+                        f"{self.cookie_name}={until:.0f}; Max-Age={self.sticky_seconds:.0f}; "
+                        f"Path=/; HttpOnly; SameSite=Lax",
+                    )
+                await send(message)
+
+        if self._pinned(scope):
+            with primary_reads():
+                await self.app(scope, receive, send_wrapper)
+        else:
+            await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,23 @@
+from django.contrib.postgres import operations as postgres_operations
+from django.db.migrations.operations import AddIndex
+
+
+class AddIndexConcurrently(postgres_operations.AddIndexConcurrently):
+    """
+    Build an index with ``CREATE INDEX CONCURRENTLY`` on Postgres, which
+    keeps the table writable meanwhile, and as a plain ``AddIndex`` on the
+    other databases, such as the SQLite ones of the tests. Only usable in a
+    migration with ``atomic = False``.
+    """
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == "postgresql":
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+        else:
+            AddIndex.database_forwards(self, app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == "postgresql":
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+        else:
+            AddIndex.database_backwards(self, app_label, schema_editor, from_state, to_state)
@@ -0,0 +1,78 @@
+import base64
+import json
+from datetime import datetime
+from operator import attrgetter
+from typing import Callable, List, Optional, Tuple
+
+from django.db.models import Q, QuerySet
+
+from skti_system_backend.utils.v1.errors import InvalidCursorException
+
+
+KEYSET_ORDERING = ("-created_at", "-id")
+
+
+def encode_cursor(created_at: datetime, pk: int) -> str:
+    """
+    Encode the keyset position of a row into an opaque, URL safe cursor.
+
+    :param created_at: Creation timestamp of the last row on the page
+    :type created_at: datetime
+
+    :param pk: Primary key of the last row on the page
+    :type pk: int
+
+    :returns: Opaque cursor string
+    :return type: str
+    """
+    raw = json.dumps([created_at.isoformat(), pk], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Decode a cursor produced by :func:`encode_cursor`.
+
+    :raises InvalidCursorException: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, pk = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(created_at), int(pk)
+    except (ValueError, TypeError) as exc:
+        raise InvalidCursorException() from exc
+
+
+def keyset_page(queryset: QuerySet, cursor: Optional[str], limit: int) -> QuerySet:
+    """
+    Restrict a queryset to the page that follows ``cursor``, newest first.
+
+    The leading ``created_at <= ts`` bound lets Postgres start the scan of the
+    ``(created_at, id)`` index at the cursor, so every page costs the same.
+    One extra row is fetched so the caller can tell whether a next page exists.
+    """
+    if cursor:
+        created_at, pk = decode_cursor(cursor)
+        queryset = queryset.filter(
+            Q(created_at__lte=created_at),
+            Q(created_at__lt=created_at) | Q(id__lt=pk),
+        )
+    return queryset.order_by(*KEYSET_ORDERING)[: limit + 1]
+
+
+def split_page(
+    rows: List,
+    limit: int,
+    position: Callable = attrgetter("created_at", "id"),
+) -> Tuple[List, Optional[str]]:
+    """
+    Trim the look-ahead row fetched by :func:`keyset_page` and build the
+    cursor pointing at the next page, if there is one.
+
+    ``position`` extracts ``(created_at, id)`` from a row, which lets the
+    same helper page model instances and ``values_list`` tuples.
+    """
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(*position(rows[-1]))
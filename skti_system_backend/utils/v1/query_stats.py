@@ -0,0 +1,121 @@
+import time
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional
+
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+from skti_system_backend.utils.v1.errors import QueryBudgetExceededException
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class QueryStats:
+    """Queries run on behalf of one request, or of one ``assert_max_queries`` block."""
+    count: int = 0
+    duration: float = 0.0
+    statements: List[str] = field(default_factory=list)
+    keep_statements: bool = False
+    # Enclosing block, e.g. the ``assert_max_queries`` around a test client
+    # call, which counts the queries of the request too.
+    parent: Optional["QueryStats"] = None
+
+    @property
+    def duration_ms(self) -> float:
+        return self.duration * 1000
+
+
+# ``sync_to_async`` runs the ORM in a copy of the caller's context, so the
+# stats object set by the middleware is the one the worker thread updates.
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def _track_query(execute, sql, params, many, context):
+    stats = _current_stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duration = time.perf_counter() - started
+        while stats is not None:
+            stats.duration += duration
+            stats.count += 1
+            if stats.keep_statements:
+                stats.statements.append(sql)
+            stats = stats.parent
+
+
+def _install(connection, **kwargs):
+    if _track_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_track_query)
+
+
+def install_query_tracking() -> None:
+    """
+    Count the queries of every database connection, now and once opened.
+
+    The wrapper costs a context variable lookup when no request is tracked.
+    """
+    connection_created.connect(_install, dispatch_uid="query_stats_install")
+    for connection in connections.all():
+        _install(connection)
+
+
+@contextmanager
+def track_queries(keep_statements: bool = False):
+    """
+    Collect the queries run in this context, including ``sync_to_async`` calls.
+    Nested blocks count towards the enclosing ones as well.
+    """
+    stats = QueryStats(keep_statements=keep_statements, parent=_current_stats.get())
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    return _current_stats.get()
+
+
+def query_budget(max_queries: int) -> Callable:
+    """
+    Pin the number of queries an endpoint may run, whatever the data size.
+
+    The request middleware checks the budget of the matched endpoint, see
+    ``APIConfig.QUERY_BUDGET_STRICT``.
+    """
+    def decorator(endpoint):
+        endpoint.query_budget = max_queries
+        return endpoint
+    return decorator
+
+
+def endpoint_query_budget(endpoint) -> Optional[int]:
+    return getattr(endpoint, "query_budget", None)
+
+
+@contextmanager
+def assert_max_queries(max_queries: int):
+    """
+    Fail when the enclosed block runs more than ``max_queries`` queries, e.g.
+    around a test client call::
+
+        with assert_max_queries(2):
+            client.get("/api/v1/get_all_artworks")
+
+    :raises QueryBudgetExceededException: Listing the statements that ran
+    """
+    with track_queries(keep_statements=True) as stats:
+        yield stats
+    if stats.count > max_queries:
+        raise QueryBudgetExceededException(
+            f"{stats.count} queries ran, the budget is {max_queries}:\n" + "\n".join(stats.statements)
+        )
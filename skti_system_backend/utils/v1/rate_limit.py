@@ -0,0 +1,357 @@
+import os
+import re
+import mmap
+import time
+import struct
+import hashlib
+import logging
+import tempfile
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, FrozenSet, Iterable, Optional, Tuple
+
+from fastapi import Request
+
+from skti_system_backend.config.v1.api_config import api_config
+from skti_system_backend.config.v1.rate_limit_config import rate_limit_config
+from skti_system_backend.utils.v1.errors import RateLimitExceededException
+from skti_system_backend.utils.v1.metrics import record_rate_limited
+
+logger = logging.getLogger(__name__)
+
+# Limits are enforced with GCRA, the generic cell rate algorithm: a token
+# bucket of ``count`` tokens refilled one every ``period / count`` seconds,
+# stored as a single timestamp per client, the theoretical arrival time of
+# its next request. A check reads and writes that one value, whatever the
+# rate or the traffic.
+
+_PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+_RATE_PATTERN = re.compile(r"^\s*(\d+)\s*(?:/|per)\s*(\d*)\s*(second|minute|hour|day)s?\s*$", re.IGNORECASE)
+
+
+@dataclass(frozen=True)
+class Rate:
+    """``count`` requests per ``period`` seconds, all of which may come at once."""
+    count: int
+    period: float
+
+    @property
+    def interval(self) -> float:
+        return self.period / self.count
+
+
+def parse_rate(value: str) -> Optional[Rate]:
+    """
+    Parse ``20/minute``, ``100 per hour`` or ``5/10seconds``; ``unlimited``
+    gives ``None``.
+
+    :raises ValueError: When the rate cannot be parsed
+    """
+    if value.strip().lower() == "unlimited":
+        return None
+    match = _RATE_PATTERN.match(value)
+    if not match or int(match.group(1)) < 1:
+        raise ValueError(f"Invalid rate limit {value!r}, expected e.g. '20/minute'")
+    count, multiplier, unit = match.groups()
+    return Rate(int(count), int(multiplier or 1) * _PERIODS[unit.lower()])
+
+
+def parse_rate_map(value: Optional[str]) -> Dict[str, Optional[Rate]]:
+    """Parse ``name=rate`` pairs separated by ``;``."""
+    rates = {}
+    for pair in filter(None, (part.strip() for part in (value or "").split(";"))):
+        name, _, rate = pair.rpartition("=")
+        rates[name.strip()] = parse_rate(rate)
+    return rates
+
+
+def parse_keys(value: Optional[str]) -> FrozenSet[str]:
+    """Parse keys separated by ``;``."""
+    return frozenset(filter(None, (part.strip() for part in (value or "").split(";"))))
+
+
+def gcra(tat: Optional[float], now: float, rate: Rate) -> Tuple[Optional[float], float]:
+    """
+    Admit one request at ``now`` given the stored arrival time ``tat``.
+
+    :returns: The arrival time to store, or ``None`` when the request is
+        rejected, and the seconds to wait before retrying
+    """
+    new_tat = max(tat or now, now) + rate.interval
+    allow_at = new_tat - rate.period
+    if allow_at > now:
+        return None, allow_at - now
+    return new_tat, 0.0
+
+
+class RateLimitBackend:
+    """
+    Interface implemented by the rate limit backends: one atomic
+    read-modify-write of the stored arrival time of ``key``.
+    """
+
+    async def hit(self, key: str, rate: Rate) -> float:
+        """Count a request, return 0 when it is admitted, else the seconds to wait."""
+        raise NotImplementedError
+
+
+class InMemoryRateLimitBackend(RateLimitBackend):
+    """
+    Per process counters, so each worker admits the full rate. Only suited
+    to a single worker and to tests.
+
+    :param max_entries: Clients tracked at once, the least recently seen are forgotten first
+    """
+
+    def __init__(self, max_entries: int = 65536):
+        self.max_entries = max_entries
+        self._tats: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def hit(self, key, rate):
+        now = time.time()
+        with self._lock:
+            new_tat, retry_after = gcra(self._tats.get(key), now, rate)
+            if new_tat is not None:
+                self._tats[key] = new_tat
+                self._tats.move_to_end(key)
+                if len(self._tats) > self.max_entries:
+                    self._tats.popitem(last=False)
+        return retry_after
+
+
+class SharedMemoryRateLimitBackend(RateLimitBackend):
+    """
+    Counters in a memory mapped file, shared by every worker of the host.
+
+    The file is a fixed hash table of ``(key hash, arrival time)`` slots in
+    groups of four. A key lives in the group its hash picks and a check
+    locks only that group's 64 bytes, with ``lockf`` across processes and a
+    thread lock within one. When the four slots hold live clients, the one
+    due soonest is evicted and starts over with a full bucket.
+
+    :param path: File backing the table, on a tmpfs for it to never touch disk
+    :param slots: Clients tracked at once, rounded up to a multiple of four
+    """
+
+    SLOT = struct.Struct("<Qd")
+    GROUP_SLOTS = 4
+    GROUP_SIZE = SLOT.size * GROUP_SLOTS
+
+    def __init__(self, path: str, slots: int = 65536):
+        if not os.path.isdir(os.path.dirname(path) or "."):
+            path = os.path.join(tempfile.gettempdir(), os.path.basename(path))
+        self.path = path
+        self.groups = max(1, -(-slots // self.GROUP_SLOTS))
+        self._lock = threading.Lock()
+        self._pid = None
+        self._fd = None
+        self._map = None
+
+    def _open(self):
+        # Mapped after the fork, once per worker.
+        if self._pid != os.getpid():
+            size = self.groups * self.GROUP_SIZE
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+            if os.fstat(fd).st_size < size:
+                os.ftruncate(fd, size)
+            self._fd, self._map, self._pid = fd, mmap.mmap(fd, size), os.getpid()
+        return self._fd, self._map
+
+    @staticmethod
+    def _hash(key: str) -> int:
+        # 0 marks an empty slot.
+        return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "little") or 1
+
+    def _hit(self, key: str, rate: Rate) -> float:
+        import fcntl
+
+        key_hash = self._hash(key)
+        offset = (key_hash % self.groups) * self.GROUP_SIZE
+        with self._lock:
+            fd, table = self._open()
+            fcntl.lockf(fd, fcntl.LOCK_EX, self.GROUP_SIZE, offset)
+            try:
+                now = time.time()
+                slots = [
+                    self.SLOT.unpack_from(table, offset + index * self.SLOT.size)
+                    for index in range(self.GROUP_SLOTS)
+                ]
+                index = next((i for i, (stored, _) in enumerate(slots) if stored == key_hash), None)
+                tat = slots[index][1] if index is not None else None
+                new_tat, retry_after = gcra(tat, now, rate)
+                if new_tat is not None:
+                    if index is None:
+                        # A free or expired slot, else the one due soonest.
+                        index = min(
+                            range(self.GROUP_SLOTS),
+                            key=lambda i: (slots[i][0] != 0 and slots[i][1] > now, slots[i][1]),
+                        )
+                    self.SLOT.pack_into(table, offset + index * self.SLOT.size, key_hash, new_tat)
+                return retry_after
+            finally:
+                fcntl.lockf(fd, fcntl.LOCK_UN, self.GROUP_SIZE, offset)
+
+    async def hit(self, key, rate):
+        # A few microseconds under the lock, not worth a thread hop.
+        return self._hit(key, rate)
+
+
+class RedisRateLimitBackend(RateLimitBackend):
+    """
+    Counters in Redis, shared by every worker of every host.
+
+    The check is one Lua script, atomic on the server, timed with the
+    server's clock so the hosts' clocks do not need to agree.
+
+    :param url: Redis connection URL
+    :param prefix: Prefix of the keys written
+    :param async_client: Optional asyncio client, e.g. a ``fakeredis.FakeAsyncRedis``
+    """
+
+    GCRA_SCRIPT = """
+        local now_parts = redis.call("TIME")
+        local now = tonumber(now_parts[1]) * 1000 + tonumber(now_parts[2]) / 1000
+        local interval = tonumber(ARGV[1])
+        local period = tonumber(ARGV[2])
+        local tat = tonumber(redis.call("GET", KEYS[1]) or now)
+        if tat < now then
+            tat = now
+        end
+        local new_tat = tat + interval
+        local allow_at = new_tat - period
+        if allow_at > now then
+            return tostring(allow_at - now)
+        end
+        redis.call("SET", KEYS[1], tostring(new_tat), "PX", math.ceil(new_tat - now))
+        return "0"
+    """
+
+    def __init__(self, url: Optional[str] = None, prefix: str = "skti:ratelimit", async_client=None):
+        import redis.asyncio
+
+        self.prefix = prefix
+        self._client = async_client or redis.asyncio.Redis.from_url(url)
+        self._script = self._client.register_script(self.GCRA_SCRIPT)
+
+    async def hit(self, key, rate):
+        retry_after_ms = await self._script(
+            keys=[f"{self.prefix}:{key}"],
+            args=[rate.interval * 1000, rate.period * 1000],
+        )
+        return float(retry_after_ms) / 1000
+
+
+def create_rate_limit_backend(config=rate_limit_config) -> RateLimitBackend:
+    """Instantiate the backend selected by ``RATE_LIMIT_BACKEND``."""
+    if config.RATE_LIMIT_BACKEND == "redis":
+        return RedisRateLimitBackend(url=config.RATE_LIMIT_REDIS_URL, prefix=config.RATE_LIMIT_KEY_PREFIX)
+    if config.RATE_LIMIT_BACKEND == "shared":
+        return SharedMemoryRateLimitBackend(config.RATE_LIMIT_SHARED_PATH, config.RATE_LIMIT_SHARED_SLOTS)
+    return InMemoryRateLimitBackend(max_entries=config.RATE_LIMIT_MAX_ENTRIES)
+
+
+def rate_limit(rate: str) -> Callable:
+    """
+    Give an endpoint its own limit instead of ``APIConfig.REQUEST_PER_MIN``,
+    e.g. ``@rate_limit("10/minute")``. ``RATE_LIMIT_ROUTES`` and
+    ``RATE_LIMIT_KEYS`` still take precedence.
+    """
+    parsed = parse_rate(rate)
+
+    def decorator(endpoint):
+        endpoint.rate_limit = parsed
+        return endpoint
+    return decorator
+
+
+class RateLimiter:
+    """
+    Admit or reject requests, one bucket per route and client.
+
+    The limit of a request is the first of: the client's entry in
+    ``key_rates``, the route's entry in ``route_rates``, the endpoint's
+    ``@rate_limit`` and ``default_rate``.
+
+    :param backend: Where the buckets are stored
+    :param default_rate: Limit of the routes with no other, ``None`` for none
+    :param route_rates: Limits by route path template
+    :param key_rates: Limits by client key
+    :param key_header: Header identifying clients, their address when absent
+    :param api_keys: Values of ``key_header`` trusted to identify a client,
+        any other is ignored so that a client can neither pick a fresh
+        bucket per request nor claim an entry of ``key_rates``
+    :param enabled: Whether to limit at all
+    """
+
+    def __init__(
+        self,
+        backend: RateLimitBackend,
+        default_rate: Optional[Rate],
+        route_rates: Optional[Dict[str, Optional[Rate]]] = None,
+        key_rates: Optional[Dict[str, Optional[Rate]]] = None,
+        key_header: Optional[str] = None,
+        api_keys: Iterable[str] = (),
+        enabled: bool = True,
+    ):
+        self.backend = backend
+        self.default_rate = default_rate
+        self.route_rates = route_rates or {}
+        self.key_rates = key_rates or {}
+        self.key_header = key_header
+        self.api_keys = frozenset(api_keys)
+        self.enabled = enabled
+
+    def client_key(self, request: Request) -> str:
+        if self.key_header:
+            value = request.headers.get(self.key_header)
+            if value and value in self.api_keys:
+                return value
+        return request.client.host if request.client else "unknown"
+
+    def rate_for(self, route: str, endpoint, key: str) -> Optional[Rate]:
+        if key in self.key_rates:
+            return self.key_rates[key]
+        if route in self.route_rates:
+            return self.route_rates[route]
+        return getattr(endpoint, "rate_limit", self.default_rate)
+
+    async def check(self, request: Request) -> None:
+        """
+        Count ``request`` against its bucket. Backend failures let it through.
+
+        :raises RateLimitExceededException: When the bucket is empty
+        """
+        if not self.enabled:
+            return
+        route = request.scope["route"].path
+        key = self.client_key(request)
+        rate = self.rate_for(route, request.scope.get("endpoint"), key)
+        if rate is None:
+            return
+        try:
+            retry_after = await self.backend.hit(f"{route}|{key}", rate)
+        except Exception:
+            logger.exception("Rate limit check failed, letting the request through")
+            return
+        if retry_after > 0:
+            record_rate_limited(route)
+            raise RateLimitExceededException(retry_after)
+
+
+def create_rate_limiter(config=rate_limit_config) -> RateLimiter:
+    return RateLimiter(
+        create_rate_limit_backend(config),
+        parse_rate(api_config.REQUEST_PER_MIN) if api_config.REQUEST_PER_MIN else None,
+        route_rates=parse_rate_map(config.RATE_LIMIT_ROUTES),
+        key_rates=parse_rate_map(config.RATE_LIMIT_KEYS),
+        key_header=config.RATE_LIMIT_KEY_HEADER,
+        api_keys=parse_keys(config.RATE_LIMIT_API_KEYS),
+        enabled=config.RATE_LIMIT_ENABLED,
+    )
+
+
+async def enforce_rate_limit(request: Request) -> None:
+    """Router dependency applying the limiter stored on ``app.state.limiter``."""
+    await request.app.state.limiter.check(request)
@@ -0,0 +1,228 @@
+import re
+import heapq
+import logging
+import threading
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connection, transaction
+from django.db.models import F
+
+from skti_system_backend.models.v1.database.gallery import Artwork, Tombstone
+from skti_system_backend.utils.v1.changes import change_watcher, read_change_seq
+from skti_system_backend.utils.v1.db_router import primary_reads
+
+logger = logging.getLogger(__name__)
+
+SEARCH_LANGUAGE = "english"
+
+# Same weights as the default ``ts_rank`` weights for the A, B and C labels.
+TITLE_WEIGHT = 1.0
+DESCRIPTION_WEIGHT = 0.4
+TAG_WEIGHT = 0.2
+
+SEARCH_VECTOR_SQL = f"""
+UPDATE artworks SET search_vector =
+    setweight(to_tsvector('{SEARCH_LANGUAGE}', coalesce(artworks.title, '')), 'A') ||
+    setweight(to_tsvector('{SEARCH_LANGUAGE}', coalesce(artworks.description, '')), 'B') ||
+    setweight(to_tsvector('{SEARCH_LANGUAGE}', coalesce((
+        SELECT string_agg(tags.name, ' ')
+        FROM artworks_tags JOIN tags ON tags.id = artworks_tags.tag_id
+        WHERE artworks_tags.artwork_id = artworks.id
+    ), '')), 'C')
+"""
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+# Artworks re-read per query, their ids well under SQLite's limit on the
+# parameters of one query.
+REFRESH_CHUNK_SIZE = 500
+
+
+def uses_postgres_search() -> bool:
+    return connection.vendor == "postgresql"
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    return _TOKEN.findall(text.lower()) if text else []
+
+
+class InMemorySearchIndex:
+    """
+    Inverted index used where Postgres full text search is unavailable.
+
+    Maps every token of an artwork's title, description and tag names to the
+    weighted number of times it appears, so a query only touches the postings
+    of its own tokens. All query tokens must match, as with the Postgres query.
+    The index is built on first use and then kept current by the gallery
+    signals for the writes of this process, and by the change watcher for
+    those of the others, like the tag index.
+    """
+
+    # Most changed artworks re-read in place, more rebuild the index on its
+    # next use.
+    max_delta = 10_000
+
+    def __init__(self):
+        self._postings: Dict[str, Dict[int, float]] = defaultdict(dict)
+        self._documents: Dict[int, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+        self._built = False
+        # Change counter value the index reflects the writes up to.
+        self._seq: Optional[int] = None
+
+    def _build(self):
+        self._postings.clear()
+        self._documents.clear()
+        # Kept current by this process's writes from then on, so it must not
+        # start from a replica that has not replayed them yet.
+        with primary_reads():
+            seq = read_change_seq()
+            documents = self._documents_of(Artwork.objects.values_list("id", "title", "description"))
+            self._add_tag_tokens(documents, Artwork.tags.through.objects.filter(artwork__is_deleted=False))
+        for artwork_id, document in documents.items():
+            self._add(artwork_id, document)
+        self._seq = seq
+        self._built = True
+
+    @staticmethod
+    def _documents_of(rows: Iterable[Tuple[int, str, Optional[str]]]) -> Dict[int, Dict[str, float]]:
+        documents = {}
+        for artwork_id, title, description in rows:
+            weights = defaultdict(float)
+            for token in tokenize(title):
+                weights[token] += TITLE_WEIGHT
+            for token in tokenize(description):
+                weights[token] += DESCRIPTION_WEIGHT
+            documents[artwork_id] = weights
+        return documents
+
+    @staticmethod
+    def _add_tag_tokens(documents: Dict[int, Dict[str, float]], assignments) -> None:
+        for artwork_id, tag_name in assignments.values_list("artwork_id", "tag__name"):
+            if artwork_id in documents:
+                for token in tokenize(tag_name):
+                    documents[artwork_id][token] += TAG_WEIGHT
+
+    def _load(self, artwork_ids: List[int]) -> Dict[int, Dict[str, float]]:
+        documents = {}
+        for start in range(0, len(artwork_ids), REFRESH_CHUNK_SIZE):
+            chunk = artwork_ids[start:start + REFRESH_CHUNK_SIZE]
+            loaded = self._documents_of(Artwork.objects.filter(pk__in=chunk).values_list("id", "title", "description"))
+            self._add_tag_tokens(loaded, Artwork.tags.through.objects.filter(artwork_id__in=list(loaded)))
+            documents.update(loaded)
+        return documents
+
+    def _add(self, artwork_id, document):
+        self._documents[artwork_id] = document
+        for token, weight in document.items():
+            self._postings[token][artwork_id] = weight
+
+    def _remove(self, artwork_id):
+        for token in self._documents.pop(artwork_id, {}):
+            postings = self._postings.get(token)
+            if postings is not None:
+                postings.pop(artwork_id, None)
+                if not postings:
+                    del self._postings[token]
+
+    def refresh(self, artwork_ids: Iterable[int]) -> None:
+        """Re-read the given artworks, dropping the deleted ones."""
+        artwork_ids = list(artwork_ids)
+        with self._lock:
+            if not self._built:
+                return
+            documents = self._load(artwork_ids)
+            for artwork_id in artwork_ids:
+                self._remove(artwork_id)
+                if artwork_id in documents:
+                    self._add(artwork_id, documents[artwork_id])
+
+    def catch_up(self, value: int) -> None:
+        """
+        Re-read the artworks changed after the index's change counter value,
+        up to ``value``. Change watcher listener, which brings in the writes
+        of the other processes; too many changes rebuild the index on its
+        next use instead.
+        """
+        with self._lock:
+            since = self._seq
+            if not self._built or since is None or since >= value:
+                return
+        with primary_reads():
+            changed = list(
+                Artwork.all_objects.filter(change_seq__gt=since, change_seq__lte=value)
+                .order_by().values_list("id", flat=True)[:self.max_delta + 1]
+            )
+            if len(changed) > self.max_delta:
+                self.reset()
+                return
+            changed += Tombstone.objects.filter(
+                kind=Tombstone.ARTWORK, change_seq__gt=since, change_seq__lte=value
+            ).values_list("object_id", flat=True)
+            self.refresh(changed)
+        with self._lock:
+            if self._built and self._seq == since:
+                self._seq = value
+
+    def reset(self) -> None:
+        with self._lock:
+            self._built = False
+            self._seq = None
+
+    def search(self, query: str, offset: int, limit: int) -> List[Tuple[int, float]]:
+        """Return ``(artwork_id, rank)`` pairs, best first."""
+        tokens = set(tokenize(query))
+        if not tokens:
+            return []
+        with self._lock:
+            if not self._built:
+                self._build()
+            postings = sorted((self._postings.get(token, {}) for token in tokens), key=len)
+            if not postings[0]:
+                return []
+            scores = {
+                artwork_id: sum(posting[artwork_id] for posting in postings)
+                for artwork_id in postings[0]
+                if all(artwork_id in posting for posting in postings[1:])
+            }
+        ranked = heapq.nsmallest(offset + limit, scores.items(), key=lambda item: (-item[1], -item[0]))
+        return ranked[offset:]
+
+
+search_index = InMemorySearchIndex()
+change_watcher.subscribe(search_index.catch_up)
+
+
+def refresh_search(artwork_ids: Iterable[int]) -> None:
+    """
+    Recompute the search document of the given artworks, inside the current
+    transaction on Postgres and once it commits for the in-memory index.
+    """
+    artwork_ids = list(artwork_ids)
+    if not artwork_ids:
+        return
+    if uses_postgres_search():
+        with connection.cursor() as cursor:
+            cursor.execute(SEARCH_VECTOR_SQL + " WHERE artworks.id = ANY(%s)", [artwork_ids])
+    else:
+        transaction.on_commit(lambda: search_index.refresh(artwork_ids))
+
+
+def search_artwork_ids(query: str, offset: int, limit: int) -> List[Tuple[int, float]]:
+    """
+    Rank the non-deleted artworks matching ``query``.
+
+    :returns: ``(artwork_id, rank)`` pairs for the requested window, best first
+    """
+    if not uses_postgres_search():
+        return search_index.search(query, offset, limit)
+
+    search_query = SearchQuery(query, search_type="websearch", config=SEARCH_LANGUAGE)
+    return list(
+        Artwork.objects.filter(search_vector=search_query)
+        .annotate(rank=SearchRank(F("search_vector"), search_query))
+        .order_by("-rank", "-id")
+        .values_list("id", "rank")[offset:offset + limit]
+    )
@@ -0,0 +1,168 @@
+from operator import itemgetter
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import orjson
+
+from skti_system_backend.utils.v1.errors import InvalidFieldsException, InvalidIdsException
+
+
+# Fields of ``ArtworkData``, in the order they are written on the wire.
+ARTWORK_FIELDS = (
+    "id",
+    "title",
+    "description",
+    "category",
+    "image_url",
+    "tags",
+    "is_deleted",
+    "created_at",
+    "updated_at",
+)
+
+# Column read with ``values_list`` for every field that lives on the row.
+# ``tags`` is missing on purpose, it is resolved with a separate query.
+ARTWORK_FIELD_COLUMNS = {
+    "id": "id",
+    "title": "title",
+    "description": "description",
+    "category": "category__name",
+    "image_url": "image",
+    "is_deleted": "is_deleted",
+    "created_at": "created_at",
+    "updated_at": "updated_at",
+}
+
+
+def parse_artwork_fields(fields: Optional[str]) -> Optional[tuple]:
+    """
+    Parse a ``fields`` query parameter into a canonical tuple of field names.
+
+    :returns: ``None`` when every field is requested
+    :raises InvalidFieldsException: If an unknown field is requested
+    """
+    if fields is None:
+        return None
+    requested = {field.strip() for field in fields.split(",") if field.strip()}
+    unknown = requested.difference(ARTWORK_FIELDS)
+    if unknown:
+        raise InvalidFieldsException(
+            f"Unknown fields: {', '.join(sorted(unknown))}. "
+            f"Allowed fields: {', '.join(ARTWORK_FIELDS)}"
+        )
+    if not requested or requested == set(ARTWORK_FIELDS):
+        return None
+    return tuple(field for field in ARTWORK_FIELDS if field in requested)
+
+
+def parse_tag_names(tags: Optional[str]) -> tuple:
+    """Parse a comma separated list of tag names into a sorted, deduplicated tuple."""
+    if not tags:
+        return ()
+    return tuple(sorted({tag.strip() for tag in tags.split(",") if tag.strip()}))
+
+
+def parse_artwork_ids(ids: str, max_ids: int) -> tuple:
+    """
+    Parse a comma separated list of ids into a tuple in input order, with
+    repeated ids kept once.
+
+    :raises InvalidIdsException: If an id is not a positive 64 bit integer, or
+        there are none or more than ``max_ids``
+    """
+    parsed = []
+    for value in ids.split(","):
+        value = value.strip()
+        if not value:
+            continue
+        if not (value.isascii() and value.isdigit()) or len(value) > 18 or int(value) < 1:
+            raise InvalidIdsException(f"Invalid artwork id: {value[:20]}")
+        parsed.append(int(value))
+    parsed = tuple(dict.fromkeys(parsed))
+    if not parsed:
+        raise InvalidIdsException("At least one artwork id is required.")
+    if len(parsed) > max_ids:
+        raise InvalidIdsException(f"At most {max_ids} artwork ids can be requested at once.")
+    return parsed
+
+
+class ArtworkRowSerializer:
+    """
+    Serializer for a projection of ``ArtworkData`` built from trusted
+    ``values_list`` rows.
+
+    ``columns`` always starts with ``id`` and ``created_at`` so the keyset
+    cursor can be built whatever the projection; the remaining columns are
+    only the ones the requested fields need. ``category`` is the only field
+    that joins, and ``tags`` the only one that needs another query.
+    """
+
+    position = staticmethod(itemgetter(1, 0))
+
+    def __init__(self, storage, fields: Optional[Iterable[str]] = None):
+        self.fields = tuple(fields) if fields else ARTWORK_FIELDS
+        self.needs_tags = "tags" in self.fields
+        self.columns = ["id", "created_at"]
+        for field in self.fields:
+            column = ARTWORK_FIELD_COLUMNS.get(field)
+            if column and column not in self.columns:
+                self.columns.append(column)
+
+        getters = []
+        for field in self.fields:
+            if field == "tags":
+                getters.append((field, None))
+                continue
+            getter = itemgetter(self.columns.index(ARTWORK_FIELD_COLUMNS[field]))
+            if field == "image_url":
+                getter = _image_url_getter(getter, storage.url)
+            getters.append((field, getter))
+        self._getters = getters
+
+    def to_data(self, rows: Sequence[tuple], tags_by_id: Dict[int, List[str]]) -> List[Dict]:
+        """
+        Turn rows into wire dicts. Datetimes are left as objects,
+        :func:`dump_json` renders them exactly as Pydantic does.
+        """
+        getters = self._getters
+        return [
+            {
+                field: tags_by_id.get(row[0], []) if get is None else get(row)
+                for field, get in getters
+            }
+            for row in rows
+        ]
+
+
+def _image_url_getter(get, url):
+    def image_url(row):
+        name = get(row)
+        return url(name) if name else None
+    return image_url
+
+
+def dump_artworks_response(
+    status: bool,
+    message: str,
+    data: List,
+    status_code: int,
+    next_cursor: Optional[str] = None,
+) -> bytes:
+    """
+    Render an ``ArtworksResponse`` body without building the Pydantic model.
+
+    Keys and their order match ``ArtworksResponse.model_dump_json()``.
+    """
+    return dump_json(
+        {
+            "status": status,
+            "message": message,
+            "data": data,
+            "status_code": status_code,
+            "next_cursor": next_cursor,
+        }
+    )
+
+
+def dump_json(payload) -> bytes:
+    """Serialize with UTC datetimes rendered as ``...Z`` like Pydantic."""
+    return orjson.dumps(payload, option=orjson.OPT_UTC_Z)
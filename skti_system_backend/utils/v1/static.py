@@ -0,0 +1,265 @@
+import os
+import re
+import json
+from mimetypes import guess_type
+from typing import Mapping, Optional, Tuple
+
+import anyio
+from django.contrib.staticfiles.storage import StaticFilesStorage
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Receive, Scope, Send
+
+
+# File names carrying a content hash, e.g. ``base.3f2a9c1d7e4b.css`` or the
+# sha1 named image derivatives. Their content never changes under that URL.
+CONTENT_ADDRESSED_NAME = re.compile(r"(^|[.\-_])[0-9a-f]{12,64}\.[A-Za-z0-9]+$")
+
+_RANGE_SPEC = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+# Precompressed siblings written by the ``compress_static`` command, in order
+# of preference.
+PRECOMPRESSED_ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+# Original to content hashed name map written by the ``compress_static``
+# command at the top of STATIC_ROOT.
+STATIC_MANIFEST_NAME = "staticfiles.compressed.json"
+
+
+def accepted_encodings(header: Optional[str]) -> set:
+    """Content codings the client accepts, honouring ``q=0`` exclusions."""
+    accepted = set()
+    for item in (header or "").split(","):
+        coding, _, params = item.strip().partition(";")
+        coding = coding.strip().lower()
+        quality = params.strip()
+        if quality.startswith("q="):
+            try:
+                if float(quality[2:]) == 0:
+                    continue
+            except ValueError:
+                continue
+        if coding:
+            accepted.add(coding)
+    return accepted
+
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single byte range against a file of ``size`` bytes.
+
+    :returns: The inclusive ``(start, end)`` to serve, ``None`` when the header
+        should be ignored and the whole file served (malformed or multi-range)
+    :raises ValueError: If the range cannot be satisfied
+    """
+    match = _RANGE_SPEC.match(header.strip())
+    if match is None:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        suffix = int(last)
+        if suffix == 0:
+            raise ValueError(header)
+        return max(0, size - suffix), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError(header)
+    return start, end
+
+
+class RangeFileResponse(FileResponse):
+    """
+    ``FileResponse`` that honours single ``Range`` requests and hands the file
+    to the server for zero-copy sending when it supports it.
+
+    The ASGI ``http.response.zerocopysend`` extension lets the server
+    ``os.sendfile`` straight from the descriptor, and ``pathsend`` does the
+    same for whole files; without either the file is streamed in chunks read
+    from a worker thread.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        stat_result: os.stat_result,
+        request_headers: Headers,
+        headers: Optional[Mapping[str, str]] = None,
+        media_type: Optional[str] = None,
+    ):
+        super().__init__(path, stat_result=stat_result, headers=headers, media_type=media_type)
+        self.headers["accept-ranges"] = "bytes"
+        self.offset = 0
+        self.count = stat_result.st_size
+
+        range_header = request_headers.get("range")
+        if not range_header or not self._if_range_matches(request_headers.get("if-range")):
+            return
+        try:
+            byte_range = parse_range(range_header, stat_result.st_size)
+        except ValueError:
+            self.status_code = 416
+            self.count = 0
+            self.headers["content-range"] = f"bytes */{stat_result.st_size}"
+            self.headers["content-length"] = "0"
+            return
+        if byte_range is None:
+            return
+        start, end = byte_range
+        self.status_code = 206
+        self.offset = start
+        self.count = end - start + 1
+        self.headers["content-range"] = f"bytes {start}-{end}/{stat_result.st_size}"
+        self.headers["content-length"] = str(self.count)
+
+    def _if_range_matches(self, if_range: Optional[str]) -> bool:
+        if not if_range:
+            return True
+        if_range = if_range.strip()
+        if if_range.startswith('"'):
+            return if_range == self.headers.get("etag")
+        return if_range == self.headers.get("last-modified")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send(
+            {
+                "type": "http.response.start",
+                "status": self.status_code,
+                "headers": self.raw_headers,
+            }
+        )
+        extensions = scope.get("extensions") or {}
+        if scope["method"].upper() == "HEAD" or self.count == 0:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+        elif "http.response.zerocopysend" in extensions:
+            with open(self.path, "rb") as file:
+                await send(
+                    {
+                        "type": "http.response.zerocopysend",
+                        "file": file,
+                        "offset": self.offset,
+                        "count": self.count,
+                        "more_body": False,
+                    }
+                )
+        elif "http.response.pathsend" in extensions and self.status_code == 200:
+            await send({"type": "http.response.pathsend", "path": str(self.path)})
+        else:
+            async with await anyio.open_file(self.path, mode="rb") as file:
+                await file.seek(self.offset)
+                remaining = self.count
+                while remaining:
+                    chunk = await file.read(min(self.chunk_size, remaining))
+                    remaining = remaining - len(chunk) if chunk else 0
+                    await send(
+                        {
+                            "type": "http.response.body",
+                            "body": chunk,
+                            "more_body": bool(remaining),
+                        }
+                    )
+        if self.background is not None:
+            await self.background()
+
+
+class MediaFiles(StaticFiles):
+    """
+    ``StaticFiles`` serving ranges, ETag/Last-Modified revalidation and
+    ``immutable`` caching for content addressed file names.
+
+    With ``precompressed`` enabled, a ``.br`` or ``.gz`` sibling written by
+    the ``compress_static`` command is served instead of the file when the
+    client accepts that coding and the sibling is not older than the file,
+    so no compression happens per request.
+
+    :param max_age: Cache lifetime, in seconds, of regular files
+    :param immutable_max_age: Cache lifetime, in seconds, of content addressed files
+    :param precompressed: Whether to look for precompressed siblings
+    """
+
+    def __init__(self, *, max_age: int, immutable_max_age: int, precompressed: bool = False, **kwargs):
+        super().__init__(**kwargs)
+        self.max_age = max_age
+        self.immutable_max_age = immutable_max_age
+        self.precompressed = precompressed
+
+    def precompressed_variant(self, full_path: str, stat_result: os.stat_result, accept_encoding: Optional[str]):
+        """Return ``(coding, path, stat)`` of the best usable sibling, if any."""
+        accepted = accepted_encodings(accept_encoding)
+        for coding, suffix in PRECOMPRESSED_ENCODINGS:
+            if coding not in accepted and "*" not in accepted:
+                continue
+            try:
+                variant_stat = os.stat(full_path + suffix)
+            except OSError:
+                continue
+            if variant_stat.st_mtime >= stat_result.st_mtime:
+                return coding, full_path + suffix, variant_stat
+        return None
+
+    def cache_control(self, full_path: str) -> str:
+        if CONTENT_ADDRESSED_NAME.search(os.path.basename(full_path)):
+            return f"public, max-age={self.immutable_max_age}, immutable"
+        return f"public, max-age={self.max_age}"
+
+    def file_response(
+        self,
+        full_path,
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        request_headers = Headers(scope=scope)
+        headers = {"cache-control": self.cache_control(str(full_path))}
+        media_type = None
+        if self.precompressed:
+            headers["vary"] = "Accept-Encoding"
+            variant = self.precompressed_variant(
+                str(full_path), stat_result, request_headers.get("accept-encoding")
+            )
+            if variant is not None:
+                coding, variant_path, variant_stat = variant
+                headers["content-encoding"] = coding
+                media_type = guess_type(str(full_path))[0]
+                full_path, stat_result = variant_path, variant_stat
+
+        response = RangeFileResponse(
+            full_path,
+            stat_result=stat_result,
+            request_headers=request_headers,
+            headers=headers,
+            media_type=media_type,
+        )
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
+
+
+class HashedStaticFilesStorage(StaticFilesStorage):
+    """
+    ``StaticFilesStorage`` whose URLs point at the content hashed copies the
+    ``compress_static`` command wrote, so ``{% static %}`` links are served
+    with the ``immutable`` Cache-Control of ``MediaFiles``.
+
+    The manifest is read once per process, as the command runs at deploy
+    time; files it does not list keep their plain URL.
+    """
+
+    _hashed_names: Optional[Mapping[str, str]] = None
+
+    def hashed_names(self) -> Mapping[str, str]:
+        if self._hashed_names is None:
+            try:
+                with self.open(STATIC_MANIFEST_NAME) as file:
+                    self._hashed_names = json.load(file)
+            except (OSError, ValueError):
+                self._hashed_names = {}
+        return self._hashed_names
+
+    def url(self, name: Optional[str]) -> str:
+        if name:
+            name = self.hashed_names().get(name, name)
+        return super().url(name)
@@ -0,0 +1,378 @@
+import time
+import logging
+import threading
+from array import array
+from bisect import bisect_left
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.db import transaction
+
+from skti_system_backend.config.v1.api_config import api_config
+from skti_system_backend.models.v1.database.gallery import Artwork, Tag, Tombstone
+from skti_system_backend.utils.v1.changes import change_watcher, read_change_seq
+from skti_system_backend.utils.v1.db_router import primary_reads
+from skti_system_backend.utils.v1.errors import InvalidCursorException
+
+logger = logging.getLogger(__name__)
+
+
+def bitmap_from_positions(positions: Iterable[int]) -> int:
+    """
+    Bitmap with the bits at ``positions`` set, built in a single pass.
+
+    Setting one bit at a time with ``|=`` copies the whole ``int`` each
+    time, quadratic in the catalog size; the bits are set in a bytearray
+    spanning the positions instead, and turned into an ``int`` once.
+    """
+    positions = positions if isinstance(positions, (list, array)) else list(positions)
+    if not positions:
+        return 0
+    base = min(positions) & ~7
+    bits = bytearray(((max(positions) - base) >> 3) + 1)
+    for position in positions:
+        offset = position - base
+        bits[offset >> 3] |= 1 << (offset & 7)
+    return int.from_bytes(bits, "little") << base
+
+
+class TagBitmapIndex:
+    """
+    Per process tag -> artwork bitmap index.
+
+    Every artwork gets a bit position in ``(created_at, id)`` order, so the
+    highest set bit of a bitmap is always the newest artwork. A bitmap is a
+    plain ``int``: ``&``, ``|`` and ``~`` work a machine word at a time and
+    unset runs cost nothing, which keeps tag algebra and paging off the
+    database entirely. Artworks created later take the next position, deleted
+    ones only lose their ``alive`` bit until the next rebuild compacts them.
+
+    The index reflects the change counter up to ``_seq``. Writes made by this
+    process are applied through the gallery signals as they commit, and the
+    writes of every process are caught up with on the change watcher thread,
+    from the rows whose ``change_seq`` moved past ``_seq``. A change set too
+    large or that cannot be applied in place, an artwork older than the
+    newest position for instance, rebuilds the whole index on that thread
+    instead, at most once every ``refresh_seconds``. Requests never wait for
+    either, they only learn whether the index is current.
+
+    Writes that bypass the signals must stamp ``change_seq`` to be seen.
+    """
+
+    # Most changed artworks applied in place, more rebuild the index.
+    max_delta = 10_000
+
+    def __init__(self, refresh_seconds: float = 5.0):
+        self.refresh_seconds = refresh_seconds
+        self._lock = threading.RLock()
+        self._build_lock = threading.Lock()
+        self._built = False
+        self._stale = False
+        self._seq: Optional[int] = None
+        self._built_at = 0.0
+        self._rebuild_timer: Optional[threading.Timer] = None
+        self._reset()
+
+    def _reset(self):
+        self._keys: List[Tuple[datetime, int]] = []
+        self._positions: Dict[int, int] = {}
+        self._alive = 0
+        self._bitmaps: Dict[int, int] = {}
+        self._tag_ids: Dict[str, int] = {}
+
+    def build(self) -> None:
+        """
+        Load every artwork and tag assignment, four queries in total, from the
+        primary since the counter value read first must describe what was
+        loaded. Requests keep reading the previous index meanwhile.
+        """
+        with self._build_lock, primary_reads():
+            seq = read_change_seq()
+            keys, positions, alive = [], {}, array("I")
+            for artwork_id, created_at, is_deleted in Artwork.all_objects.order_by(
+                "created_at", "id"
+            ).values_list("id", "created_at", "is_deleted").iterator(chunk_size=10_000):
+                position = len(keys)
+                keys.append((created_at, artwork_id))
+                positions[artwork_id] = position
+                if not is_deleted:
+                    alive.append(position)
+
+            tag_ids = dict(Tag.objects.values_list("name", "id"))
+            tag_positions = defaultdict(lambda: array("I"))
+            for artwork_id, tag_id in Artwork.tags.through.objects.values_list(
+                "artwork_id", "tag_id"
+            ).iterator(chunk_size=10_000):
+                tag_positions[tag_id].append(positions[artwork_id])
+            alive = bitmap_from_positions(alive)
+            bitmaps = {
+                tag_id: bitmap_from_positions(tag_positions.pop(tag_id, ()))
+                for tag_id in tag_ids.values()
+            }
+
+            with self._lock:
+                # Writes of this process applied meanwhile are lost, they
+                # committed after ``seq`` and are caught up with next.
+                self._keys, self._positions, self._alive = keys, positions, alive
+                self._tag_ids, self._bitmaps = tag_ids, bitmaps
+                self._built = True
+                self._stale = False
+                self._seq = seq
+                self._built_at = time.monotonic()
+
+    def ensure_current(self, version: Optional[str]) -> bool:
+        """
+        Build the index on first use, else only tell whether it reflects the
+        catalog at ``version``. Catching up happens on the change watcher thread.
+
+        :returns: Whether the index is known to reflect ``version``
+        """
+        if not self._built:
+            self.build()
+        if version is None or not version.isdigit():
+            return False
+        with self._lock:
+            return not self._stale and self._seq is not None and self._seq >= int(version)
+
+    def invalidate(self) -> None:
+        """Have the index rebuilt on the change watcher thread, serving it meanwhile."""
+        with self._lock:
+            self._stale = True
+        change_watcher.wake(notify=True)
+
+    def refresh(self, value: int) -> None:
+        """
+        Catch up with the change counter at ``value``. Change watcher listener,
+        a process that never used the index does not build it here.
+        """
+        if not self._built:
+            return
+        with self._lock:
+            stale, seq = self._stale, self._seq
+        if not stale and seq is not None:
+            if seq >= value:
+                return
+            if self._apply_changes(seq, value):
+                return
+        remaining = self._built_at + self.refresh_seconds - time.monotonic()
+        if remaining > 0:
+            with self._lock:
+                self._stale = True
+                if self._rebuild_timer is None or not self._rebuild_timer.is_alive():
+                    self._rebuild_timer = threading.Timer(remaining, change_watcher.wake, kwargs={"notify": True})
+                    self._rebuild_timer.daemon = True
+                    self._rebuild_timer.start()
+            return
+        self.build()
+
+    def _apply_changes(self, since: int, until: int) -> bool:
+        """
+        Apply the artworks and tag assignments changed after ``since``, five
+        queries, and record the index as current up to ``until``. Only the
+        bitmaps of the tags the changed artworks left or joined are rewritten.
+
+        :returns: Whether they could be applied in place
+        """
+        with primary_reads():
+            changed = list(
+                Artwork.all_objects.filter(change_seq__gt=since).order_by()
+                .values_list("id", "created_at", "is_deleted")[:self.max_delta + 1]
+            )
+            if len(changed) > self.max_delta:
+                return False
+            removed = list(
+                Tombstone.objects.filter(kind=Tombstone.ARTWORK, change_seq__gt=since)
+                .values_list("object_id", flat=True)
+            )
+            assignments = list(
+                Artwork.tags.through.objects.filter(artwork_id__in=[row[0] for row in changed])
+                .values_list("artwork_id", "tag_id")
+            ) if changed else []
+            tag_ids = dict(Tag.objects.values_list("name", "id"))
+
+        with self._lock:
+            if self._stale:
+                return False
+            if self._seq != since:
+                # Rebuilt meanwhile.
+                return True
+            added = []
+            for artwork_id, created_at, _ in changed:
+                position = self._positions.get(artwork_id)
+                if position is None:
+                    added.append((created_at, artwork_id))
+                elif self._keys[position][0] != created_at:
+                    return False
+            added.sort()
+            if added and self._keys and added[0] < self._keys[-1]:
+                # Older than the newest position, it cannot be appended.
+                return False
+
+            for key in added:
+                self._positions[key[1]] = len(self._keys)
+                self._keys.append(key)
+            positions = self._positions
+            revived = bitmap_from_positions(positions[row[0]] for row in changed if not row[2])
+            changed_positions = [positions[row[0]] for row in changed]
+            changed_positions += [positions[pk] for pk in removed if pk in positions]
+            mask = bitmap_from_positions(changed_positions)
+            self._alive = self._alive & ~mask | revived
+
+            # The changed artworks leave the tags they carried, found by
+            # looking at the bitmaps from the lowest changed position up, and
+            # join the ones they carry now. Other tags are left untouched.
+            assigned = defaultdict(list)
+            for artwork_id, tag_id in assignments:
+                assigned[tag_id].append(positions[artwork_id])
+            current = set(tag_ids.values())
+            low = min(changed_positions, default=0)
+            window = mask >> low
+            for tag_id in list(self._bitmaps):
+                if tag_id not in current:
+                    del self._bitmaps[tag_id]
+                elif window and self._bitmaps[tag_id] >> low & window:
+                    self._bitmaps[tag_id] &= ~mask
+            for tag_id in current:
+                bitmap = self._bitmaps.get(tag_id, 0)
+                if tag_id in assigned:
+                    bitmap |= bitmap_from_positions(assigned[tag_id])
+                self._bitmaps[tag_id] = bitmap
+            self._tag_ids = tag_ids
+            self._seq = until
+        return True
+
+    # Incremental maintenance, called once the write has committed.
+
+    def set_artwork(self, artwork_id: int, created_at: datetime, alive: bool) -> None:
+        with self._lock:
+            if not self._built:
+                return
+            position = self._positions.get(artwork_id)
+            if position is None:
+                if self._keys and (created_at, artwork_id) < self._keys[-1]:
+                    # Older than the newest position, it cannot be appended.
+                    self.invalidate()
+                    return
+                position = len(self._keys)
+                self._keys.append((created_at, artwork_id))
+                self._positions[artwork_id] = position
+            bit = 1 << position
+            self._alive = self._alive | bit if alive else self._alive & ~bit
+
+    def set_tags(self, artwork_id: int, tag_ids: Iterable[int], present: bool) -> None:
+        with self._lock:
+            if not self._built:
+                return
+            position = self._positions.get(artwork_id)
+            if position is None:
+                self.invalidate()
+                return
+            bit = 1 << position
+            for tag_id in tag_ids:
+                bitmap = self._bitmaps.get(tag_id, 0)
+                self._bitmaps[tag_id] = bitmap | bit if present else bitmap & ~bit
+
+    def clear_artwork_tags(self, artwork_id: int) -> None:
+        with self._lock:
+            if self._built:
+                self.set_tags(artwork_id, list(self._bitmaps), False)
+
+    def set_tag_artworks(self, tag_id: int, artwork_ids: Optional[Iterable[int]], present: bool) -> None:
+        """Add or remove ``artwork_ids`` for one tag, ``None`` removes them all."""
+        with self._lock:
+            if not self._built:
+                return
+            if artwork_ids is None:
+                self._bitmaps[tag_id] = 0
+                return
+            mask = 0
+            for artwork_id in artwork_ids:
+                position = self._positions.get(artwork_id)
+                if position is None:
+                    self.invalidate()
+                    return
+                mask |= 1 << position
+            bitmap = self._bitmaps.get(tag_id, 0)
+            self._bitmaps[tag_id] = bitmap | mask if present else bitmap & ~mask
+
+    def set_tag(self, tag_id: int, name: Optional[str]) -> None:
+        """Record a created or renamed tag, ``None`` drops a deleted one."""
+        with self._lock:
+            if not self._built:
+                return
+            for known_name, known_id in list(self._tag_ids.items()):
+                if known_id == tag_id:
+                    del self._tag_ids[known_name]
+            if name is None:
+                self._bitmaps.pop(tag_id, None)
+            else:
+                self._tag_ids[name] = tag_id
+                self._bitmaps.setdefault(tag_id, 0)
+
+    # Queries
+
+    def _union(self, names: Iterable[str]) -> int:
+        bitmap = 0
+        for name in names:
+            tag_id = self._tag_ids.get(name)
+            if tag_id is not None:
+                bitmap |= self._bitmaps.get(tag_id, 0)
+        return bitmap
+
+    def match(
+        self,
+        all_tags: Iterable[str] = (),
+        any_tags: Iterable[str] = (),
+        exclude_tags: Iterable[str] = (),
+    ) -> int:
+        """
+        Bitmap of the live artworks carrying every tag of ``all_tags``, at
+        least one of ``any_tags`` when given and none of ``exclude_tags``.
+        Unknown tag names match no artwork.
+        """
+        with self._lock:
+            bitmap = self._alive
+            for name in all_tags:
+                tag_id = self._tag_ids.get(name)
+                bitmap &= self._bitmaps.get(tag_id, 0) if tag_id is not None else 0
+            any_tags = list(any_tags)
+            if any_tags:
+                bitmap &= self._union(any_tags)
+            exclude = self._union(exclude_tags)
+            if exclude:
+                bitmap &= ~exclude
+            return bitmap
+
+    def page(self, bitmap: int, cursor: Optional[Tuple[datetime, int]], limit: int) -> List[Tuple[int, datetime]]:
+        """
+        Return up to ``limit`` ``(artwork_id, created_at)`` pairs of ``bitmap``
+        that sort after ``cursor``, newest first.
+        """
+        with self._lock:
+            if cursor is not None:
+                if cursor[0].tzinfo is None:
+                    raise InvalidCursorException()
+                bitmap &= (1 << bisect_left(self._keys, cursor)) - 1
+            rows = []
+            while bitmap and len(rows) < limit:
+                position = bitmap.bit_length() - 1
+                bitmap ^= 1 << position
+                created_at, artwork_id = self._keys[position]
+                rows.append((artwork_id, created_at))
+            return rows
+
+
+tag_index = TagBitmapIndex(api_config.TAG_INDEX_REFRESH_SECONDS)
+change_watcher.subscribe(tag_index.refresh)
+
+
+def on_commit_index(method, *args) -> None:
+    """Apply an index update once the current transaction commits."""
+    def apply():
+        try:
+            method(*args)
+        except Exception:
+            logger.exception("Tag index update failed, rebuilding it")
+            tag_index.invalidate()
+    transaction.on_commit(apply)